@@ -0,0 +1,521 @@
+import bisect
+import random
+import time
+import tracemalloc
+import unittest
+
+from .binary_search_tree import BST
+
+
+class LeafNode(object):
+    """Leaf of a B+ tree: sorted keys with their values and a pointer to the
+    next leaf (leaves form a sorted linked list used by range scans).
+
+    :param keys: sorted keys
+    :type keys: list
+    :param values: values, `values[i]` belongs to `keys[i]`
+    :type values: list
+    :param next: pointer to the next leaf
+    :type next: LeafNode
+    """
+    __slots__ = ('keys', 'values', 'next')
+
+    def __init__(self, keys=None, values=None):
+        self.keys = keys if keys is not None else []
+        self.values = values if values is not None else []
+        self.next = None
+
+
+class InternalNode(object):
+    """Internal node of a B+ tree: `children[i]` holds keys k such that
+    `keys[i - 1] <= k < keys[i]`.
+
+    :param keys: sorted separators
+    :type keys: list
+    :param children: child nodes, one more than keys
+    :type children: list
+    """
+    __slots__ = ('keys', 'children')
+
+    def __init__(self, keys=None, children=None):
+        self.keys = keys if keys is not None else []
+        self.children = children if children is not None else []
+
+
+class BPlusTree(object):
+    """Ordered map implemented as a B+ tree. For details please visit:
+    https://en.wikipedia.org/wiki/B%2B_tree
+
+    Instead of one node (with two child pointers) per key, every node keeps
+    up to `fanout` keys in a Python list that is searched with `bisect`.
+    The tree is only log_fanout(n) levels deep, a node costs a few pointers
+    per key, and range scans walk the linked leaves (plain lists) without
+    going back up the tree.
+
+    :param fanout: max number of keys in a leaf / children of a node
+    :type fanout: int
+    :param root: root of the tree
+    :type root: LeafNode or InternalNode
+    :param size: number of keys in the tree
+    :type size: int
+    """
+    FANOUT = 64
+
+    def __init__(self, fanout=FANOUT):
+        if fanout < 3:
+            raise ValueError('fanout must be at least 3.')
+        self.fanout = fanout
+        self.root = LeafNode()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        leaf = self._find_leaf(key)
+        i = bisect.bisect_left(leaf.keys, key)
+        return i < len(leaf.keys) and leaf.keys[i] == key
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        self.remove(key)
+
+    def __iter__(self):
+        for key, _ in self.range():
+            yield key
+
+    def _find_leaf(self, key):
+        node = self.root
+        while isinstance(node, InternalNode):
+            node = node.children[bisect.bisect_right(node.keys, key)]
+        return node
+
+    def _find_path(self, key):
+        """Returns the leaf for `key` and the path to it as a list of
+        (internal node, index of the child taken) pairs"""
+        path = []
+        node = self.root
+        while isinstance(node, InternalNode):
+            i = bisect.bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        return node, path
+
+    def get(self, key):
+        """Gets the value saved with key.
+
+        :param key: key
+        :type key: must overload __lt__
+        :return: value
+        :rtype: object
+        :raises: KeyError
+
+        :Example:
+        >>> tree = BPlusTree()
+        >>> tree['foo'] = 1
+        >>> tree.get('foo')
+        1
+        """
+        leaf = self._find_leaf(key)
+        i = bisect.bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            return leaf.values[i]
+        raise KeyError(f"{key} is not in the tree.")
+
+    def set(self, key, value=None):
+        """Sets the key with value. If key already exists its value is
+        updated, otherwise it is inserted.
+
+        :param key: key
+        :type key: must overload __lt__
+        :param value: value
+        :type value: object
+
+        :Example:
+        >>> tree = BPlusTree(fanout=3)
+        >>> for i in range(4):
+        ...     tree.set(i, str(i))
+        >>> tree.root.keys
+        [2]
+        """
+        leaf, path = self._find_path(key)
+        i = bisect.bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            leaf.values[i] = value
+            return
+        leaf.keys.insert(i, key)
+        leaf.values.insert(i, value)
+        self.size += 1
+        if len(leaf.keys) > self.fanout:
+            self._split(leaf, path)
+
+    insert = set
+
+    def _split(self, node, path):
+        """Splits overfull `node` and propagates the split up the `path`"""
+        while True:
+            mid = len(node.keys) // 2
+            if isinstance(node, LeafNode):
+                right = LeafNode(node.keys[mid:], node.values[mid:])
+                del node.keys[mid:], node.values[mid:]
+                right.next, node.next = node.next, right
+                separator = right.keys[0]
+            else:  # the middle key moves up
+                separator = node.keys[mid]
+                right = InternalNode(node.keys[mid + 1:], node.children[mid + 1:])
+                del node.keys[mid:], node.children[mid + 1:]
+            if not path:  # splitting the root
+                self.root = InternalNode([separator], [node, right])
+                return
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, right)
+            if len(parent.children) <= self.fanout:
+                return
+            node = parent
+
+    def remove(self, key):
+        """Removes key from the tree.
+
+        :param key: key
+        :type key: must overload __lt__
+        :raises: KeyError
+
+        :Example:
+        >>> tree = BPlusTree()
+        >>> tree['foo'] = 1
+        >>> tree.remove('foo')
+        >>> 'foo' in tree
+        False
+        """
+        leaf, path = self._find_path(key)
+        i = bisect.bisect_left(leaf.keys, key)
+        if i == len(leaf.keys) or leaf.keys[i] != key:
+            raise KeyError(f"{key} is not in the tree.")
+        del leaf.keys[i], leaf.values[i]
+        self.size -= 1
+        self._rebalance(leaf, path)
+
+    def _rebalance(self, node, path):
+        """Fixes underflow of `node` by borrowing from or merging with
+        a sibling, then propagates up the `path`"""
+        min_keys = self.fanout // 2
+        min_children = (self.fanout + 1) // 2
+        while path:
+            if isinstance(node, LeafNode):
+                if len(node.keys) >= min_keys:
+                    return
+            elif len(node.children) >= min_children:
+                return
+            parent, i = path.pop()
+            left = parent.children[i - 1] if i > 0 else None
+            right = parent.children[i + 1] if i + 1 < len(parent.children) else None
+            if isinstance(node, LeafNode):
+                if left is not None and len(left.keys) > min_keys:
+                    node.keys.insert(0, left.keys.pop())
+                    node.values.insert(0, left.values.pop())
+                    parent.keys[i - 1] = node.keys[0]
+                    return
+                if right is not None and len(right.keys) > min_keys:
+                    node.keys.append(right.keys.pop(0))
+                    node.values.append(right.values.pop(0))
+                    parent.keys[i] = right.keys[0]
+                    return
+                if left is not None:  # merge node into left
+                    left.keys += node.keys
+                    left.values += node.values
+                    left.next = node.next
+                    del parent.keys[i - 1], parent.children[i]
+                else:  # merge right into node
+                    node.keys += right.keys
+                    node.values += right.values
+                    node.next = right.next
+                    del parent.keys[i], parent.children[i + 1]
+            else:
+                if left is not None and len(left.children) > min_children:
+                    node.keys.insert(0, parent.keys[i - 1])
+                    node.children.insert(0, left.children.pop())
+                    parent.keys[i - 1] = left.keys.pop()
+                    return
+                if right is not None and len(right.children) > min_children:
+                    node.keys.append(parent.keys[i])
+                    node.children.append(right.children.pop(0))
+                    parent.keys[i] = right.keys.pop(0)
+                    return
+                if left is not None:  # merge node into left
+                    left.keys += [parent.keys[i - 1]] + node.keys
+                    left.children += node.children
+                    del parent.keys[i - 1], parent.children[i]
+                else:  # merge right into node
+                    node.keys += [parent.keys[i]] + right.keys
+                    node.children += right.children
+                    del parent.keys[i], parent.children[i + 1]
+            node = parent
+        # node is the root
+        if isinstance(node, InternalNode) and len(node.children) == 1:
+            self.root = node.children[0]
+
+    def find_min(self):
+        """Min key in the tree, None for an empty tree"""
+        node = self.root
+        while isinstance(node, InternalNode):
+            node = node.children[0]
+        return node.keys[0] if node.keys else None
+
+    def find_max(self):
+        """Max key in the tree, None for an empty tree"""
+        node = self.root
+        while isinstance(node, InternalNode):
+            node = node.children[-1]
+        return node.keys[-1] if node.keys else None
+
+    def range(self, lo=None, hi=None):
+        """Lazily yields (key, value) pairs with keys from the half-open range
+        [lo, hi) in order. `None` means unbounded.
+
+        :param lo: lower bound (inclusive)
+        :type lo: object
+        :param hi: upper bound (exclusive)
+        :type hi: object
+
+        :Example:
+        >>> tree = BPlusTree(fanout=3)
+        >>> for i in range(10):
+        ...     tree[i] = i * i
+        >>> list(tree.range(3, 6))
+        [(3, 9), (4, 16), (5, 25)]
+        """
+        if lo is None:
+            leaf = self.root
+            while isinstance(leaf, InternalNode):
+                leaf = leaf.children[0]
+            i = 0
+        else:
+            leaf = self._find_leaf(lo)
+            i = bisect.bisect_left(leaf.keys, lo)
+        while leaf is not None:
+            keys = leaf.keys
+            if hi is None or (keys and keys[-1] < hi):
+                end = len(keys)
+            else:
+                end = bisect.bisect_left(keys, hi, i)
+            yield from zip(keys[i:end], leaf.values[i:end])
+            if end < len(keys):
+                return
+            leaf = leaf.next
+            i = 0
+
+    def height(self):
+        """Number of levels in the tree
+
+        :return: height of the tree
+        :rtype: int
+        """
+        height = 1
+        node = self.root
+        while isinstance(node, InternalNode):
+            node = node.children[0]
+            height += 1
+        return height
+
+
+def benchmark_b_tree(n=1000000, fanout=BPlusTree.FANOUT, range_size=10000,
+                     seed=0):
+    """Compares `BPlusTree` with `BST` holding the same random keys: memory
+    per key, lookups and range scans.
+
+    :param n: number of keys
+    :type n: int
+    :param fanout: fanout of the B+ tree
+    :type fanout: int
+    :param range_size: number of keys in each scanned range
+    :type range_size: int
+    :param seed: random seed
+    :type seed: int
+    :return: {measure: (BPlusTree, BST)} with bytes per key, seconds per
+        lookup and seconds per scanned key
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_b_tree(1000, range_size=100)
+    >>> sorted(results)
+    ['bytes per key', 'find', 'range scan']
+    """
+    rng = random.Random(seed)
+    keys = list(range(n))
+    rng.shuffle(keys)
+    queries = rng.sample(keys, min(n, 10000))
+    starts = [rng.randrange(max(n - range_size, 1)) for _ in range(10)]
+    results = {'bytes per key': [], 'find': [], 'range scan': []}
+
+    tracemalloc.start()
+    tree = BPlusTree(fanout)
+    for key in keys:
+        tree[key] = None
+    results['bytes per key'].append(tracemalloc.get_traced_memory()[0] / n)
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for key in queries:
+        _ = key in tree
+    results['find'].append((time.perf_counter() - start) / len(queries))
+    start = time.perf_counter()
+    for lo in starts:
+        for _ in tree.range(lo, lo + range_size):
+            pass
+    results['range scan'].append(
+        (time.perf_counter() - start) / (len(starts) * range_size))
+    del tree
+
+    tracemalloc.start()
+    bst = BST()
+    for key in keys:
+        bst.insert(key)
+    results['bytes per key'].append(tracemalloc.get_traced_memory()[0] / n)
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for key in queries:
+        _ = bst.find(key)
+    results['find'].append((time.perf_counter() - start) / len(queries))
+    start = time.perf_counter()
+    for lo in starts:  # BST has no range scan, so in-order with pruning
+        stack, node = [], bst.root
+        while stack or node:
+            if node is not None:
+                stack.append(node)
+                node = node.left_child if lo <= node.data else None
+                continue
+            node = stack.pop()
+            if node.data >= lo + range_size:
+                break
+            node = node.right_child
+    results['range scan'].append(
+        (time.perf_counter() - start) / (len(starts) * range_size))
+    return {measure: tuple(values) for measure, values in results.items()}
+
+
+class TestBPlusTree(unittest.TestCase):
+    def _check_invariants(self, tree):
+        """Checks ordering, fill factors, equal depth of leaves and the leaf
+        links; returns all keys in order"""
+        leaves = []
+
+        def visit(node, lo, hi, depth, is_root):
+            if isinstance(node, LeafNode):
+                leaves.append((node, depth))
+                if not is_root:
+                    self.assertGreaterEqual(len(node.keys), tree.fanout // 2)
+                self.assertLessEqual(len(node.keys), tree.fanout)
+                self.assertListEqual(sorted(node.keys), node.keys)
+                for key in node.keys:
+                    self.assertTrue(lo is None or lo <= key)
+                    self.assertTrue(hi is None or key < hi)
+                return
+            self.assertEqual(len(node.keys) + 1, len(node.children))
+            self.assertLessEqual(len(node.children), tree.fanout)
+            if not is_root:
+                self.assertGreaterEqual(len(node.children), (tree.fanout + 1) // 2)
+            bounds = [lo] + node.keys + [hi]
+            for i, child in enumerate(node.children):
+                visit(child, bounds[i], bounds[i + 1], depth + 1, False)
+
+        visit(tree.root, None, None, 1, True)
+        self.assertEqual(1, len({depth for _, depth in leaves}))
+        for (leaf, _), (next_leaf, _) in zip(leaves, leaves[1:]):
+            self.assertIs(next_leaf, leaf.next)
+        self.assertIsNone(leaves[-1][0].next)
+        return [key for leaf, _ in leaves for key in leaf.keys]
+
+    def test_init_raises(self):
+        with self.assertRaises(ValueError):
+            BPlusTree(fanout=2)
+
+    def test_set_get(self):
+        tree = BPlusTree(fanout=4)
+        for i in range(100):
+            tree[i] = str(i)
+        tree[50] = 'fifty'
+        data_set = [
+            ('0', tree[0]),
+            ('fifty', tree.get(50)),
+            (100, len(tree)),
+            (True, 99 in tree),
+            (False, 100 in tree),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+        with self.assertRaises(KeyError):
+            _ = tree[100]
+
+    def test_insert_random_invariants(self):
+        rng = random.Random(0)
+        keys = list(range(1000))
+        rng.shuffle(keys)
+        for fanout in [3, 4, 5, 64]:
+            tree = BPlusTree(fanout)
+            for key in keys:
+                tree[key] = key
+            with self.subTest(fanout=fanout):
+                self.assertListEqual(list(range(1000)), self._check_invariants(tree))
+
+    def test_remove_random_invariants(self):
+        rng = random.Random(1)
+        for fanout in [3, 4, 5, 16]:
+            tree = BPlusTree(fanout)
+            keys = list(range(500))
+            rng.shuffle(keys)
+            for key in keys:
+                tree[key] = key
+            expected = set(keys)
+            for key in keys[:450]:
+                del tree[key]
+                expected.discard(key)
+            with self.subTest(fanout=fanout):
+                self.assertListEqual(sorted(expected), self._check_invariants(tree))
+                self.assertEqual(50, len(tree))
+            for key in keys[450:]:
+                tree.remove(key)
+            with self.subTest(fanout=fanout, empty=True):
+                self.assertListEqual([], self._check_invariants(tree))
+                self.assertIsNone(tree.find_min())
+
+    def test_remove_raises(self):
+        tree = BPlusTree()
+        tree[1] = 1
+        with self.assertRaises(KeyError):
+            tree.remove(2)
+
+    def test_min_max_height(self):
+        tree = BPlusTree(fanout=4)
+        for i in range(100, 0, -1):
+            tree[i] = i
+        data_set = [(1, tree.find_min()), (100, tree.find_max()), (True, tree.height() > 2)]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_range(self):
+        tree = BPlusTree(fanout=3)
+        for i in range(0, 40, 2):
+            tree[i] = -i
+        data_set = [
+            ([(4, -4), (6, -6), (8, -8)], (3, 10)),
+            ([(4, -4), (6, -6)], (4, 8)),
+            ([(0, 0), (2, -2)], (None, 4)),
+            ([(36, -36), (38, -38)], (35, None)),
+            ([], (100, 200)),
+            ([], (5, 5)),
+        ]
+        for expected, (lo, hi) in data_set:
+            with self.subTest(lo=lo, hi=hi, expected=expected):
+                self.assertListEqual(expected, list(tree.range(lo, hi)))
+        self.assertListEqual(list(range(0, 40, 2)), list(tree))
+
+    def test_benchmark(self):
+        results = benchmark_b_tree(500, fanout=8, range_size=50)
+        self.assertSetEqual({'bytes per key', 'find', 'range scan'}, set(results))
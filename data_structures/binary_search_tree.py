@@ -1,16 +1,138 @@
+from collections import deque
+import copy
+import heapq
+from operator import itemgetter
+import random
+import threading
+import time
+import tracemalloc
 import unittest
 
 
 class Node(object):
+    """Representation of a tree node
+
+    :param data: data to be stored in the node
+    :type data: object
+    :param size: number of nodes in the subtree rooted here
+    :type size: int
+    :param total: sum of data in the subtree (only if the tree tracks sums)
+    :type total: numeric
+    """
     def __init__(self, data):
         self.data = data
         self.left_child = None
         self.right_child = None
+        self.size = 1
+        self.total = None
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _total(node):
+    return node.total if node is not None else 0
 
 
 class BST(object):
-    def __init__(self):
+    """Binary search tree augmented with subtree sizes (and optionally
+    subtree sums), which gives order statistics (`rank`, `select`) and range
+    counts/sums in O(height).
+
+    :param track_sums: should subtree sums be kept (numeric data only)?
+    :type track_sums: bool
+    """
+    def __init__(self, track_sums=False):
         self.root = None
+        self.track_sums = track_sums
+
+    NODE_CLASS = Node
+
+    def _new_node(self, data):
+        node = self.NODE_CLASS(data)
+        if self.track_sums:
+            node.total = data
+        return node
+
+    def _update(self, node):
+        """Recomputes augmented fields of `node` from its children"""
+        left, right = node.left_child, node.right_child
+        node.size = 1 + _size(left) + _size(right)
+        if self.track_sums:
+            node.total = _total(left) + node.data + _total(right)
+
+    @classmethod
+    def from_sorted(cls, iterable, **kwargs):
+        """Builds a perfectly balanced tree from sorted data in O(n): the
+        middle element becomes the root, halves become the subtrees.
+
+        :param iterable: sorted data
+        :type iterable: iterable
+        :param kwargs: passed to the constructor (e.g. `track_sums`)
+        :raises ValueError: when data is not sorted
+        :return: new tree
+        :rtype: BST
+
+        :Example:
+        >>> bst = BST.from_sorted([1, 2, 3, 4, 5, 6, 7])
+        >>> bst.root.data, bst.root.left_child.data, bst.root.right_child.data
+        (4, 2, 6)
+        >>> bst.height()
+        3
+        """
+        data = list(iterable)
+        if any(b < a for a, b in zip(data, data[1:])):
+            raise ValueError('Data must be sorted.')
+        tree = cls(**kwargs)
+        tree.root = tree._build(data, 0, len(data))
+        return tree
+
+    @classmethod
+    def from_iterable(cls, iterable, **kwargs):
+        """Sorts data and builds a perfectly balanced tree from it in
+        O(n log n)
+
+        :param iterable: data
+        :type iterable: iterable
+        :param kwargs: passed to the constructor (e.g. `track_sums`)
+        :return: new tree
+        :rtype: BST
+
+        :Example:
+        >>> bst = BST.from_iterable([3, 1, 2])
+        >>> bst.root.data, bst.root.left_child.data, bst.root.right_child.data
+        (2, 1, 3)
+        """
+        return cls.from_sorted(sorted(iterable), **kwargs)
+
+    def _build(self, data, lo, hi):
+        """Builds a balanced subtree of data[lo:hi], recursion depth is
+        log2(n)"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = self._new_node(data[mid])
+        node.left_child = self._build(data, lo, mid)
+        node.right_child = self._build(data, mid + 1, hi)
+        self._update(node)
+        return node
+
+    def merge(self, other):
+        """Adds all data from `other` (which is left unchanged) in O(n + m):
+        both trees are flattened in order, merged and rebuilt balanced.
+
+        :param other: tree to be merged in
+        :type other: BST
+
+        :Example:
+        >>> bst = BST.from_sorted([1, 3, 5])
+        >>> bst.merge(BST.from_sorted([2, 4]))
+        >>> list(bst.range())
+        [1, 2, 3, 4, 5]
+        """
+        data = list(heapq.merge(self.range(), other.range()))
+        self.root = self._build(data, 0, len(data))
 
     def insert(self, data):
         """Inserts data to the tree
@@ -25,12 +147,16 @@ class BST(object):
         >>> bst.root.data, bst.root.right_child.data
         (1, 10000)
         """
-        node = Node(data)
+        node = self._new_node(data)
         if self.root is None:  # insertion of the first element
             self.root = node
         else:  # there is already something in the tree
             current = self.root
             while True:
+                # the new node ends up in the subtree of every visited node
+                current.size += 1
+                if self.track_sums:
+                    current.total += data
                 if data <= current.data:  # left child
                     if current.left_child is None:
                         current.left_child = node
@@ -63,6 +189,7 @@ class BST(object):
 
         if node is None and parent is None:
             return
+        self._shrink_path(data, node)
 
         children_num = 0
         if node.left_child is not None:
@@ -98,7 +225,14 @@ class BST(object):
             while leftmost_node.left_child:
                 parent_of_the_leftmost_node = leftmost_node
                 leftmost_node = leftmost_node.left_child
-            node.data = leftmost_node.data
+            # leftmost_node moves up, so subtrees below `node` lose its data
+            current = node.right_child
+            while current is not leftmost_node:
+                current.size -= 1
+                if self.track_sums:
+                    current.total -= leftmost_node.data
+                current = current.left_child
+            self._replace_data(node, leftmost_node)
             # In case the leftmost node has a right child
             if parent_of_the_leftmost_node.right_child == leftmost_node:
                 # if we are here we never entered the while loop.
@@ -106,18 +240,42 @@ class BST(object):
             else:  # we got inside the while loop
                 parent_of_the_leftmost_node.left_child = leftmost_node.right_child
 
-    def _find_node_with_parent(self, data):
+    def _replace_data(self, node, source):
+        """Moves data of `source` to `node` (removing a node with two children
+        replaces its data with the data of its successor)"""
+        node.data = source.data
+
+    def _shrink_path(self, data, node):
+        """Updates sizes/sums on the path from the root to `node` when `data`
+        is about to be removed from its subtree"""
         current = self.root
-        previous = None
-        while current:
-            if data == current.data:
-                return current, previous
-            elif data <= current.data:
-                previous = current
+        while True:
+            current.size -= 1
+            if self.track_sums:
+                current.total -= data
+            if current is node:
+                return
+            if data <= current.data:
                 current = current.left_child
-            elif data >= current.data:
-                previous = current
+            else:
                 current = current.right_child
+
+    def _find_node_with_parent(self, data):
+        """Finds a node with data and its parent, (None, None) if data not in
+        the tree. One `<` per level: the search goes left unless the node is
+        smaller (as `insert` does) and remembers the last node where it
+        turned left, which holds the smallest data >= the searched one, so
+        equality is checked once, at the end."""
+        current, previous = self.root, None
+        candidate = candidate_parent = None
+        while current:
+            if current.data < data:
+                previous, current = current, current.right_child
+            else:
+                candidate, candidate_parent = current, previous
+                previous, current = current, current.left_child
+        if candidate is not None and not data < candidate.data:
+            return candidate, candidate_parent
         return None, None
 
     def find_min(self):
@@ -166,6 +324,286 @@ class BST(object):
             current = current.right_child
         return current
 
+    def __len__(self):
+        return _size(self.root)
+
+    def __contains__(self, data):
+        return self.find(data) is not None
+
+    def __iter__(self):
+        return self.in_order()
+
+    def in_order(self, morris=False):
+        """Lazily yields data in sorted order.
+
+        By default an explicit stack (O(height) memory) is used. With
+        `morris=True` Morris traversal is used instead: the tree itself is
+        temporarily threaded (the rightmost node of each left subtree points
+        back to its ancestor), so the extra memory is O(1). The tree must
+        not be modified during the traversal; if the generator is closed
+        early it finishes the walk silently to remove all threads.
+
+        :param morris: use Morris traversal?
+        :type morris: bool
+        :Example:
+        >>> bst = BST()
+        >>> [bst.insert(i) for i in [5, 3, 7, 8, 6, 2, 4, 1]]
+        [None, None, None, None, None, None, None, None]
+        >>> list(bst.in_order()) == list(bst.in_order(morris=True))
+        True
+        """
+        if morris:
+            return self._in_order_morris()
+        return self.range()
+
+    def _in_order_morris(self):
+        current = self.root
+        done = False
+        try:
+            while current:
+                if current.left_child is None:
+                    yield current.data
+                    current = current.right_child
+                    continue
+                predecessor = current.left_child
+                while predecessor.right_child and predecessor.right_child is not current:
+                    predecessor = predecessor.right_child
+                if predecessor.right_child is None:  # thread and go left
+                    predecessor.right_child = current
+                    current = current.left_child
+                else:  # left subtree done, remove the thread
+                    predecessor.right_child = None
+                    yield current.data
+                    current = current.right_child
+            done = True
+        finally:
+            if not done:  # closed early: walk to the end to unthread
+                while current:
+                    if current.left_child is None:
+                        current = current.right_child
+                        continue
+                    predecessor = current.left_child
+                    while predecessor.right_child and predecessor.right_child is not current:
+                        predecessor = predecessor.right_child
+                    if predecessor.right_child is None:
+                        predecessor.right_child = current
+                        current = current.left_child
+                    else:
+                        predecessor.right_child = None
+                        current = current.right_child
+
+    def pre_order(self):
+        """Lazily yields data in pre-order (node, left, right) using an
+        explicit stack
+
+        :Example:
+        >>> bst = BST()
+        >>> [bst.insert(i) for i in [5, 3, 7, 2, 4]]
+        [None, None, None, None, None]
+        >>> list(bst.pre_order())
+        [5, 3, 2, 4, 7]
+        """
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            current = stack.pop()
+            yield current.data
+            if current.right_child is not None:
+                stack.append(current.right_child)
+            if current.left_child is not None:
+                stack.append(current.left_child)
+
+    def post_order(self):
+        """Lazily yields data in post-order (left, right, node) using an
+        explicit stack
+
+        :Example:
+        >>> bst = BST()
+        >>> [bst.insert(i) for i in [5, 3, 7, 2, 4]]
+        [None, None, None, None, None]
+        >>> list(bst.post_order())
+        [2, 4, 3, 7, 5]
+        """
+        stack = []
+        last_visited = None
+        current = self.root
+        while stack or current:
+            if current is not None:
+                stack.append(current)
+                current = current.left_child
+                continue
+            top = stack[-1]
+            if top.right_child is not None and top.right_child is not last_visited:
+                current = top.right_child
+            else:
+                yield top.data
+                last_visited = stack.pop()
+
+    def level_order(self):
+        """Lazily yields data level by level (breadth first); the queue holds
+        up to one level of the tree
+
+        :Example:
+        >>> bst = BST()
+        >>> [bst.insert(i) for i in [5, 3, 7, 2, 4]]
+        [None, None, None, None, None]
+        >>> list(bst.level_order())
+        [5, 3, 7, 2, 4]
+        """
+        queue = deque([self.root] if self.root is not None else [])
+        while queue:
+            current = queue.popleft()
+            yield current.data
+            if current.left_child is not None:
+                queue.append(current.left_child)
+            if current.right_child is not None:
+                queue.append(current.right_child)
+
+    def rank(self, data):
+        """Number of elements smaller than data, O(height)
+
+        :param data: data to be ranked (doesn't have to be in the tree)
+        :type data: must overload __lt__
+        :return: number of elements < data
+        :rtype: int
+        :Example:
+        >>> bst = BST()
+        >>> [bst.insert(i) for i in [5, 3, 7, 8, 6, 2, 4, 1]]
+        [None, None, None, None, None, None, None, None]
+        >>> bst.rank(5), bst.rank(100)
+        (4, 8)
+        """
+        rank = 0
+        current = self.root
+        while current:
+            if current.data < data:
+                rank += _size(current.left_child) + 1
+                current = current.right_child
+            else:
+                current = current.left_child
+        return rank
+
+    def select(self, k):
+        """Finds the k-th smallest element (counting from 0), O(height)
+
+        :param k: index of the element in sorted order
+        :type k: int
+        :raises IndexError: when k is out of range
+        :return: node with the k-th smallest data
+        :rtype: Node
+        :Example:
+        >>> bst = BST()
+        >>> [bst.insert(i) for i in [5, 3, 7, 8, 6, 2, 4, 1]]
+        [None, None, None, None, None, None, None, None]
+        >>> bst.select(0).data, bst.select(5).data
+        (1, 6)
+        """
+        if not 0 <= k < len(self):
+            raise IndexError(f'{k} out of range.')
+        current = self.root
+        while True:
+            left_size = _size(current.left_child)
+            if k < left_size:
+                current = current.left_child
+            elif k == left_size:
+                return current
+            else:
+                k -= left_size + 1
+                current = current.right_child
+
+    def count_range(self, lo, hi):
+        """Number of elements in the half-open range [lo, hi), O(height)
+
+        :Example:
+        >>> bst = BST()
+        >>> [bst.insert(i) for i in [5, 3, 7, 8, 6, 2, 4, 1]]
+        [None, None, None, None, None, None, None, None]
+        >>> bst.count_range(2, 6)
+        4
+        """
+        if not lo < hi:
+            return 0
+        return self.rank(hi) - self.rank(lo)
+
+    def _prefix_sum(self, data):
+        """Sum of elements smaller than data"""
+        total = 0
+        current = self.root
+        while current:
+            if current.data < data:
+                total += _total(current.left_child) + current.data
+                current = current.right_child
+            else:
+                current = current.left_child
+        return total
+
+    def sum_range(self, lo, hi):
+        """Sum of elements in the half-open range [lo, hi), O(height).
+        The tree must be created with `track_sums=True`.
+
+        :raises RuntimeError: when sums are not tracked
+        :Example:
+        >>> bst = BST(track_sums=True)
+        >>> [bst.insert(i) for i in [5, 3, 7, 8, 6, 2, 4, 1]]
+        [None, None, None, None, None, None, None, None]
+        >>> bst.sum_range(2, 6)
+        14
+        """
+        if not self.track_sums:
+            raise RuntimeError('Sums are tracked only with track_sums=True.')
+        if not lo < hi:
+            return 0
+        return self._prefix_sum(hi) - self._prefix_sum(lo)
+
+    def range(self, lo=None, hi=None):
+        """Lazily yields data from the half-open range [lo, hi) in order
+        (iterative in-order traversal skipping subtrees out of the range).
+        `None` means unbounded.
+
+        :Example:
+        >>> bst = BST()
+        >>> [bst.insert(i) for i in [5, 3, 7, 8, 6, 2, 4, 1]]
+        [None, None, None, None, None, None, None, None]
+        >>> list(bst.range(2, 6))
+        [2, 3, 4, 5]
+        """
+        stack = []
+        current = self.root
+        while stack or current:
+            if current is not None:
+                if lo is None or not current.data < lo:
+                    stack.append(current)
+                    current = current.left_child
+                else:  # current and its left subtree are below lo
+                    current = current.right_child
+                continue
+            current = stack.pop()
+            if hi is not None and not current.data < hi:
+                return
+            yield current.data
+            current = current.right_child
+
+    def height(self):
+        """Number of levels in the tree (iterative, so degenerate trees are
+        fine)
+
+        :return: height of the tree, 0 for an empty tree
+        :rtype: int
+        :Example:
+        >>> bst = BST()
+        >>> [bst.insert(i) for i in range(5)]
+        [None, None, None, None, None]
+        >>> bst.height()
+        5
+        """
+        height = 0
+        level = [self.root] if self.root is not None else []
+        while level:
+            height += 1
+            level = [child for node in level
+                     for child in (node.left_child, node.right_child)
+                     if child is not None]
+        return height
+
     def find(self, data):
         """Finds the node with data, returns None if data not in the tree
 
@@ -194,6 +632,741 @@ class BST(object):
                 current = current.right_child
         return None
 
+    def floor(self, data):
+        """Finds the node with the largest data <= `data` (one comparison per
+        level)
+
+        :return: node or None if there is no such node
+        :rtype: Node
+        :Example:
+        >>> bst = BST.from_sorted([1, 3, 5])
+        >>> bst.floor(4).data, bst.floor(5).data, bst.floor(0)
+        (3, 5, None)
+        """
+        candidate = None
+        current = self.root
+        while current:
+            if data < current.data:
+                current = current.left_child
+            else:
+                candidate = current
+                current = current.right_child
+        return candidate
+
+    def ceiling(self, data):
+        """Finds the node with the smallest data >= `data`
+
+        :return: node or None if there is no such node
+        :rtype: Node
+        :Example:
+        >>> bst = BST.from_sorted([1, 3, 5])
+        >>> bst.ceiling(2).data, bst.ceiling(3).data, bst.ceiling(6)
+        (3, 3, None)
+        """
+        candidate = None
+        current = self.root
+        while current:
+            if current.data < data:
+                current = current.right_child
+            else:
+                candidate = current
+                current = current.left_child
+        return candidate
+
+    def predecessor(self, data):
+        """Finds the node with the largest data < `data`
+
+        :return: node or None if there is no such node
+        :rtype: Node
+        :Example:
+        >>> bst = BST.from_sorted([1, 3, 5])
+        >>> bst.predecessor(3).data, bst.predecessor(1)
+        (1, None)
+        """
+        candidate = None
+        current = self.root
+        while current:
+            if current.data < data:
+                candidate = current
+                current = current.right_child
+            else:
+                current = current.left_child
+        return candidate
+
+    def successor(self, data):
+        """Finds the node with the smallest data > `data`
+
+        :return: node or None if there is no such node
+        :rtype: Node
+        :Example:
+        >>> bst = BST.from_sorted([1, 3, 5])
+        >>> bst.successor(3).data, bst.successor(5)
+        (5, None)
+        """
+        candidate = None
+        current = self.root
+        while current:
+            if data < current.data:
+                candidate = current
+                current = current.left_child
+            else:
+                current = current.right_child
+        return candidate
+
+
+class AVLNode(Node):
+    def __init__(self, data):
+        super().__init__(data)
+        self.height = 1
+
+
+def _height(node):
+    return node.height if node is not None else 0
+
+
+class AVLTree(BST):
+    """Self-balancing BST (AVL tree): heights of the subtrees of every node
+    differ by at most 1, which keeps the height below 1.44 log2(n), so
+    `insert`, `remove` and `find` are O(log n) even for sorted input.
+    For details please visit: https://en.wikipedia.org/wiki/AVL_tree
+
+    Recursion is only as deep as the tree, i.e. O(log n).
+    """
+    def insert(self, data):
+        """Inserts data to the tree and rebalances it
+
+        :param data: data to be inserted
+        :type data: must overload __lt__, __gt__
+
+        :Example:
+        >>> tree = AVLTree()
+        >>> [tree.insert(i) for i in [1, 2, 3]]
+        [None, None, None]
+        >>> tree.root.data, tree.root.left_child.data, tree.root.right_child.data
+        (2, 1, 3)
+        """
+        self.root = self._insert(self.root, data)
+
+    def _insert(self, node, data):
+        if node is None:
+            return self._new_node(data)
+        if data <= node.data:
+            node.left_child = self._insert(node.left_child, data)
+        else:
+            node.right_child = self._insert(node.right_child, data)
+        return self._rebalance(node)
+
+    def remove(self, data):
+        """Removes node containing data from the tree and rebalances it
+
+        :param data: data to be removed
+        :type data: must overload __lt__, __gt__
+        :Example:
+        >>> tree = AVLTree()
+        >>> [tree.insert(i) for i in [1, 2, 3, 4]]
+        [None, None, None, None]
+        >>> tree.remove(1)
+        >>> tree.root.data, tree.root.left_child.data, tree.root.right_child.data
+        (3, 2, 4)
+        """
+        self.root = self._remove(self.root, data)
+
+    def _remove(self, node, data):
+        if node is None:
+            return None
+        if data == node.data:
+            if node.left_child is None:
+                return node.right_child
+            if node.right_child is None:
+                return node.left_child
+            # Two children: replace data with the successor (the leftmost
+            # node of the right subtree) and remove the successor.
+            successor = node.right_child
+            while successor.left_child:
+                successor = successor.left_child
+            node.data = successor.data
+            node.right_child = self._remove_min(node.right_child)
+        elif data < node.data:
+            node.left_child = self._remove(node.left_child, data)
+        else:
+            node.right_child = self._remove(node.right_child, data)
+        return self._rebalance(node)
+
+    def _remove_min(self, node):
+        if node.left_child is None:
+            return node.right_child
+        node.left_child = self._remove_min(node.left_child)
+        return self._rebalance(node)
+
+    NODE_CLASS = AVLNode
+
+    def _update(self, node):
+        super()._update(node)
+        node.height = 1 + max(_height(node.left_child), _height(node.right_child))
+
+    def _rotate_left(self, node):
+        """
+                node                    right
+            a           right   ->    node      c
+                      b       c     a      b
+        """
+        right = node.right_child
+        node.right_child = right.left_child
+        right.left_child = node
+        self._update(node)
+        self._update(right)
+        return right
+
+    def _rotate_right(self, node):
+        """
+                    node                left
+                left        c   ->    a       node
+              a      b                      b      c
+        """
+        left = node.left_child
+        node.left_child = left.right_child
+        left.right_child = node
+        self._update(node)
+        self._update(left)
+        return left
+
+    def _rebalance(self, node):
+        self._update(node)
+        balance = _height(node.left_child) - _height(node.right_child)
+        if balance > 1:
+            left = node.left_child
+            if _height(left.left_child) < _height(left.right_child):
+                node.left_child = self._rotate_left(left)
+            return self._rotate_right(node)
+        if balance < -1:
+            right = node.right_child
+            if _height(right.right_child) < _height(right.left_child):
+                node.right_child = self._rotate_right(right)
+            return self._rotate_left(node)
+        return node
+
+    def height(self):
+        """Number of levels in the tree, O(1)
+
+        :return: height of the tree, 0 for an empty tree
+        :rtype: int
+        """
+        return _height(self.root)
+
+
+class MapNode(Node):
+    """Tree node of `TreeMap`: `data` is the key, `value` the payload"""
+    def __init__(self, data, value=None):
+        super().__init__(data)
+        self.value = value
+
+
+class TreeMap(BST):
+    """Ordered map: BST with a key (`data`) and a separate value per node.
+
+    Descending compares keys only, with one `<` per level; equality is
+    checked once, against the last node where the search turned right:
+    that node holds the largest key <= the searched one, so it is the match
+    if there is any. Keys are unique, setting an existing key updates its
+    value. All `BST` queries (`rank`, `select`, `range`, `floor`, ...)
+    work on keys.
+    """
+    NODE_CLASS = MapNode
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        if self.find(key) is None:
+            raise KeyError(f"{key} is not in the tree.")
+        self.remove(key)
+
+    def __contains__(self, key):
+        return self.find(key) is not None
+
+    def find(self, key):
+        """Finds the node with key, returns None if key not in the tree
+
+        :param key: key
+        :type key: must overload __lt__
+        :return: node with key
+        :rtype: MapNode
+        """
+        node = self.floor(key)
+        if node is not None and not node.data < key:
+            return node
+        return None
+
+    def get(self, key):
+        """Gets the value saved with key.
+
+        :param key: key
+        :type key: must overload __lt__
+        :return: value
+        :rtype: object
+        :raises: KeyError
+
+        :Example:
+        >>> tree_map = TreeMap()
+        >>> tree_map['foo'] = 1
+        >>> tree_map.get('foo')
+        1
+        """
+        node = self.find(key)
+        if node is None:
+            raise KeyError(f"{key} is not in the tree.")
+        return node.value
+
+    def set(self, key, value=None):
+        """Sets the key with value. If key already exists its value is
+        updated, otherwise a new node is inserted.
+
+        :param key: key
+        :type key: must overload __lt__
+        :param value: value
+        :type value: object
+
+        :Example:
+        >>> tree_map = TreeMap()
+        >>> tree_map.set(2, 'b')
+        >>> tree_map.set(1, 'a')
+        >>> tree_map.set(2, 'B')
+        >>> [(node.data, node.value) for node in map(tree_map.select, range(2))]
+        [(1, 'a'), (2, 'B')]
+        """
+        path = []
+        candidate = None
+        current = self.root
+        while current:
+            path.append(current)
+            if key < current.data:
+                current = current.left_child
+            else:
+                candidate = current
+                current = current.right_child
+        if candidate is not None and not candidate.data < key:
+            candidate.value = value
+            return
+        node = self._new_node(key)
+        node.value = value
+        if not path:
+            self.root = node
+            return
+        for current in path:
+            current.size += 1
+            if self.track_sums:
+                current.total += key
+        parent = path[-1]
+        if key < parent.data:
+            parent.left_child = node
+        else:
+            parent.right_child = node
+
+    def insert(self, key, value=None):
+        """Same as `set`"""
+        self.set(key, value)
+
+    def _replace_data(self, node, source):
+        node.data = source.data
+        node.value = source.value
+
+    @classmethod
+    def from_sorted(cls, items, **kwargs):
+        """Builds a perfectly balanced map from (key, value) pairs sorted by
+        key in O(n). Of equal keys only the last pair is kept, as if the
+        pairs were `set` one by one.
+
+        :param items: (key, value) pairs sorted by key
+        :type items: iterable
+        :param kwargs: passed to the constructor (e.g. `track_sums`)
+        :raises ValueError: when keys are not sorted or items are not pairs
+        :return: new map
+        :rtype: TreeMap
+
+        :Example:
+        >>> tree_map = TreeMap.from_sorted([(1, 'a'), (2, 'b'), (2, 'B')])
+        >>> list(tree_map.items())
+        [(1, 'a'), (2, 'B')]
+        """
+        items = cls._last_of_equal_keys(items)
+        tree = cls(**kwargs)
+        tree.root = tree._build(items, 0, len(items))
+        return tree
+
+    @classmethod
+    def from_iterable(cls, items, **kwargs):
+        """Sorts (key, value) pairs by key and builds a perfectly balanced
+        map from them in O(n log n). Of equal keys the last pair wins.
+
+        :param items: (key, value) pairs
+        :type items: iterable
+        :param kwargs: passed to the constructor (e.g. `track_sums`)
+        :return: new map
+        :rtype: TreeMap
+
+        :Example:
+        >>> tree_map = TreeMap.from_iterable([(2, 'b'), (1, 'a'), (2, 'B')])
+        >>> list(tree_map.items())
+        [(1, 'a'), (2, 'B')]
+        """
+        # The sort is stable, so equal keys keep their order.
+        return cls.from_sorted(sorted(items, key=itemgetter(0)), **kwargs)
+
+    @staticmethod
+    def _last_of_equal_keys(items):
+        unique = []
+        for item in items:
+            try:
+                key, value = item
+            except (TypeError, ValueError):
+                raise ValueError(
+                    f"{item} is not a (key, value) pair.") from None
+            if unique and key < unique[-1][0]:
+                raise ValueError('Keys must be sorted.')
+            if unique and not unique[-1][0] < key:
+                unique[-1] = (key, value)
+            else:
+                unique.append((key, value))
+        return unique
+
+    def _build(self, items, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        key, value = items[mid]
+        node = self._new_node(key)
+        node.value = value
+        node.left_child = self._build(items, lo, mid)
+        node.right_child = self._build(items, mid + 1, hi)
+        self._update(node)
+        return node
+
+    def merge(self, other):
+        """Adds all items from `other` (which is left unchanged) in
+        O(n + m). For keys in both maps the value from `other` is kept.
+
+        :param other: map to be merged in
+        :type other: TreeMap
+
+        :Example:
+        >>> tree_map = TreeMap.from_sorted([('a', 1), ('b', 2)])
+        >>> tree_map.merge(TreeMap.from_sorted([('a', 10), ('c', 3)]))
+        >>> list(tree_map.items())
+        [('a', 10), ('b', 2), ('c', 3)]
+        """
+        # heapq.merge is stable: of equal keys, the one from other is last.
+        items = self._last_of_equal_keys(heapq.merge(
+            self.items(), other.items(), key=itemgetter(0)))
+        self.root = self._build(items, 0, len(items))
+
+    def items(self):
+        """Lazily yields (key, value) pairs in order of keys.
+
+        :Example:
+        >>> tree_map = TreeMap()
+        >>> tree_map[2], tree_map[1] = 'b', 'a'
+        >>> list(tree_map.items())
+        [(1, 'a'), (2, 'b')]
+        """
+        stack = []
+        current = self.root
+        while stack or current:
+            if current is not None:
+                stack.append(current)
+                current = current.left_child
+                continue
+            current = stack.pop()
+            yield current.data, current.value
+            current = current.right_child
+
+
+class PersistentAVLTree(AVLTree):
+    """Persistent (path-copying) AVL tree for many readers and one writer.
+
+    Published nodes are never modified: `insert` and `remove` copy the
+    nodes on the path from the root (and the ones touched by rotations),
+    build a new version of the tree and publish it by assigning `root`,
+    which is atomic. Readers never lock; every read method starts from the
+    root it sees and walks nodes that cannot change, and `snapshot()`
+    returns a tree pinned to the current version for multi-step
+    consistency (e.g. `len` followed by `select`). Writers are serialized
+    with a lock. Each update costs O(log n) new nodes.
+    """
+    def __init__(self, track_sums=False):
+        super().__init__(track_sums)
+        self._write_lock = threading.Lock()
+
+    def snapshot(self):
+        """Returns the current version of the tree. It never changes;
+        modifying it creates a separate branch and doesn't affect `self`.
+
+        :rtype: PersistentAVLTree
+        :Example:
+        >>> tree = PersistentAVLTree.from_sorted([1, 2, 3])
+        >>> snapshot = tree.snapshot()
+        >>> tree.insert(4)
+        >>> list(snapshot), list(tree)
+        ([1, 2, 3], [1, 2, 3, 4])
+        """
+        snapshot = type(self)(self.track_sums)
+        snapshot.root = self.root
+        return snapshot
+
+    def insert(self, data):
+        """Inserts data and publishes the new version of the tree
+
+        :param data: data to be inserted
+        :type data: must overload __lt__, __gt__
+        """
+        with self._write_lock:
+            self.root = self._insert(self.root, data)
+
+    def remove(self, data):
+        """Removes data and publishes the new version of the tree
+
+        :param data: data to be removed
+        :type data: must overload __lt__, __gt__
+        """
+        with self._write_lock:
+            self.root = self._remove(self.root, data)
+
+    def merge(self, other):
+        """Adds all data from `other` and publishes the rebuilt tree"""
+        with self._write_lock:
+            data = list(heapq.merge(self.range(), other.range()))
+            self.root = self._build(data, 0, len(data))
+
+    def in_order(self, morris=False):
+        """Lazily yields data in sorted order. Morris traversal is not
+        available: it temporarily modifies nodes shared by all versions.
+
+        :raises RuntimeError: when `morris` is True
+        """
+        if morris:
+            raise RuntimeError('Morris traversal would modify shared nodes.')
+        return super().in_order()
+
+    def _insert(self, node, data):
+        if node is not None:
+            node = copy.copy(node)
+        return super()._insert(node, data)
+
+    def _remove(self, node, data):
+        if node is not None:
+            node = copy.copy(node)
+        return super()._remove(node, data)
+
+    def _remove_min(self, node):
+        return super()._remove_min(copy.copy(node))
+
+    def _rotate_left(self, node):
+        node = copy.copy(node)
+        node.right_child = copy.copy(node.right_child)
+        return super()._rotate_left(node)
+
+    def _rotate_right(self, node):
+        node = copy.copy(node)
+        node.left_child = copy.copy(node.left_child)
+        return super()._rotate_right(node)
+
+
+def benchmark_balanced_tree(n=1000000, n_unbalanced=5000, seed=0):
+    """Compares `BST` and `AVLTree` filled with sorted and random keys:
+    height and seconds per `insert` / `find`.
+
+    `BST` degenerates to a list on sorted keys (O(n^2) build), so in that
+    case only `n_unbalanced` keys are used.
+
+    :param n: number of keys
+    :type n: int
+    :param n_unbalanced: number of keys for `BST` with sorted keys
+    :type n_unbalanced: int
+    :param seed: random seed
+    :type seed: int
+    :return: {(tree name, order): (number of keys, height,
+        seconds per insert, seconds per find)}
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_balanced_tree(1000, 100)
+    >>> results[('AVLTree', 'sorted')][:2]
+    (1000, 10)
+    """
+    rng = random.Random(seed)
+    random_keys = list(range(n))
+    rng.shuffle(random_keys)
+    results = dict()
+    for tree_class in (BST, AVLTree):
+        for order, keys in [('sorted', range(n)), ('random', random_keys)]:
+            if tree_class is BST and order == 'sorted':
+                keys = range(min(n, n_unbalanced))
+            tree = tree_class()
+            start = time.perf_counter()
+            for key in keys:
+                tree.insert(key)
+            insert_time = (time.perf_counter() - start) / len(keys)
+            queries = rng.sample(keys, min(len(keys), 10000))
+            start = time.perf_counter()
+            for key in queries:
+                tree.find(key)
+            find_time = (time.perf_counter() - start) / len(queries)
+            results[(tree_class.__name__, order)] = (
+                len(keys), tree.height(), insert_time, find_time)
+    return results
+
+
+def benchmark_tree_map(n=100000, seed=0):
+    """Compares lookups in `TreeMap` with the tuple-wrapping approach: a
+    `BST` of (key, payload) tuples searched with `BST.find`.
+
+    :param n: number of keys
+    :type n: int
+    :param seed: random seed
+    :type seed: int
+    :return: seconds per lookup: (TreeMap, BST with tuples)
+    :rtype: tuple
+
+    :Example:
+    >>> len(benchmark_tree_map(100))
+    2
+    """
+    rng = random.Random(seed)
+    keys = [f'key-{i:08d}' for i in range(n)]
+    rng.shuffle(keys)
+    tree_map = TreeMap()
+    bst = BST()
+    for key in keys:
+        tree_map[key] = {'key': key}
+        bst.insert((key, {'key': key}))
+    queries = rng.sample(keys, min(n, 10000))
+    start = time.perf_counter()
+    for key in queries:
+        _ = tree_map[key]
+    map_time = (time.perf_counter() - start) / len(queries)
+    tuples = [(key, {'key': key}) for key in queries]
+    start = time.perf_counter()
+    for item in tuples:
+        _ = bst.find(item)
+    bst_time = (time.perf_counter() - start) / len(queries)
+    return map_time, bst_time
+
+
+def benchmark_traversal(n=10000000):
+    """Streams all traversals over a balanced tree of `n` nodes and measures
+    time and peak memory allocated during each traversal (the tree itself
+    is built before measuring).
+
+    :param n: number of nodes
+    :type n: int
+    :return: {traversal: (seconds, peak bytes)}
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_traversal(1000)
+    >>> results['in_order (Morris)'][1] < results['level_order'][1]
+    True
+    """
+    bst = BST.from_sorted(range(n))
+    traversals = {
+        'in_order (stack)': bst.in_order,
+        'in_order (Morris)': lambda: bst.in_order(morris=True),
+        'pre_order': bst.pre_order,
+        'post_order': bst.post_order,
+        'level_order': bst.level_order,
+    }
+    results = dict()
+    for name, traversal in traversals.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        for _ in traversal():
+            pass
+        elapsed = time.perf_counter() - start
+        results[name] = (elapsed, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return results
+
+
+def benchmark_concurrent_readers(n=100000, n_readers=16, duration=2.0,
+                                 range_size=100, seed=0):
+    """Measures reader throughput (`find` and range scans of `range_size`
+    keys) with `n_readers` reader threads and one writer thread
+    (alternating `insert`/`remove`), for `PersistentAVLTree` read without
+    locks and for `AVLTree` guarded by one global lock.
+
+    :param n: number of keys
+    :type n: int
+    :param n_readers: number of reader threads
+    :type n_readers: int
+    :param duration: seconds each variant runs
+    :type duration: float
+    :param range_size: number of keys in each range scan
+    :type range_size: int
+    :param seed: random seed
+    :type seed: int
+    :return: reader operations per second:
+        (PersistentAVLTree, locked AVLTree)
+    :rtype: tuple
+
+    :Example:
+    >>> rates = benchmark_concurrent_readers(1000, 2, duration=0.05)
+    >>> len(rates)
+    2
+    """
+    results = []
+    for tree_class, lock in [(PersistentAVLTree, None),
+                             (AVLTree, threading.Lock())]:
+        tree = tree_class.from_sorted(range(0, 2 * n, 2))
+        stop = threading.Event()
+        counts = [0] * n_readers
+
+        def read(i):
+            rng = random.Random(seed + i)
+            while not stop.is_set():
+                key = rng.randrange(2 * n)
+                if lock is None:
+                    snapshot = tree.snapshot()
+                    snapshot.find(key)
+                    for _ in zip(range(range_size), snapshot.range(key)):
+                        pass
+                else:
+                    with lock:
+                        tree.find(key)
+                        for _ in zip(range(range_size), tree.range(key)):
+                            pass
+                counts[i] += 1
+
+        def write():
+            rng = random.Random(seed)
+            while not stop.is_set():
+                key = 2 * rng.randrange(n) + 1  # odd keys are not in the tree
+                if lock is None:
+                    tree.insert(key)
+                    tree.remove(key)
+                else:
+                    with lock:
+                        tree.insert(key)
+                    with lock:
+                        tree.remove(key)
+
+        threads = [threading.Thread(target=read, args=(i,))
+                   for i in range(n_readers)]
+        threads.append(threading.Thread(target=write))
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        # Waking up may take a while with many threads contending for the
+        # GIL, so the actual elapsed time is measured.
+        elapsed = time.perf_counter() - start
+        for thread in threads:
+            thread.join()
+        results.append(sum(counts) / elapsed)
+    return tuple(results)
+
 
 class TestBST(unittest.TestCase):
     """Test cases taken from:
@@ -579,4 +1752,538 @@ class TestBST(unittest.TestCase):
         test_set = [(6, node.left_child.data), (8, node.right_child.data)]
         self._test_set(test_set)
 
+    def test_height(self):
+        data_set = [([], 0), ([5], 1), ([5, 3, 7, 8, 6, 2, 4, 1], 4), (range(50), 50)]
+        for keys, expected in data_set:
+            bst = BST()
+            [bst.insert(i) for i in keys]
+            with self.subTest(keys=keys, expected=expected):
+                self.assertEqual(expected, bst.height())
+
+
+class TestAVLTree(unittest.TestCase):
+    def _in_order(self, node):
+        if node is None:
+            return []
+        return self._in_order(node.left_child) + [node.data] + self._in_order(node.right_child)
+
+    def _assert_balanced(self, node):
+        """Returns height of the subtree, checks stored heights/balance"""
+        if node is None:
+            return 0
+        left = self._assert_balanced(node.left_child)
+        right = self._assert_balanced(node.right_child)
+        self.assertLessEqual(abs(left - right), 1)
+        self.assertEqual(1 + max(left, right), node.height)
+        return node.height
+
+    def test_insert_sorted(self):
+        tree = AVLTree()
+        [tree.insert(i) for i in range(1023)]
+        with self.subTest('height'):
+            self.assertEqual(10, tree.height())
+        with self.subTest('balanced'):
+            self._assert_balanced(tree.root)
+        with self.subTest('order'):
+            self.assertListEqual(list(range(1023)), self._in_order(tree.root))
+
+    def test_rotations(self):
+        data_set = [  # keys, root, left, right
+            ([1, 2, 3], 2, 1, 3),  # right-right
+            ([3, 2, 1], 2, 1, 3),  # left-left
+            ([3, 1, 2], 2, 1, 3),  # left-right
+            ([1, 3, 2], 2, 1, 3),  # right-left
+        ]
+        for keys, root, left, right in data_set:
+            tree = AVLTree()
+            [tree.insert(i) for i in keys]
+            actual = tree.root.data, tree.root.left_child.data, tree.root.right_child.data
+            with self.subTest(keys=keys):
+                self.assertEqual((root, left, right), actual)
+
+    def test_find(self):
+        tree = AVLTree()
+        [tree.insert(i) for i in range(100)]
+        data_set = [
+            (42, tree.find(42).data),
+            (None, tree.find(100)),
+            (0, tree.find_min().data),
+            (99, tree.find_max().data),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_remove_random(self):
+        rng = random.Random(0)
+        keys = [rng.randrange(200) for _ in range(500)]
+        tree = AVLTree()
+        [tree.insert(i) for i in keys]
+        expected = sorted(keys)
+        for key in rng.sample(keys, 300) + [1000]:
+            tree.remove(key)
+            if key in expected:
+                expected.remove(key)
+        with self.subTest('balanced'):
+            self._assert_balanced(tree.root)
+        with self.subTest('order'):
+            self.assertListEqual(expected, self._in_order(tree.root))
+
+    def test_remove_all(self):
+        tree = AVLTree()
+        [tree.insert(i) for i in range(10)]
+        [tree.remove(i) for i in range(10)]
+        self.assertIsNone(tree.root)
+
+    def test_benchmark(self):
+        results = benchmark_balanced_tree(300, 50)
+        data_set = [
+            ((50, 50), results[('BST', 'sorted')][:2]),
+            ((300, 9), results[('AVLTree', 'sorted')][:2]),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+
+class TestOrderStatistics(unittest.TestCase):
+    KEYS = [5, 3, 7, 8, 6, 2, 4, 1, 5, 9, 0, 3]
+
+    def _trees(self, keys):
+        for tree_class in (BST, AVLTree):
+            tree = tree_class(track_sums=True)
+            [tree.insert(i) for i in keys]
+            yield tree
+
+    def _assert_augmented(self, tree, node):
+        if node is None:
+            return 0, 0
+        left_size, left_total = self._assert_augmented(tree, node.left_child)
+        right_size, right_total = self._assert_augmented(tree, node.right_child)
+        self.assertEqual(1 + left_size + right_size, node.size)
+        self.assertEqual(left_total + node.data + right_total, node.total)
+        return node.size, node.total
+
+    def test_sizes_after_insert_and_remove(self):
+        rng = random.Random(0)
+        keys = [rng.randrange(100) for _ in range(300)]
+        for tree in self._trees(keys):
+            for key in keys[:150] + [1000]:
+                tree.remove(key)
+            with self.subTest(tree=type(tree).__name__):
+                self._assert_augmented(tree, tree.root)
+                self.assertEqual(150, len(tree))
+
+    def test_rank(self):
+        expected_keys = sorted(self.KEYS)
+        for tree in self._trees(self.KEYS):
+            for data in range(-1, 12):
+                expected = sum(1 for k in expected_keys if k < data)
+                with self.subTest(tree=type(tree).__name__, data=data):
+                    self.assertEqual(expected, tree.rank(data))
+
+    def test_select(self):
+        expected_keys = sorted(self.KEYS)
+        for tree in self._trees(self.KEYS):
+            actual = [tree.select(k).data for k in range(len(self.KEYS))]
+            with self.subTest(tree=type(tree).__name__):
+                self.assertListEqual(expected_keys, actual)
+                with self.assertRaises(IndexError):
+                    tree.select(len(self.KEYS))
+
+    def test_count_and_sum_range(self):
+        data_set = [(2, 6), (0, 100), (5, 6), (6, 5), (-10, 0), (3, 4)]
+        for tree in self._trees(self.KEYS):
+            for lo, hi in data_set:
+                in_range = [k for k in self.KEYS if lo <= k < hi]
+                with self.subTest(tree=type(tree).__name__, lo=lo, hi=hi):
+                    self.assertEqual(len(in_range), tree.count_range(lo, hi))
+                    self.assertEqual(sum(in_range), tree.sum_range(lo, hi))
+
+    def test_sum_range_raises(self):
+        bst = BST()
+        bst.insert(1)
+        with self.assertRaises(RuntimeError):
+            bst.sum_range(0, 2)
+
+    def test_range(self):
+        data_set = [(2, 6), (None, 3), (7, None), (None, None), (100, 200)]
+        for tree in self._trees(self.KEYS):
+            for lo, hi in data_set:
+                expected = [k for k in sorted(self.KEYS)
+                            if (lo is None or lo <= k) and (hi is None or k < hi)]
+                with self.subTest(tree=type(tree).__name__, lo=lo, hi=hi):
+                    self.assertListEqual(expected, list(tree.range(lo, hi)))
+
+
+class TestBulkConstruction(unittest.TestCase):
+    def test_from_sorted_balanced(self):
+        for n in [0, 1, 2, 7, 8, 1000]:
+            bst = BST.from_sorted(range(n), track_sums=True)
+            with self.subTest(n=n):
+                self.assertEqual(n.bit_length(), bst.height())
+                self.assertListEqual(list(range(n)), list(bst.range()))
+                self.assertEqual(n, len(bst))
+                self.assertEqual(sum(range(n)), bst.sum_range(0, n))
+
+    def test_from_sorted_raises(self):
+        with self.assertRaises(ValueError):
+            BST.from_sorted([1, 3, 2])
+
+    def test_from_iterable(self):
+        keys = [5, 3, 7, 8, 6, 2, 4, 1, 5]
+        bst = BST.from_iterable(keys)
+        data_set = [
+            (sorted(keys), list(bst.range())),
+            (4, bst.height()),
+            (5, bst.select(4).data),
+            (7, bst.find(7).data),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_avl_from_sorted(self):
+        tree = AVLTree.from_sorted(range(100))
+        with self.subTest('node type'):
+            self.assertIsInstance(tree.root, AVLNode)
+        with self.subTest('heights'):
+            self.assertEqual(7, tree.root.height)
+        for i in range(100, 200):  # must stay balanced afterwards
+            tree.insert(i)
+        for i in range(0, 150, 2):
+            tree.remove(i)
+        stack = [tree.root]
+        while stack:
+            node = stack.pop()
+            balance = _height(node.left_child) - _height(node.right_child)
+            self.assertLessEqual(abs(balance), 1)
+            stack += [c for c in (node.left_child, node.right_child) if c]
+        self.assertListEqual(
+            list(range(1, 150, 2)) + list(range(150, 200)), list(tree.range()))
+
+    def test_insert_remove_after_build(self):
+        bst = BST.from_sorted([1, 2, 3, 4, 5, 6, 7])
+        bst.insert(4)
+        bst.remove(2)
+        data_set = [
+            ([1, 3, 4, 4, 5, 6, 7], list(bst.range())),
+            (7, len(bst)),
+            (2, bst.rank(4)),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_merge(self):
+        bst = BST.from_iterable([5, 1, 9], track_sums=True)
+        other = BST.from_iterable([4, 1, 10])
+        bst.merge(other)
+        data_set = [
+            ([1, 1, 4, 5, 9, 10], list(bst.range())),
+            ([1, 4, 10], list(other.range())),
+            (3, bst.height()),
+            (30, bst.sum_range(0, 100)),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+
+class TestTreeMap(unittest.TestCase):
+    def test_set_get(self):
+        tree_map = TreeMap()
+        for key in [5, 3, 7, 8, 6, 2, 4, 1]:
+            tree_map[key] = str(key)
+        tree_map[7] = 'seven'
+        data_set = [
+            ('5', tree_map[5]),
+            ('seven', tree_map.get(7)),
+            (8, len(tree_map)),
+            (True, 1 in tree_map),
+            (False, 9 in tree_map),
+            ([1, 2, 3, 4, 5, 6, 7, 8], list(tree_map.range())),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+        with self.assertRaises(KeyError):
+            _ = tree_map[9]
+
+    def test_delete(self):
+        tree_map = TreeMap(track_sums=True)
+        for key in range(10):
+            tree_map[key] = -key
+        del tree_map[3]
+        tree_map.remove(100)  # like BST.remove, ignores missing keys
+        data_set = [
+            (False, 3 in tree_map),
+            (9, len(tree_map)),
+            (42, tree_map.sum_range(0, 10)),
+            (-4, tree_map[4]),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+        with self.assertRaises(KeyError):
+            del tree_map[3]
+
+    def test_delete_node_with_two_children(self):
+        tree_map = TreeMap()
+        for key in [5, 3, 8, 7, 9]:
+            tree_map[key] = str(key)
+        del tree_map[5]  # the root, replaced with its successor 7
+        expected = [(3, '3'), (7, '7'), (8, '8'), (9, '9')]
+        actual = [(key, tree_map[key]) for key in tree_map.in_order()]
+        self.assertEqual(expected, actual)
+
+    def test_find_node_with_parent_duplicates(self):
+        bst = BST()
+        for data in [5, 3, 5, 8, 5]:
+            bst.insert(data)
+        node, parent = bst._find_node_with_parent(5)
+        with self.subTest('found'):
+            self.assertEqual(5, node.data)
+            self.assertTrue(parent is None or node in
+                            (parent.left_child, parent.right_child))
+        for _ in range(3):
+            bst.remove(5)
+        with self.subTest('removed'):
+            self.assertEqual(([3, 8], 2), (list(bst.range()), len(bst)))
+
+    def test_neighbours(self):
+        keys = [10, 20, 30, 40]
+        tree_map = TreeMap.from_sorted((key, str(key)) for key in keys)
+        for tree in [BST.from_sorted(keys), AVLTree.from_sorted(keys), tree_map]:
+            data_set = [  # method, argument, expected
+                (tree.floor, 25, 20), (tree.floor, 20, 20), (tree.floor, 5, None),
+                (tree.ceiling, 25, 30), (tree.ceiling, 30, 30), (tree.ceiling, 45, None),
+                (tree.predecessor, 20, 10), (tree.predecessor, 10, None),
+                (tree.predecessor, 45, 40),
+                (tree.successor, 20, 30), (tree.successor, 40, None),
+                (tree.successor, 5, 10),
+            ]
+            for method, argument, expected in data_set:
+                node = method(argument)
+                actual = node.data if node is not None else None
+                with self.subTest(tree=type(tree).__name__, method=method.__name__,
+                                  argument=argument):
+                    self.assertEqual(expected, actual)
+
+    def test_bulk_construction_keeps_values(self):
+        data_set = [
+            ([(1, 'a'), (2, 'b'), (3, 'c')],
+             TreeMap.from_sorted([(1, 'a'), (2, 'b'), (3, 'c')])),
+            ([(1, 'a'), (2, 'B'), (3, 'c')],
+             TreeMap.from_sorted([(1, 'a'), (2, 'b'), (2, 'B'), (3, 'c')])),
+            ([(1, 'a'), (2, 'B'), (3, 'c')],
+             TreeMap.from_iterable([(3, 'c'), (2, 'b'), (1, 'a'), (2, 'B')])),
+        ]
+        for expected, tree_map in data_set:
+            with self.subTest(expected=expected):
+                self.assertEqual(expected, list(tree_map.items()))
+                self.assertEqual(len(expected), len(tree_map))
+
+    def test_from_sorted_raises(self):
+        data_set = [
+            ('not sorted', [(2, 'b'), (1, 'a')]),
+            ('bare keys', [1, 2]),
+        ]
+        for name, items in data_set:
+            with self.subTest(name):
+                with self.assertRaises(ValueError):
+                    TreeMap.from_sorted(items)
+
+    def test_merge(self):
+        tree_map = TreeMap.from_sorted([('a', 1), ('b', 2)])
+        other = TreeMap.from_iterable([('c', 3), ('a', 10)])
+        tree_map.merge(other)
+        data_set = [
+            ([('a', 10), ('b', 2), ('c', 3)], list(tree_map.items())),
+            (3, len(tree_map)),
+            ([('a', 10), ('c', 3)], list(other.items())),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+        del tree_map['a']
+        with self.subTest('deleted'):
+            self.assertNotIn('a', tree_map)
+
+    def test_benchmark(self):
+        self.assertEqual(2, len(benchmark_tree_map(200)))
+
+
+class TestTraversals(unittest.TestCase):
+    """Considering case:
+                    5
+            3               7
+        2       4      6         8
+    1
+    """
+    KEYS = [5, 3, 7, 8, 6, 2, 4, 1]
+
+    def setUp(self):
+        self.bst = BST()
+        [self.bst.insert(i) for i in self.KEYS]
+
+    def test_traversals(self):
+        data_set = [
+            ([1, 2, 3, 4, 5, 6, 7, 8], self.bst.in_order()),
+            ([1, 2, 3, 4, 5, 6, 7, 8], self.bst.in_order(morris=True)),
+            ([1, 2, 3, 4, 5, 6, 7, 8], iter(self.bst)),
+            ([5, 3, 2, 1, 4, 7, 6, 8], self.bst.pre_order()),
+            ([1, 2, 4, 3, 6, 8, 7, 5], self.bst.post_order()),
+            ([5, 3, 7, 2, 4, 6, 8, 1], self.bst.level_order()),
+        ]
+        for expected, traversal in data_set:
+            with self.subTest(expected=expected):
+                self.assertListEqual(expected, list(traversal))
+
+    def test_empty_tree(self):
+        bst = BST()
+        for traversal in [bst.in_order(), bst.in_order(True), bst.pre_order(),
+                          bst.post_order(), bst.level_order()]:
+            with self.subTest(traversal=traversal):
+                self.assertListEqual([], list(traversal))
+
+    def test_degenerate_tree(self):
+        n = 5000  # deeper than the recursion limit
+        bst = BST.from_sorted([])
+        node = None
+        for i in range(n - 1, -1, -1):  # 0 -> 1 -> ... -> n - 1
+            new_node = bst._new_node(i)
+            new_node.right_child = node
+            new_node.size = n - i
+            node = new_node
+        bst.root = node
+        data_set = [
+            (list(range(n)), bst.in_order()),
+            (list(range(n)), bst.pre_order()),
+            (list(range(n - 1, -1, -1)), bst.post_order()),
+            (list(range(n)), bst.level_order()),
+        ]
+        for expected, traversal in data_set:
+            with self.subTest(traversal=traversal):
+                self.assertListEqual(expected, list(traversal))
+        reversed_bst = BST()
+        [reversed_bst.insert(i) for i in range(200, 0, -1)]
+        with self.subTest('Morris on left chain'):
+            self.assertEqual(list(range(1, 201)), list(reversed_bst.in_order(morris=True)))
+
+    def test_morris_closed_early_restores_tree(self):
+        morris = self.bst.in_order(morris=True)
+        self.assertListEqual([1, 2, 3], [next(morris) for _ in range(3)])
+        morris.close()
+        self.assertListEqual([5, 3, 2, 1, 4, 7, 6, 8], list(self.bst.pre_order()))
+        self.assertIsNone(self.bst.find(4).right_child)
+
+    def test_contains_len(self):
+        data_set = [(True, 4 in self.bst), (False, 9 in self.bst), (8, len(self.bst))]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_benchmark(self):
+        results = benchmark_traversal(500)
+        self.assertEqual(5, len(results))
+
+
+class TestPersistentAVLTree(unittest.TestCase):
+    def _nodes(self, tree):
+        stack = [tree.root] if tree.root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node
+            stack += [c for c in (node.left_child, node.right_child) if c]
+
+    def test_versions_are_independent(self):
+        rng = random.Random(0)
+        keys = [rng.randrange(1000) for _ in range(100)]
+        tree = PersistentAVLTree(track_sums=True)
+        versions = []
+        expected = []
+        for key in keys:
+            tree.insert(key)
+            expected = sorted(expected + [key])
+            versions.append((tree.snapshot(), expected))
+        for key in keys[:70]:
+            tree.remove(key)
+            expected = list(expected)
+            expected.remove(key)
+            versions.append((tree.snapshot(), expected))
+        for i, (snapshot, expected) in enumerate(versions):
+            with self.subTest(version=i):
+                self.assertListEqual(expected, list(snapshot))
+                self.assertEqual(len(expected), len(snapshot))
+                self.assertEqual(sum(expected), snapshot.sum_range(0, 1000))
+
+    def test_balanced(self):
+        tree = PersistentAVLTree()
+        for i in range(1000):
+            tree.insert(i)
+        for i in range(0, 1000, 3):
+            tree.remove(i)
+        for node in self._nodes(tree):
+            balance = _height(node.left_child) - _height(node.right_child)
+            self.assertLessEqual(abs(balance), 1)
+        self.assertLessEqual(tree.height(), 14)
+
+    def test_published_nodes_are_not_modified(self):
+        tree = PersistentAVLTree.from_sorted(range(100))
+        old_nodes = {id(node): (node, node.data, node.left_child, node.right_child,
+                                node.height, node.size)
+                     for node in self._nodes(tree)}
+        for i in range(100, 150):
+            tree.insert(i)
+        for i in range(0, 100, 2):
+            tree.remove(i)
+        for node, data, left, right, height, size in old_nodes.values():
+            with self.subTest(data=data):
+                self.assertEqual(
+                    (data, left, right, height, size),
+                    (node.data, node.left_child, node.right_child,
+                     node.height, node.size))
+
+    def test_snapshot_branch(self):
+        tree = PersistentAVLTree.from_sorted([1, 2, 3])
+        branch = tree.snapshot()
+        branch.remove(2)
+        self.assertListEqual([1, 2, 3], list(tree))
+        self.assertListEqual([1, 3], list(branch))
+
+    def test_morris_raises(self):
+        with self.assertRaises(RuntimeError):
+            PersistentAVLTree().in_order(morris=True)
+
+    def test_concurrent_readers(self):
+        tree = PersistentAVLTree.from_sorted(range(0, 200, 2))
+        errors = []
+        stop = threading.Event()
+
+        def read():
+            while not stop.is_set():
+                snapshot = tree.snapshot()
+                data = list(snapshot)
+                evens = [d for d in data if d % 2 == 0]
+                if evens != list(range(0, 200, 2)) or data != sorted(data):
+                    errors.append(data)
+                if len(data) != len(snapshot):
+                    errors.append(data)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for thread in readers:
+            thread.start()
+        for i in range(1, 200, 2):
+            tree.insert(i)
+        for i in range(1, 200, 2):
+            tree.remove(i)
+        stop.set()
+        for thread in readers:
+            thread.join()
+        self.assertListEqual([], errors)
+
+    def test_benchmark(self):
+        rates = benchmark_concurrent_readers(200, 2, duration=0.05)
+        self.assertEqual(2, len(rates))
 
@@ -1,11 +1,26 @@
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import random
+import time
 import unittest
 from unittest import mock
 
+import numpy as np
+
 
 class DisjointSet(object):
     def __init__(self, data):
         self._data = {v: v for v in data}
         self._ranks = {v: 0 for v in data}
+        self._sizes = {v: 1 for v in self._data}  # kept for roots only
+        self._num_sets = len(self._data)
+
+    @property
+    def num_sets(self):
+        """Number of disjoint sets (maintained by `union`)"""
+        return self._num_sets
 
     def find(self, v, path_compression=True):
         """Finds the root to which `v` is connected
@@ -31,15 +46,47 @@ class DisjointSet(object):
         return root
 
     def _find_with_path_compression(self, v):
-        if v != self._data[v]:
-            self._data[v] = self._find_with_path_compression(self._data[v])
-        return self._data[v]
+        # Two passes instead of recursion: find the root, then point every
+        # vertex on the path directly to it.
+        data = self._data
+        root = v
+        while root != data[root]:
+            root = data[root]
+        while v != root:
+            data[v], v = root, data[v]
+        return root
 
     def _find(self, v):
         while v != self._data[v]:
             v = self._data[v]
         return v
 
+    def find_many(self, items, path_compression=True):
+        """Finds roots of all `items`
+
+        :param items: data for which roots are found
+        :type items: iterable of hashables
+        :param path_compression: should paths be compressed?
+        :type path_compression: bool
+        :raises KeyError: when any of items not in set
+        :return: roots in the order of `items`
+        :rtype: list
+
+        :Example:
+        >>> disjoint_set = DisjointSet(['A', 'B', 'C'])
+        >>> disjoint_set.union('A', 'B')
+        >>> disjoint_set.find_many(['A', 'B', 'C'])
+        ['B', 'B', 'C']
+        """
+        find = self._find_with_path_compression if path_compression else self._find
+        data = self._data
+        roots = []
+        for v in items:
+            if v not in data:
+                raise KeyError(f'{v} not in the set.')
+            roots.append(find(v))
+        return roots
+
     def union(self, u, v, path_compression=True):
         """Connects sets in which `u` and `v` are located
 
@@ -54,22 +101,76 @@ class DisjointSet(object):
         :Example:
         >>> disjoint_set = DisjointSet(['A', 'B', 'C'])
         >>> disjoint_set.union('A', 'B')
-        >>> disjoint_set.find('B')
-        'A'
+        >>> disjoint_set.find('A')
+        'B'
         """
         self._verify_if_in_set(u, v)
-        root_u = self.find(u, path_compression)
-        root_v = self.find(v, path_compression)
+        find = self._find_with_path_compression if path_compression else self._find
+        self._link(find(u), find(v))
+
+    def union_many(self, edges, path_compression=True):
+        """Connects sets for every pair `(u, v)` in `edges`. Membership is
+        checked once per vertex and roots are found once per edge.
+
+        :param edges: pairs of vertices
+        :type edges: iterable of tuple(hashable, hashable)
+        :param path_compression: should paths be compressed?
+        :type path_compression: bool
+        :raises KeyError: when any vertex is not in the set
+
+        :Example:
+        >>> disjoint_set = DisjointSet(['A', 'B', 'C', 'D'])
+        >>> disjoint_set.union_many([('A', 'B'), ('C', 'D')])
+        >>> disjoint_set.num_sets
+        2
+        """
+        find = self._find_with_path_compression if path_compression else self._find
+        data = self._data
+        link = self._link
+        for u, v in edges:
+            if u not in data or v not in data:
+                self._verify_if_in_set(u, v)
+            link(find(u), find(v))
+
+    def _link(self, root_u, root_v):
+        """Links two roots using union by rank."""
         if root_u == root_v:
             return
         rank_root_u = self._ranks[root_u]
         rank_root_v = self._ranks[root_v]
         if rank_root_u > rank_root_v:
-            self._data[v] = root_u
-        else:
-            self._data[u] = root_v
-            if rank_root_u == rank_root_v:
-                self._ranks[root_v] += 1
+            root_u, root_v = root_v, root_u
+        elif rank_root_u == rank_root_v:
+            self._ranks[root_v] += 1
+        # root_u (lower rank) is linked to root_v
+        self._data[root_u] = root_v
+        self._sizes[root_v] += self._sizes.pop(root_u)
+        self._num_sets -= 1
+
+    def components(self):
+        """Groups elements by the set they belong to
+
+        :return: {root: list of elements in the set}
+        :rtype: dict
+
+        :Example:
+        >>> disjoint_set = DisjointSet(['A', 'B', 'C'])
+        >>> disjoint_set.union('A', 'B')
+        >>> disjoint_set.components()
+        {'B': ['A', 'B'], 'C': ['C']}
+        """
+        components = {root: [] for root in self._sizes}
+        for v in self._data:
+            components[self._find_with_path_compression(v)].append(v)
+        return components
+
+    def component_sizes(self):
+        """Sizes of all sets, O(number of sets)
+
+        :return: {root: number of elements in the set}
+        :rtype: dict
+        """
+        return dict(self._sizes)
 
     def _verify_if_in_set(self, *args):
         """Verify if elements provided in `*args` are in the set"""
@@ -78,6 +179,700 @@ class DisjointSet(object):
                 raise KeyError(f'{u} not in the set.')
 
 
+class RollbackDisjointSet(DisjointSet):
+    """`DisjointSet` whose unions can be undone.
+
+    Path compression rewrites many parents per `find` and would make undo
+    expensive, so this variant only uses union by rank (`find` is
+    O(log n)) and every successful union records one entry on a history
+    stack. `rollback` pops entries, so it costs O(unions undone).
+
+    :param data: elements of the set
+    :type data: iterable of hashables
+    """
+    def __init__(self, data):
+        super().__init__(data)
+        self._history = []
+
+    def find(self, v, path_compression=False):
+        """Finds the root to which `v` is connected. Paths are never
+        compressed, `path_compression` is accepted for API compatibility.
+
+        :param v: data for which the root is found
+        :type v: hashable
+        :raises KeyError: when v not in set
+        :return: the root of disjoint set to which v is connected
+        :rtype: hashable
+        """
+        self._verify_if_in_set(v)
+        return self._find(v)
+
+    def union(self, u, v, path_compression=False):
+        """Connects sets in which `u` and `v` are located (no compression)
+
+        :param u: first vertex (element of the set)
+        :type u: hashable
+        :param v: second vertex (element of the set)
+        :type v: hashable
+        :raises KeyError: when u or v not in the set
+
+        :Example:
+        >>> disjoint_set = RollbackDisjointSet(['A', 'B', 'C'])
+        >>> snapshot = disjoint_set.snapshot()
+        >>> disjoint_set.union('A', 'B')
+        >>> disjoint_set.find('A')
+        'B'
+        >>> disjoint_set.rollback(snapshot)
+        >>> disjoint_set.find('A')
+        'A'
+        """
+        self._verify_if_in_set(u, v)
+        self._link(self._find(u), self._find(v))
+
+    def union_many(self, edges, path_compression=False):
+        """Connects sets for every pair `(u, v)` in `edges` (no compression)
+
+        :param edges: pairs of vertices
+        :type edges: iterable of tuple(hashable, hashable)
+        :raises KeyError: when any vertex is not in the set
+        """
+        super().union_many(edges, path_compression=False)
+
+    def find_many(self, items, path_compression=False):
+        """Finds roots of all `items` (no compression)
+
+        :param items: data for which roots are found
+        :type items: iterable of hashables
+        :raises KeyError: when any of items not in set
+        :return: roots in the order of `items`
+        :rtype: list
+        """
+        return super().find_many(items, path_compression=False)
+
+    def components(self):
+        """Groups elements by the set they belong to
+
+        :return: {root: list of elements in the set}
+        :rtype: dict
+        """
+        components = {root: [] for root in self._sizes}
+        for v in self._data:
+            components[self._find(v)].append(v)
+        return components
+
+    def _link(self, root_u, root_v):
+        if root_u == root_v:
+            return
+        if self._ranks[root_u] > self._ranks[root_v]:
+            root_u, root_v = root_v, root_u
+        rank_increased = self._ranks[root_u] == self._ranks[root_v]
+        size_u = self._sizes[root_u]
+        super()._link(root_u, root_v)  # root_u is linked to root_v
+        self._history.append((root_u, root_v, rank_increased, size_u))
+
+    def snapshot(self):
+        """Marks the current state
+
+        :return: token to be passed to `rollback`
+        :rtype: int
+        """
+        return len(self._history)
+
+    def rollback(self, snapshot):
+        """Undoes all unions made after `snapshot` was taken
+
+        :param snapshot: value returned by `snapshot`
+        :type snapshot: int
+        :raises ValueError: when the snapshot was already rolled back
+        """
+        if snapshot > len(self._history):
+            raise ValueError('Snapshot is newer than the current state.')
+        while len(self._history) > snapshot:
+            child, root, rank_increased, size = self._history.pop()
+            self._data[child] = child
+            if rank_increased:
+                self._ranks[root] -= 1
+            self._sizes[child] = size
+            self._sizes[root] -= size
+            self._num_sets += 1
+
+
+class IntDisjointSet(object):
+    """Disjoint set over integers `0, 1, ..., n - 1`.
+
+    Parents and ranks are kept in compact `array` buffers (4 or 8 bytes per
+    parent, 1 byte per rank) instead of dicts, and `find` is iterative
+    (path halving), so long chains never hit the recursion limit.
+
+    :param n: number of elements
+    :type n: int
+    """
+    def __init__(self, n):
+        self._parents = array('i' if n < 2 ** 31 else 'q', range(n))
+        self._ranks = array('B', bytes(n))
+        self._num_sets = n
+
+    def __len__(self):
+        return len(self._parents)
+
+    @property
+    def num_sets(self):
+        """Number of disjoint sets (maintained by `union`/`union_many`)"""
+        return self._num_sets
+
+    def find(self, v, path_compression=True):
+        """Finds the root to which `v` is connected
+
+        :param v: element for which the root is found
+        :type v: int
+        :param path_compression: should paths be compressed (halved)?
+        :type path_compression: bool
+        :raises IndexError: when v not in set
+        :return: the root of disjoint set to which v is connected
+        :rtype: int
+
+        :Example:
+        >>> disjoint_set = IntDisjointSet(3)
+        >>> disjoint_set.find(2)
+        2
+        """
+        return self._find_root(v, path_compression)
+
+    def _find_root(self, v, path_compression=True):
+        parents = self._parents
+        # Negative indices would silently wrap around.
+        if not 0 <= v < len(parents):
+            raise IndexError(f'{v} not in the set.')
+        if path_compression:
+            # Path halving: every other node on the path is linked to its
+            # grandparent, in one pass and without recursion.
+            while parents[v] != v:
+                parents[v] = parents[parents[v]]
+                v = parents[v]
+        else:
+            while parents[v] != v:
+                v = parents[v]
+        return v
+
+    def union(self, u, v, path_compression=True):
+        """Connects sets in which `u` and `v` are located. The root with the
+        lower rank is linked to the other root.
+
+        :param u: first element
+        :type u: int
+        :param v: second element
+        :type v: int
+        :param path_compression: should the path be compressed?
+        :type path_compression: bool
+        :raises IndexError: when u or v not in the set
+
+        :Example:
+        >>> disjoint_set = IntDisjointSet(3)
+        >>> disjoint_set.union(0, 1)
+        >>> disjoint_set.find(0) == disjoint_set.find(1)
+        True
+        """
+        self._link(self._find_root(u, path_compression),
+                   self._find_root(v, path_compression))
+
+    def _link(self, root_u, root_v):
+        """Links two roots using union by rank."""
+        if root_u == root_v:
+            return
+        ranks = self._ranks
+        rank_root_u = ranks[root_u]
+        rank_root_v = ranks[root_v]
+        if rank_root_u > rank_root_v:
+            self._parents[root_v] = root_u
+        else:
+            self._parents[root_u] = root_v
+            if rank_root_u == rank_root_v:
+                ranks[root_v] += 1
+        self._num_sets -= 1
+
+    def union_many(self, edges, path_compression=True):
+        """Connects sets for every pair `(u, v)` in `edges`.
+
+        An integer NumPy array of shape (m, 2) is processed with vectorized
+        hooking (see `_union_many_numpy`), any other iterable of pairs with
+        a tight Python loop.
+
+        :param edges: pairs of elements
+        :type edges: np.ndarray or iterable of tuple(int, int)
+        :param path_compression: should paths be compressed? (Python loop
+            only, the vectorized path always compresses)
+        :type path_compression: bool
+        :raises IndexError: when any element not in the set
+
+        :Example:
+        >>> disjoint_set = IntDisjointSet(4)
+        >>> disjoint_set.union_many(np.array([[0, 1], [2, 3], [1, 0]]))
+        >>> disjoint_set.num_sets
+        2
+        """
+        if isinstance(edges, np.ndarray):
+            self._union_many_numpy(edges)
+            return
+        find = self._find_root
+        link = self._link
+        for u, v in edges:
+            link(find(u, path_compression), find(v, path_compression))
+
+    def _as_numpy(self):
+        """Zero-copy NumPy view of the parents buffer"""
+        return np.frombuffer(self._parents, dtype=self._parents.typecode)
+
+    def _union_many_numpy(self, edges):
+        """Vectorized union (see `_hook_and_compress`).
+
+        Hooking by index ignores ranks; afterwards all trees are flat, so
+        ranks are reset to the exact value (1 for roots with children).
+        """
+        edges = np.asarray(edges)
+        if edges.ndim != 2 or edges.shape[1] != 2:
+            raise ValueError('edges must have shape (m, 2).')
+        n = len(self._parents)
+        if edges.size and (edges.min() < 0 or edges.max() >= n):
+            raise IndexError('edges contain elements not in the set.')
+        parents = self._as_numpy()
+        _hook_and_compress(parents, edges[:, 0], edges[:, 1])
+        is_root = parents == np.arange(n)
+        ranks = np.frombuffer(self._ranks, dtype=np.uint8)
+        ranks[:] = 0
+        ranks[parents[~is_root]] = 1
+        self._num_sets = int(np.count_nonzero(is_root))
+
+    def find_many(self, items, path_compression=True):
+        """Finds roots of all `items`; integer NumPy arrays are resolved
+        with vectorized pointer jumping (without compressing paths).
+
+        :param items: elements for which roots are found
+        :type items: np.ndarray or iterable of ints
+        :param path_compression: should paths be compressed? (Python loop
+            only)
+        :type path_compression: bool
+        :raises IndexError: when any of items not in the set
+        :return: roots in the order of `items`
+        :rtype: np.ndarray or list
+
+        :Example:
+        >>> disjoint_set = IntDisjointSet(3)
+        >>> disjoint_set.union(0, 1)
+        >>> disjoint_set.find_many([0, 1, 2])
+        [1, 1, 2]
+        """
+        if isinstance(items, np.ndarray):
+            parents = self._as_numpy()
+            if items.size and (items.min() < 0 or items.max() >= len(parents)):
+                raise IndexError('items contain elements not in the set.')
+            roots = parents[items]
+            while True:
+                grandparents = parents[roots]
+                if np.array_equal(grandparents, roots):
+                    return roots
+                roots = grandparents
+        find = self._find_root
+        return [find(v, path_compression) for v in items]
+
+    def _roots(self):
+        parents = self._as_numpy()
+        _flatten(parents)
+        return parents.copy()
+
+    def components(self):
+        """Groups elements by the set they belong to (compresses all paths)
+
+        :return: {root: list of elements in the set}
+        :rtype: dict
+
+        :Example:
+        >>> disjoint_set = IntDisjointSet(3)
+        >>> disjoint_set.union(0, 2)
+        >>> disjoint_set.components()
+        {1: [1], 2: [0, 2]}
+        """
+        roots = self._roots()
+        order = np.argsort(roots, kind='stable')
+        unique_roots, starts = np.unique(roots[order], return_index=True)
+        groups = np.split(order, starts[1:])
+        return {int(r): g.tolist() for r, g in zip(unique_roots, groups)}
+
+    def component_sizes(self):
+        """Sizes of all sets (compresses all paths)
+
+        :return: {root: number of elements in the set}
+        :rtype: dict
+        """
+        unique_roots, counts = np.unique(self._roots(), return_counts=True)
+        return dict(zip(unique_roots.tolist(), counts.tolist()))
+
+
+class ArrayDisjointSet(IntDisjointSet):
+    """`IntDisjointSet` with the hashable API of `DisjointSet`: labels are
+    mapped to indices once, at construction time.
+
+    :param data: elements of the set
+    :type data: iterable of hashables
+    """
+    def __init__(self, data):
+        self._labels = list(data)
+        self._index = {v: i for i, v in enumerate(self._labels)}
+        super().__init__(len(self._labels))
+
+    def _to_index(self, v):
+        try:
+            return self._index[v]
+        except KeyError:
+            raise KeyError(f'{v} not in the set.') from None
+
+    def find(self, v, path_compression=True):
+        """Finds the root to which `v` is connected
+
+        :param v: data for which the root is found
+        :type v: hashable
+        :param path_compression: should paths be compressed?
+        :type path_compression: bool
+        :raises KeyError: when v not in set
+        :return: the root of disjoint set to which v is connected
+        :rtype: hashable
+
+        :Example:
+        >>> disjoint_set = ArrayDisjointSet(['A', 'B', 'C'])
+        >>> disjoint_set.union('A', 'B')
+        >>> disjoint_set.find('A')
+        'B'
+        """
+        root = self._find_root(self._to_index(v), path_compression)
+        return self._labels[root]
+
+    def union(self, u, v, path_compression=True):
+        """Connects sets in which `u` and `v` are located
+
+        :param u: first vertex (element of the set)
+        :type u: hashable
+        :param v: second vertex (element of the set)
+        :type v: hashable
+        :param path_compression: should the path be compressed?
+        :type path_compression: bool
+        :raises KeyError: when u or v not in the set
+        """
+        super().union(self._to_index(u), self._to_index(v), path_compression)
+
+    def union_many(self, edges, path_compression=True):
+        """Connects sets for every pair `(u, v)` of labels in `edges`
+
+        :param edges: pairs of vertices
+        :type edges: iterable of tuple(hashable, hashable)
+        :param path_compression: should paths be compressed?
+        :type path_compression: bool
+        :raises KeyError: when any vertex is not in the set
+        """
+        to_index = self._to_index
+        super().union_many(
+            ((to_index(u), to_index(v)) for u, v in edges), path_compression)
+
+    def find_many(self, items, path_compression=True):
+        """Finds roots of all `items`
+
+        :param items: data for which roots are found
+        :type items: iterable of hashables
+        :param path_compression: should paths be compressed?
+        :type path_compression: bool
+        :raises KeyError: when any of items not in set
+        :return: roots in the order of `items`
+        :rtype: list
+        """
+        to_index = self._to_index
+        roots = super().find_many(
+            [to_index(v) for v in items], path_compression)
+        return [self._labels[root] for root in roots]
+
+    def components(self):
+        """Groups elements by the set they belong to
+
+        :return: {root: list of elements in the set}
+        :rtype: dict
+        """
+        labels = self._labels
+        return {
+            labels[root]: [labels[v] for v in members]
+            for root, members in super().components().items()
+        }
+
+    def component_sizes(self):
+        """Sizes of all sets
+
+        :return: {root: number of elements in the set}
+        :rtype: dict
+        """
+        return {
+            self._labels[root]: size
+            for root, size in super().component_sizes().items()
+        }
+
+
+def _flatten(parents):
+    """Pointer jumping until every element points directly to its root"""
+    while True:
+        grandparents = parents[parents]
+        if np.array_equal(grandparents, parents):
+            return
+        parents[:] = grandparents
+
+
+def _hook_and_compress(parents, u, v):
+    """Vectorized union of all edges `(u[i], v[i])` over a parents array.
+
+    In every round all paths are fully compressed, then for every edge with
+    different roots the larger root is hooked under the smaller one
+    (`np.minimum.at` resolves conflicting writes). Roots only ever point to
+    smaller indices, so no cycles can appear, and rounds repeat until all
+    edges join roots of the same set. On return all trees are flat.
+
+    :param parents: parents array, modified in place
+    :type parents: np.ndarray
+    :param u: first endpoints
+    :type u: np.ndarray
+    :param v: second endpoints
+    :type v: np.ndarray
+    """
+    while u.size:
+        _flatten(parents)
+        root_u, root_v = parents[u], parents[v]
+        different = root_u != root_v
+        u, v = u[different], v[different]
+        root_u, root_v = root_u[different], root_v[different]
+        np.minimum.at(
+            parents, np.maximum(root_u, root_v), np.minimum(root_u, root_v))
+    _flatten(parents)
+
+
+def _partition_forest(edges_name, n_edges, parents_name, n, dtype, worker,
+                      lo, hi):
+    """Worker of `parallel_connected_components`: builds the forest of edges
+    `lo:hi` in row `worker` of the shared parents buffer."""
+    edges_memory = SharedMemory(name=edges_name)
+    parents_memory = SharedMemory(name=parents_name)
+    try:
+        edges = np.ndarray((n_edges, 2), np.int64, buffer=edges_memory.buf)
+        parents = np.ndarray(
+            (n,), dtype, buffer=parents_memory.buf,
+            offset=worker * n * np.dtype(dtype).itemsize)
+        parents[:] = np.arange(n)
+        _hook_and_compress(parents, edges[lo:hi, 0], edges[lo:hi, 1])
+        del edges, parents  # views must be released before closing
+    finally:
+        edges_memory.close()
+        parents_memory.close()
+
+
+def parallel_connected_components(edges, n, n_workers=4):
+    """Finds connected components of an undirected graph with vertices
+    `0, ..., n - 1` using several processes.
+
+    Edges are copied once to shared memory and split into `n_workers`
+    partitions. Every worker builds a spanning forest of its partition with
+    vectorized hook-and-compress (`_hook_and_compress`) in its own row of a
+    shared (n_workers x n) parents buffer -- nothing is pickled. The forests
+    have at most n - 1 edges each and are merged in the main process with
+    one `IntDisjointSet.union_many` call.
+
+    :param edges: integer array of shape (m, 2)
+    :type edges: np.ndarray
+    :param n: number of vertices
+    :type n: int
+    :param n_workers: number of worker processes
+    :type n_workers: int
+    :return: disjoint set describing the components
+    :rtype: IntDisjointSet
+
+    :Example:
+    >>> edges = np.array([[0, 1], [2, 3], [1, 4]])
+    >>> components = parallel_connected_components(edges, 6, n_workers=2)
+    >>> components.num_sets
+    3
+    """
+    edges = np.ascontiguousarray(edges, dtype=np.int64)
+    disjoint_set = IntDisjointSet(n)
+    if n_workers <= 1 or len(edges) < n_workers or not n:
+        disjoint_set.union_many(edges)
+        return disjoint_set
+    if edges.ndim != 2 or edges.shape[1] != 2:
+        raise ValueError('edges must have shape (m, 2).')
+    if edges.min() < 0 or edges.max() >= n:
+        raise IndexError('edges contain elements not in the set.')
+
+    dtype = np.dtype(disjoint_set._parents.typecode)
+    # Blocks of size 0 can't be created.
+    edges_memory = SharedMemory(create=True, size=max(edges.nbytes, 1))
+    parents_memory = SharedMemory(
+        create=True, size=max(n_workers * n * dtype.itemsize, 1))
+    try:
+        shared_edges = np.ndarray(edges.shape, np.int64, buffer=edges_memory.buf)
+        shared_edges[:] = edges
+        bounds = np.linspace(0, len(edges), n_workers + 1).astype(int)
+        with ProcessPoolExecutor(n_workers) as executor:
+            futures = [
+                executor.submit(
+                    _partition_forest, edges_memory.name, len(edges),
+                    parents_memory.name, n, dtype.str, w,
+                    bounds[w], bounds[w + 1])
+                for w in range(n_workers)
+            ]
+            for future in futures:
+                future.result()
+        forests = np.ndarray((n_workers, n), dtype, buffer=parents_memory.buf)
+        vertices = np.arange(n)
+        forest_edges = [
+            np.stack([vertices[forest != vertices],
+                      forest[forest != vertices]], axis=1)
+            for forest in forests
+        ]
+        del shared_edges, forests  # views must be released before closing
+        disjoint_set.union_many(np.concatenate(forest_edges))
+    finally:
+        edges_memory.close()
+        edges_memory.unlink()
+        parents_memory.close()
+        parents_memory.unlink()
+    return disjoint_set
+
+
+def benchmark_parallel_components(n=1000000, m=10000000,
+                                  workers=(1, 4, 8, 16), seed=0):
+    """Compares `parallel_connected_components` with a single
+    `IntDisjointSet.union_many` over random edges.
+
+    :param n: number of vertices
+    :type n: int
+    :param m: number of edges
+    :type m: int
+    :param workers: numbers of workers to be checked
+    :type workers: iterable of ints
+    :param seed: random seed
+    :type seed: int
+    :return: {n_workers: speedup}
+    :rtype: dict
+    """
+    edges = np.random.default_rng(seed).integers(0, n, size=(m, 2))
+    start = time.perf_counter()
+    IntDisjointSet(n).union_many(edges)
+    single = time.perf_counter() - start
+    speedups = dict()
+    for n_workers in workers:
+        start = time.perf_counter()
+        parallel_connected_components(edges, n, n_workers)
+        speedups[n_workers] = single / (time.perf_counter() - start)
+    return speedups
+
+
+def offline_dynamic_connectivity(vertices, operations):
+    """Answers connectivity queries on a graph whose edges are added and
+    removed over time, knowing all operations in advance.
+
+    Every edge is alive during an interval of operation indices. Intervals
+    are stored in a segment tree over time, and a DFS over the tree unions
+    the edges of a node on the way down and rolls them back on the way up
+    (`RollbackDisjointSet`), so every leaf sees exactly the edges alive at
+    its time. Total cost: O(q log q log n) for q operations.
+
+    Supported operations:
+        ('add', u, v), ('remove', u, v) -- undirected edges, multi-edges
+            are allowed (`remove` drops the most recently added copy)
+        ('connected', u, v) -- answered with bool
+        ('num_sets',) -- number of connected components, answered with int
+
+    :param vertices: vertices of the graph
+    :type vertices: iterable of hashables
+    :param operations: operations in chronological order
+    :type operations: list of tuples
+    :raises KeyError: when a removed edge is not in the graph
+    :raises RuntimeError: when an operation is not supported
+    :return: answers to the queries in order
+    :rtype: list
+
+    :Example:
+    >>> operations = [
+    ...     ('add', 'A', 'B'), ('connected', 'A', 'B'), ('num_sets',),
+    ...     ('remove', 'B', 'A'), ('connected', 'A', 'B')]
+    >>> offline_dynamic_connectivity(['A', 'B', 'C'], operations)
+    [True, 2, False]
+    """
+    disjoint_set = RollbackDisjointSet(vertices)
+    n_operations = len(operations)
+    size = 1
+    while size < max(n_operations, 1):
+        size *= 2
+    tree = defaultdict(list)  # segment tree node -> edges alive in it
+
+    def add_interval(lo, hi, edge):
+        lo, hi = lo + size, hi + size
+        while lo < hi:
+            if lo & 1:
+                tree[lo].append(edge)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                tree[hi].append(edge)
+            lo, hi = lo // 2, hi // 2
+
+    alive = defaultdict(list)  # edge -> start times of its copies
+    queries = dict()  # time -> query
+    for t, operation in enumerate(operations):
+        kind = operation[0]
+        if kind in ('add', 'remove'):
+            _, u, v = operation
+            disjoint_set._verify_if_in_set(u, v)
+            key = frozenset((u, v))
+            if kind == 'add':
+                alive[key].append(t)
+            elif not alive[key]:
+                raise KeyError(f'{(u, v)} not in the graph.')
+            else:
+                add_interval(alive[key].pop(), t, (u, v))
+        elif kind in ('connected', 'num_sets'):
+            if kind == 'connected':
+                disjoint_set._verify_if_in_set(*operation[1:])
+            queries[t] = operation
+        else:
+            raise RuntimeError(f"Operation '{kind}' is not supported.")
+    for key, starts in alive.items():
+        u, v = tuple(key) if len(key) == 2 else tuple(key) * 2
+        for start in starts:
+            add_interval(start, n_operations, (u, v))
+
+    # Only visit subtrees containing queries
+    needed = set()
+    for t in queries:
+        node = t + size
+        while node and node not in needed:
+            needed.add(node)
+            node //= 2
+
+    answers = dict()
+    stack = [(1, None)] if needed else []
+    while stack:
+        node, snapshot = stack.pop()
+        if snapshot is not None:  # leaving the node
+            disjoint_set.rollback(snapshot)
+            continue
+        stack.append((node, disjoint_set.snapshot()))
+        disjoint_set.union_many(tree[node])
+        if node >= size:  # leaf
+            operation = queries[node - size]
+            if operation[0] == 'connected':
+                answers[node - size] = (
+                    disjoint_set._find(operation[1]) ==
+                    disjoint_set._find(operation[2]))
+            else:
+                answers[node - size] = disjoint_set.num_sets
+            continue
+        for child in (2 * node + 1, 2 * node):
+            if child in needed:
+                stack.append((child, None))
+    return [answers[t] for t in sorted(answers)]
+
+
 class DisjointSetTestCase(unittest.TestCase):
     """Using example from Figure 5.6 in
         Dasgupta, Sanjoy, Christos H. Papadimitriou, and Umesh V. Vazirani.
@@ -215,9 +1010,386 @@ class DisjointSetTestCase(unittest.TestCase):
         test_set = [('A', 'C', 0), ('B', 'C', 0), ('C', 'C', 1), ('D', 'D', 1), ('E', 'C', 0), ('F', 'D', 0)]
         self._test_union(disjoint_set, test_set)
 
+    def test_union_links_roots(self):
+        """B--->A, D--->C; union(B, D) must link root A, not B"""
+        disjoint_set = DisjointSet(['A', 'B', 'C', 'D'])
+        disjoint_set.union('B', 'A')
+        disjoint_set.union('D', 'C')
+        disjoint_set.union('B', 'D')
+        test_set = [('A', 'C', 1), ('B', 'A', 0), ('C', 'C', 2), ('D', 'C', 0)]
+        self._test_union(disjoint_set, test_set)
+
+    def test_find_long_chain(self):
+        n = 10000
+        disjoint_set = DisjointSet(range(n))
+        disjoint_set._data.update({i: i + 1 for i in range(n - 1)})
+        with self.subTest('root'):
+            self.assertEqual(n - 1, disjoint_set.find(0))
+        with self.subTest('compressed'):
+            self.assertEqual(n - 1, disjoint_set._data[n // 2])
+
+    def test_union_many(self):
+        disjoint_set = DisjointSet(['A', 'B', 'C', 'D', 'E', 'F'])
+        disjoint_set.union_many([('A', 'C'), ('C', 'B'), ('E', 'A'), ('F', 'D')])
+        expected = DisjointSet(['A', 'B', 'C', 'D', 'E', 'F'])
+        for u, v in [('A', 'C'), ('C', 'B'), ('E', 'A'), ('F', 'D')]:
+            expected.union(u, v)
+        with self.subTest('parents'):
+            self.assertDictEqual(expected._data, disjoint_set._data)
+        with self.subTest('ranks'):
+            self.assertDictEqual(expected._ranks, disjoint_set._ranks)
+
+    def test_union_many_raises(self):
+        disjoint_set = DisjointSet(['A', 'B', 'C'])
+        with self.assertRaises(KeyError):
+            disjoint_set.union_many([('A', 'B'), ('A', 'X')])
+
+    def test_find_many(self):
+        disjoint_set = DisjointSet(['A', 'B', 'C'])
+        disjoint_set.union('A', 'B')
+        with self.subTest():
+            self.assertListEqual(['B', 'B', 'C'], disjoint_set.find_many('ABC'))
+        with self.subTest():
+            with self.assertRaises(KeyError):
+                disjoint_set.find_many(['A', 'X'])
+
+    def test_components(self):
+        disjoint_set = DisjointSet(['A', 'B', 'C', 'D', 'E', 'F'])
+        disjoint_set.union_many([('A', 'C'), ('C', 'B'), ('E', 'A'), ('F', 'D')])
+        data_set = [
+            (2, disjoint_set.num_sets),
+            ({'C': ['A', 'B', 'C', 'E'], 'D': ['D', 'F']}, disjoint_set.components()),
+            ({'C': 4, 'D': 2}, disjoint_set.component_sizes())
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
     def _test_union(self, disjoint_set, test_set):
         for vertex, parent, rank in test_set:
             with self.subTest('Checking if parent was updated...', vertex=vertex, parent=parent):
                 self.assertEqual(parent, disjoint_set._data[vertex])
             with self.subTest('Checking if rank was updated...', vertex=vertex, rank=rank):
                 self.assertEqual(rank, disjoint_set._ranks[vertex])
+
+
+class IntDisjointSetTestCase(unittest.TestCase):
+    def test_init(self):
+        disjoint_set = IntDisjointSet(4)
+        with self.subTest():
+            self.assertListEqual([0, 1, 2, 3], list(disjoint_set._parents))
+        with self.subTest():
+            self.assertListEqual([0, 0, 0, 0], list(disjoint_set._ranks))
+        with self.subTest():
+            self.assertEqual(4, len(disjoint_set))
+
+    def test_find_path_halving(self):
+        """0--->1--->2--->3--->4"""
+        disjoint_set = IntDisjointSet(5)
+        disjoint_set._parents[:] = array('i', [1, 2, 3, 4, 4])
+        with self.subTest('W/o path compression'):
+            self.assertEqual(4, disjoint_set.find(0, path_compression=False))
+            self.assertListEqual([1, 2, 3, 4, 4], list(disjoint_set._parents))
+        with self.subTest('With path compression'):
+            self.assertEqual(4, disjoint_set.find(0))
+            self.assertListEqual([2, 2, 4, 4, 4], list(disjoint_set._parents))
+
+    def test_find_long_chain(self):
+        n = 100000
+        disjoint_set = IntDisjointSet(n)
+        disjoint_set._parents[:] = array('i', range(1, n + 1))
+        disjoint_set._parents[n - 1] = n - 1
+        self.assertEqual(n - 1, disjoint_set.find(0))
+
+    def test_union_links_roots(self):
+        disjoint_set = IntDisjointSet(6)
+        disjoint_set.union(0, 2)
+        disjoint_set.union(2, 1)
+        disjoint_set.union(4, 0)
+        disjoint_set.union(5, 3)
+        test_set = [(0, 2, 0), (1, 2, 0), (2, 2, 1), (3, 3, 1), (4, 2, 0), (5, 3, 0)]
+        for vertex, parent, rank in test_set:
+            with self.subTest(vertex=vertex, parent=parent, rank=rank):
+                self.assertEqual(parent, disjoint_set._parents[vertex])
+                self.assertEqual(rank, disjoint_set._ranks[vertex])
+
+    def test_raises(self):
+        disjoint_set = IntDisjointSet(3)
+        data_set = [
+            ('find', lambda: disjoint_set.find(-1)),
+            ('find', lambda: disjoint_set.find(3)),
+            ('union', lambda: disjoint_set.union(0, -1)),
+        ]
+        for name, call in data_set:
+            with self.subTest(name):
+                with self.assertRaises(IndexError):
+                    call()
+        with self.subTest('unchanged'):
+            self.assertListEqual([0, 1, 2], list(disjoint_set._parents))
+
+    def test_union_find_random(self):
+        rng = random.Random(0)
+        n = 200
+        components = [{v} for v in range(n)]  # brute force reference
+        disjoint_set = IntDisjointSet(n)
+        for _ in range(150):
+            u, v = rng.randrange(n), rng.randrange(n)
+            disjoint_set.union(u, v)
+            if components[u] is not components[v]:
+                merged = components[u] | components[v]
+                for w in merged:
+                    components[w] = merged
+        for u in range(n):
+            with self.subTest(u=u):
+                root = disjoint_set.find(u)
+                self.assertSetEqual(
+                    components[u],
+                    {v for v in range(n) if disjoint_set.find(v) == root})
+
+
+class ArrayDisjointSetTestCase(unittest.TestCase):
+    def test_find(self):
+        disjoint_set = ArrayDisjointSet(['A', 'B', 'C'])
+        for vertex in ['A', 'B', 'C']:
+            with self.subTest(vertex=vertex):
+                self.assertEqual(vertex, disjoint_set.find(vertex))
+
+    def test_union(self):
+        disjoint_set = ArrayDisjointSet(['A', 'B', 'C'])
+        disjoint_set.union('A', 'B')
+        test_set = [('A', 'B'), ('B', 'B'), ('C', 'C')]
+        for vertex, root in test_set:
+            with self.subTest(vertex=vertex, root=root):
+                self.assertEqual(root, disjoint_set.find(vertex))
+
+    def test_raises(self):
+        disjoint_set = ArrayDisjointSet(['A', 'B', 'C'])
+        with self.subTest('find'):
+            with self.assertRaises(KeyError):
+                disjoint_set.find('X')
+        with self.subTest('union'):
+            with self.assertRaises(KeyError):
+                disjoint_set.union('A', 'X')
+
+
+class IntDisjointSetBatchTestCase(unittest.TestCase):
+    EDGES = [(0, 2), (2, 1), (4, 0), (5, 3), (6, 6), (1, 4)]
+
+    def test_union_many_python(self):
+        disjoint_set = IntDisjointSet(8)
+        disjoint_set.union_many(self.EDGES)
+        data_set = [
+            (4, disjoint_set.num_sets),
+            ({2: [0, 1, 2, 4], 3: [3, 5], 6: [6], 7: [7]}, disjoint_set.components()),
+            ({2: 4, 3: 2, 6: 1, 7: 1}, disjoint_set.component_sizes()),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_union_many_numpy(self):
+        disjoint_set = IntDisjointSet(8)
+        disjoint_set.union_many(np.array(self.EDGES))
+        data_set = [
+            (4, disjoint_set.num_sets),
+            ({0: [0, 1, 2, 4], 3: [3, 5], 6: [6], 7: [7]}, disjoint_set.components()),
+            ([0, 0, 0, 3, 0, 3, 6, 7], list(disjoint_set._parents)),
+            ([1, 0, 0, 1, 0, 0, 0, 0], list(disjoint_set._ranks)),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_union_many_numpy_random(self):
+        rng = np.random.default_rng(0)
+        n = 1000
+        edges = rng.integers(0, n, size=(800, 2))
+        vectorized, looped = IntDisjointSet(n), IntDisjointSet(n)
+        vectorized.union_many(edges[:400])
+        vectorized.union(*edges[400])  # mixing both paths must be safe
+        vectorized.union_many(edges[401:])
+        looped.union_many(edges.tolist())
+        roots_vectorized = vectorized.find_many(np.arange(n))
+        roots_looped = np.array(looped.find_many(range(n)))
+        with self.subTest('num_sets'):
+            self.assertEqual(looped.num_sets, vectorized.num_sets)
+        with self.subTest('same partition'):
+            # the partitions are equal iff root pairs map one to one
+            pairs = set(zip(roots_vectorized.tolist(), roots_looped.tolist()))
+            self.assertEqual(looped.num_sets, len(pairs))
+
+    def test_union_many_numpy_raises(self):
+        disjoint_set = IntDisjointSet(3)
+        with self.subTest('shape'):
+            with self.assertRaises(ValueError):
+                disjoint_set.union_many(np.array([0, 1, 2]))
+        with self.subTest('bounds'):
+            with self.assertRaises(IndexError):
+                disjoint_set.union_many(np.array([[0, 3]]))
+        with self.subTest('find_many bounds'):
+            with self.assertRaises(IndexError):
+                disjoint_set.find_many(np.array([0, -1]))
+
+    def test_find_many(self):
+        disjoint_set = IntDisjointSet(4)
+        disjoint_set.union_many([(0, 1), (1, 2)])
+        data_set = [
+            ([1, 1, 1, 3], disjoint_set.find_many([0, 1, 2, 3])),
+            ([1, 1, 1, 3], disjoint_set.find_many(np.arange(4)).tolist()),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_labels(self):
+        disjoint_set = ArrayDisjointSet(['A', 'B', 'C', 'D'])
+        disjoint_set.union_many([('A', 'B'), ('C', 'D'), ('B', 'A')])
+        data_set = [
+            (2, disjoint_set.num_sets),
+            (['B', 'B', 'D', 'D'], disjoint_set.find_many('ABCD')),
+            ({'B': ['A', 'B'], 'D': ['C', 'D']}, disjoint_set.components()),
+            ({'B': 2, 'D': 2}, disjoint_set.component_sizes()),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+
+class ParallelConnectedComponentsTestCase(unittest.TestCase):
+    def test_empty_graph(self):
+        data_set = [
+            (0, np.empty((0, 2), dtype=np.int64), 0),
+            (3, np.empty((0, 2), dtype=np.int64), 3),
+        ]
+        for expected, edges, n in data_set:
+            with self.subTest(n=n):
+                disjoint_set = parallel_connected_components(
+                    edges, n, n_workers=2)
+                self.assertEqual(expected, disjoint_set.num_sets)
+        with self.subTest('edges without vertices'):
+            with self.assertRaises(IndexError):
+                parallel_connected_components(np.zeros((4, 2)), 0, 2)
+
+    def test_small_graph(self):
+        edges = np.array([[0, 1], [2, 3], [1, 4], [6, 6], [4, 0]])
+        disjoint_set = parallel_connected_components(edges, 7, n_workers=2)
+        data_set = [
+            (4, disjoint_set.num_sets),
+            ({0: [0, 1, 4], 2: [2, 3], 5: [5], 6: [6]}, disjoint_set.components())
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_random_graph(self):
+        n = 2000
+        edges = np.random.default_rng(1).integers(0, n, size=(1500, 2))
+        expected = IntDisjointSet(n)
+        expected.union_many(edges.tolist())
+        for n_workers in [1, 3]:
+            actual = parallel_connected_components(edges, n, n_workers)
+            with self.subTest(n_workers=n_workers):
+                self.assertEqual(expected.num_sets, actual.num_sets)
+                self.assertEqual(
+                    sorted(map(sorted, expected.components().values())),
+                    sorted(map(sorted, actual.components().values())))
+
+
+class RollbackDisjointSetTestCase(unittest.TestCase):
+    def test_rollback(self):
+        disjoint_set = RollbackDisjointSet(['A', 'B', 'C', 'D'])
+        disjoint_set.union('A', 'B')
+        expected_data = dict(disjoint_set._data)
+        expected_ranks = dict(disjoint_set._ranks)
+        expected_sizes = dict(disjoint_set._sizes)
+        snapshot = disjoint_set.snapshot()
+        disjoint_set.union('C', 'D')
+        disjoint_set.union('A', 'C')
+        disjoint_set.union('B', 'D')  # already connected, nothing recorded
+        with self.subTest('after unions'):
+            self.assertEqual(1, disjoint_set.num_sets)
+        disjoint_set.rollback(snapshot)
+        data_set = [
+            (expected_data, disjoint_set._data),
+            (expected_ranks, disjoint_set._ranks),
+            (expected_sizes, disjoint_set.component_sizes()),
+            (3, disjoint_set.num_sets),
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_nested_rollback(self):
+        disjoint_set = RollbackDisjointSet(range(4))
+        outer = disjoint_set.snapshot()
+        disjoint_set.union(0, 1)
+        inner = disjoint_set.snapshot()
+        disjoint_set.union(2, 3)
+        disjoint_set.rollback(inner)
+        with self.subTest('inner'):
+            self.assertEqual({1: [0, 1], 2: [2], 3: [3]}, disjoint_set.components())
+        disjoint_set.rollback(outer)
+        with self.subTest('outer'):
+            self.assertEqual(4, disjoint_set.num_sets)
+        with self.subTest('stale snapshot'):
+            with self.assertRaises(ValueError):
+                disjoint_set.rollback(inner)
+
+    def test_find_does_not_compress(self):
+        disjoint_set = RollbackDisjointSet(['A', 'B', 'C'])
+        disjoint_set._data.update(A='B', B='C')
+        disjoint_set.find('A')
+        self.assertEqual('B', disjoint_set._data['A'])
+
+
+class OfflineDynamicConnectivityTestCase(unittest.TestCase):
+    def test_simple(self):
+        operations = [
+            ('num_sets',),
+            ('add', 0, 1), ('add', 1, 2), ('connected', 0, 2),
+            ('remove', 1, 0), ('connected', 0, 2), ('connected', 1, 2),
+            ('add', 0, 1), ('add', 0, 1), ('remove', 0, 1), ('connected', 0, 2),
+            ('add', 3, 3), ('num_sets',)
+        ]
+        expected = [4, True, False, True, True, 2]
+        self.assertListEqual(
+            expected, offline_dynamic_connectivity(range(4), operations))
+
+    def test_raises(self):
+        data_set = [
+            (KeyError, [('remove', 0, 1)]),
+            (KeyError, [('connected', 0, 9)]),
+            (RuntimeError, [('foo',)]),
+        ]
+        for exception, operations in data_set:
+            with self.subTest(operations=operations):
+                with self.assertRaises(exception):
+                    offline_dynamic_connectivity(range(2), operations)
+
+    def test_random_against_brute_force(self):
+        rng = random.Random(0)
+        n = 8
+        edges = []
+        operations = []
+        expected = []
+        for _ in range(300):
+            kind = rng.choice(['add', 'add', 'remove', 'connected', 'num_sets'])
+            if kind == 'remove' and edges:
+                u, v = edges.pop(rng.randrange(len(edges)))
+                operations.append(('remove', u, v))
+            elif kind == 'add':
+                u, v = rng.randrange(n), rng.randrange(n)
+                edges.append((u, v))
+                operations.append(('add', u, v))
+            elif kind in ('connected', 'num_sets'):
+                disjoint_set = DisjointSet(range(n))
+                disjoint_set.union_many(edges)
+                if kind == 'connected':
+                    u, v = rng.randrange(n), rng.randrange(n)
+                    operations.append(('connected', u, v))
+                    expected.append(disjoint_set.find(u) == disjoint_set.find(v))
+                else:
+                    operations.append(('num_sets',))
+                    expected.append(disjoint_set.num_sets)
+        self.assertListEqual(
+            expected, offline_dynamic_connectivity(range(n), operations))
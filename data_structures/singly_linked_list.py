@@ -33,11 +33,10 @@ class SinglyLinkedList(object):
     def __init__(self):
         self.tail = None
         self.head = None
-        self.__current = self.head
         self.size = 0
 
     def __contains__(self, data):
-        current = self.tail
+        current = self.head
         while current:
             if current.data == data:
                 return True
@@ -45,17 +44,11 @@ class SinglyLinkedList(object):
         return False
 
     def __iter__(self):
-        self.__current = self.head
-        return self
-
-    def __next__(self):
-        if self.__current is None:
-            self.__current = self.head
-            raise StopIteration
-        else:
-            current = self.__current
-            self.__current = self.__current.next
-            return current.data
+        # A generator keeps its own cursor, so nested iterations are safe.
+        current = self.head
+        while current is not None:
+            yield current.data
+            current = current.next
 
     def __len__(self):
         return self.size
@@ -73,11 +66,13 @@ class SinglyLinkedList(object):
 
         :param data: data to be appended
         :type data: object
+        :return: handle of the new node (see `delete_after`)
+        :rtype: Node
 
         :Example:
         >>> my_list = SinglyLinkedList()
-        >>> my_list.append(1)
-        >>> my_list.append(2)
+        >>> _ = my_list.append(1)
+        >>> _ = my_list.append(2)
         >>> my_list
         [1, 2,]
         """
@@ -89,17 +84,20 @@ class SinglyLinkedList(object):
         else:  # First node in the list
             self.head = node
             self.tail = node
+        return node
 
     def appendleft(self, data):
         """Appends (to head -- to the left) data to the list.
 
         :param data: data to be appended
         :type data: object
+        :return: handle of the new node (see `delete_after`)
+        :rtype: Node
 
         :Example:
         >>> my_list = SinglyLinkedList()
-        >>> my_list.appendleft(1)
-        >>> my_list.appendleft(2)
+        >>> _ = my_list.appendleft(1)
+        >>> _ = my_list.appendleft(2)
         >>> my_list
         [2, 1,]
         """
@@ -111,34 +109,269 @@ class SinglyLinkedList(object):
         else:  # First node in the list
             self.head = node
             self.tail = node
+        return node
 
-    def delete(self, data):
-        """Appends (to head -- to the left) data to the list.
+    def extend(self, iterable):
+        """Appends (to tail -- to the right) all elements of iterable.
+
+        :param iterable: data to be appended
+        :type iterable: iterable
+
+        :Example:
+        >>> my_list = SinglyLinkedList()
+        >>> my_list.extend([1, 2, 3])
+        >>> my_list
+        [1, 2, 3,]
+        """
+        for data in iterable:
+            self.append(data)
+
+    def popleft(self):
+        """Removes and returns data from the head (the left), so together
+        with `append` the list works as a FIFO queue. Returns None if the
+        list is empty.
+
+        :return: data stored in the head
+        :rtype: object
+
+        :Example:
+        >>> my_list = SinglyLinkedList()
+        >>> my_list.extend([1, 2])
+        >>> my_list.popleft()
+        1
+        """
+        if self.head is None:  # empty list
+            return None
+        head = self.head
+        self.head = head.next
+        head.next = None  # unlinked, see `delete_after`
+        if self.head is None:
+            self.tail = None
+        self.size -= 1
+        return head.data
+
+    def delete_after(self, node):
+        """Removes the node following `node` (a handle returned by `append` or
+        `appendleft`) in O(1). Use `popleft` to remove the head.
+
+        Handles of nodes removed by `delete_after` or `popleft` are
+        rejected. Handles of nodes removed by `delete` (or from another
+        list) can't be checked in O(1), so they must not be used.
+
+        :param node: node preceding the one to be removed
+        :type node: Node
+        :raises ValueError: when `node` is the tail or was removed
+        :return: data of the removed node
+        :rtype: object
+
+        :Example:
+        >>> my_list = SinglyLinkedList()
+        >>> first = my_list.append(1)
+        >>> _ = my_list.append(2)
+        >>> my_list.delete_after(first)
+        2
+        >>> my_list
+        [1,]
+        """
+        removed = node.next
+        if removed is None:
+            if node is self.tail:
+                raise ValueError('There is no node after the tail.')
+            raise ValueError('The node is not in the list.')
+        node.next = removed.next
+        removed.next = None  # unlinked, so a stale handle is detected
+        if removed is self.tail:
+            self.tail = node
+        self.size -= 1
+        return removed.data
+
+    def delete(self, data, delete_first=False):
+        """Removes nodes containing data from the list.
 
         :param data: data to be removed
         :type data: object
+        :param delete_first: stop after removing the first match?
+        :type delete_first: bool
 
         :Example:
         >>> my_list = SinglyLinkedList()
-        >>> my_list.appendleft(1)
-        >>> my_list.appendleft(2)
+        >>> _ = my_list.appendleft(1)
+        >>> _ = my_list.appendleft(2)
         >>> my_list.delete(1)
         >>> my_list
         [2,]
         """
         current = self.head
-        previous = self.head
+        previous = None
         while current:
             if current.data == data:
-                if current == self.head:
+                if previous is None:
                     self.head = current.next
                 else:
                     previous.next = current.next
-                    if current == self.tail:
-                        self.tail = previous
+                if current is self.tail:
+                    self.tail = previous
                 self.size -= 1
+                if delete_first:
+                    return
+            else:
+                previous = current
+            current = current.next
+
+
+class UnrolledNode(object):
+    """
+    Node of an unrolled linked list -- instead of a single element it keeps
+    up to `capacity` elements in a list. `__slots__` saves the per instance
+    `__dict__`.
+
+    :param elements: data stored in the node
+    :type elements: list
+    :param next: pointer to the next node
+    :type next: UnrolledNode
+
+    """
+    __slots__ = ('elements', 'next')
+
+    def __init__(self, elements=None):
+        self.elements = elements if elements is not None else []
+        self.next = None
+
+
+class UnrolledLinkedList(object):
+    """
+    Unrolled singly linked list: every node stores a block of up to
+    `capacity` elements, so there is one node (and one pointer) per block
+    instead of per element:
+        head [1, 2, 3, 4] -> [5, 6, 7, 8] -> ... -> tail [n-1, n]
+    It has the same API as `SinglyLinkedList` but uses several times less
+    memory and iterating is much faster (it walks Python lists).
+
+    :param capacity: max number of elements in one node
+    :type capacity: int
+    :param head: pointer to the head node of the list
+    :type head: UnrolledNode
+    :param tail: pointer to the tail node of the list
+    :type tail: UnrolledNode
+    :param size: number of elements (not nodes!) in the list
+    :type size: int
+
+    """
+    CAPACITY = 64
+
+    def __init__(self, capacity=CAPACITY):
+        if capacity < 1:
+            raise ValueError('capacity must be positive.')
+        self.capacity = capacity
+        self.head = None
+        self.tail = None
+        self.size = 0
+
+    def __contains__(self, data):
+        current = self.head
+        while current:
+            if data in current.elements:
+                return True
+            current = current.next
+        return False
+
+    def __iter__(self):
+        current = self.head
+        while current:
+            yield from current.elements
+            current = current.next
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        reprint = "["
+        for data in self:
+            reprint += f"{data}, "
+        return reprint.strip() + ']'
+
+    def append(self, data):
+        """Appends (to tail -- to the right) data to the list.
+
+        :param data: data to be appended
+        :type data: object
+
+        :Example:
+        >>> my_list = UnrolledLinkedList()
+        >>> my_list.append(1)
+        >>> my_list.append(2)
+        >>> my_list
+        [1, 2,]
+        """
+        self.size += 1
+        if self.tail is not None:
+            if len(self.tail.elements) < self.capacity:
+                self.tail.elements.append(data)
+            else:
+                node = UnrolledNode([data])
+                self.tail.next = node
+                self.tail = node
+        else:  # First node in the list
+            self.head = self.tail = UnrolledNode([data])
+
+    def appendleft(self, data):
+        """Appends (to head -- to the left) data to the list.
 
-            previous = current
+        Inserting into the head block costs at most `capacity` moves, so it
+        is still O(1).
+
+        :param data: data to be appended
+        :type data: object
+
+        :Example:
+        >>> my_list = UnrolledLinkedList()
+        >>> my_list.appendleft(1)
+        >>> my_list.appendleft(2)
+        >>> my_list
+        [2, 1,]
+        """
+        self.size += 1
+        if self.head is not None:
+            if len(self.head.elements) < self.capacity:
+                self.head.elements.insert(0, data)
+            else:
+                node = UnrolledNode([data])
+                node.next = self.head
+                self.head = node
+        else:  # First node in the list
+            self.head = self.tail = UnrolledNode([data])
+
+    def delete(self, data):
+        """Removes all occurrences of data from the list. Nodes left empty
+        are unlinked.
+
+        :param data: data to be removed
+        :type data: object
+
+        :Example:
+        >>> my_list = UnrolledLinkedList()
+        >>> my_list.appendleft(1)
+        >>> my_list.appendleft(2)
+        >>> my_list.delete(1)
+        >>> my_list
+        [2,]
+        """
+        current = self.head
+        previous = None
+        while current:
+            if data in current.elements:
+                kept = [d for d in current.elements if d != data]
+                self.size -= len(current.elements) - len(kept)
+                current.elements = kept
+            if current.elements:
+                previous = current
+            else:  # unlink the empty node
+                if previous is None:
+                    self.head = current.next
+                else:
+                    previous.next = current.next
+                if current is self.tail:
+                    self.tail = previous
             current = current.next
 
 
@@ -210,6 +443,13 @@ class TestSinglyLinkedList(unittest.TestCase):
             with self.subTest(data=data, e=e):
                 self.assertEqual(e, data in my_list)
 
+    def test_contains_head(self):
+        my_list = SinglyLinkedList()
+        my_list.extend(['foo', 'bar', 'baz'])
+        for data in ['foo', 'bar', 'baz']:
+            with self.subTest(data=data):
+                self.assertIn(data, my_list)
+
     def test_iter(self):
         my_list = SinglyLinkedList()
         expected = list(range(100))
@@ -247,3 +487,179 @@ class TestSinglyLinkedList(unittest.TestCase):
             actual = len(my_list)
             with self.subTest(expected=i, actual=actual):
                 self.assertEqual(i, actual)
+
+
+class TestUnrolledLinkedList(unittest.TestCase):
+    def test_init(self):
+        my_list = UnrolledLinkedList()
+        actual = my_list.head, my_list.tail, my_list.size
+        for e, a in zip([None, None, 0], actual):
+            with self.subTest(e=e, a=a):
+                self.assertEqual(e, a)
+
+    def test_init_raises(self):
+        with self.assertRaises(ValueError):
+            UnrolledLinkedList(capacity=0)
+
+    def test_append(self):
+        my_list = UnrolledLinkedList(capacity=4)
+        [my_list.append(i) for i in range(10)]
+        data_set = [
+            (list(range(10)), list(my_list)),
+            ([0, 1, 2, 3], my_list.head.elements),
+            ([8, 9], my_list.tail.elements),
+            (10, len(my_list))
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_appendleft(self):
+        my_list = UnrolledLinkedList(capacity=4)
+        [my_list.appendleft(i) for i in range(10)]
+        data_set = [
+            (list(range(9, -1, -1)), list(my_list)),
+            ([9, 8], my_list.head.elements),
+            ([3, 2, 1, 0], my_list.tail.elements),
+            (10, len(my_list))
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_contains(self):
+        my_list = UnrolledLinkedList(capacity=2)
+        [my_list.append(i) for i in ['foo', 'bar', 'baz']]
+        for data, e in zip(['foo', 'baz', 'xyz'], [True, True, False]):
+            with self.subTest(data=data, e=e):
+                self.assertEqual(e, data in my_list)
+
+    def test_nested_iter(self):
+        my_list = UnrolledLinkedList(capacity=2)
+        [my_list.append(i) for i in range(3)]
+        pairs = [(a, b) for a in my_list for b in my_list]
+        self.assertEqual(9, len(pairs))
+
+    def test_delete(self):
+        data_set = [  # elem_to_delete, expected list
+            (0, list(range(1, 10))),
+            (9, list(range(9))),
+            (5, [0, 1, 2, 3, 4, 6, 7, 8, 9]),
+        ]
+        for elem, expected in data_set:
+            my_list = UnrolledLinkedList(capacity=3)
+            [my_list.append(i) for i in range(10)]
+            my_list.delete(elem)
+            with self.subTest(elem=elem):
+                self.assertListEqual(expected, list(my_list))
+                self.assertEqual(9, len(my_list))
+
+    def test_delete_whole_nodes(self):
+        my_list = UnrolledLinkedList(capacity=2)
+        [my_list.append(i) for i in [1, 1, 2, 3, 1, 1]]
+        my_list.delete(1)
+        data_set = [
+            ([2, 3], list(my_list)),
+            ([2, 3], my_list.head.elements),
+            (my_list.head, my_list.tail),
+            (2, len(my_list))
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+        my_list.delete(2)
+        my_list.delete(3)
+        self.assertEqual((None, None, 0), (my_list.head, my_list.tail, my_list.size))
+        my_list.append(4)
+        self.assertListEqual([4], list(my_list))
+
+
+class TestSinglyLinkedListQueue(unittest.TestCase):
+    def test_nested_iter(self):
+        my_list = SinglyLinkedList()
+        my_list.extend(range(3))
+        pairs = [(a, b) for a in my_list for b in my_list]
+        self.assertListEqual(
+            [(a, b) for a in range(3) for b in range(3)], pairs)
+
+    def test_extend(self):
+        my_list = SinglyLinkedList()
+        my_list.extend(range(5))
+        data_set = [
+            (list(range(5)), list(my_list)),
+            (0, my_list.head.data),
+            (4, my_list.tail.data),
+            (5, len(my_list))
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_popleft_fifo(self):
+        my_list = SinglyLinkedList()
+        my_list.extend(range(3))
+        actual = [my_list.popleft() for _ in range(4)]
+        self.assertListEqual([0, 1, 2, None], actual)
+        self.assertEqual((None, None, 0), (my_list.head, my_list.tail, my_list.size))
+        my_list.append('foo')
+        self.assertListEqual(['foo'], list(my_list))
+
+    def test_delete_first(self):
+        my_list = SinglyLinkedList()
+        my_list.extend([1, 2, 1, 2])
+        my_list.delete(1, delete_first=True)
+        self.assertListEqual([2, 1, 2], list(my_list))
+        my_list.delete(2)
+        self.assertListEqual([1], list(my_list))
+        self.assertIs(my_list.head, my_list.tail)
+
+    def test_delete_all_consecutive(self):
+        my_list = SinglyLinkedList()
+        my_list.extend([1, 1, 2, 1, 1])
+        my_list.delete(1)
+        data_set = [([2], list(my_list)), (1, len(my_list)), (2, my_list.tail.data)]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+        my_list.delete(2)
+        self.assertEqual((None, None, 0), (my_list.head, my_list.tail, my_list.size))
+
+    def test_delete_after(self):
+        my_list = SinglyLinkedList()
+        first = my_list.append(0)
+        middle = my_list.append(1)
+        my_list.append(2)
+        data_set = [
+            (2, my_list.delete_after(middle)),
+            (1, my_list.tail.data),
+            (1, my_list.delete_after(first)),
+            ([0], list(my_list)),
+            (first, my_list.tail),
+            (1, len(my_list))
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_delete_after_tail_raises(self):
+        my_list = SinglyLinkedList()
+        node = my_list.append(0)
+        with self.assertRaises(ValueError):
+            my_list.delete_after(node)
+
+    def test_delete_after_removed_node_raises(self):
+        my_list = SinglyLinkedList()
+        first = my_list.append(0)
+        middle = my_list.append(1)
+        my_list.append(2)
+        my_list.delete_after(first)
+        with self.subTest('removed by delete_after'):
+            with self.assertRaises(ValueError):
+                my_list.delete_after(middle)
+            self.assertEqual(([0, 2], 2), (list(my_list), len(my_list)))
+        my_list.popleft()
+        with self.subTest('removed by popleft'):
+            with self.assertRaises(ValueError):
+                my_list.delete_after(first)
+            self.assertEqual(([2], 1), (list(my_list), len(my_list)))
+            self.assertEqual(2, my_list.tail.data)
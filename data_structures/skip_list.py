@@ -0,0 +1,303 @@
+import bisect
+import random
+import time
+import unittest
+
+
+class SkipListNode(object):
+    """
+    Representation of a skip list node -- a singly linked list node that has
+    one `next` pointer per level.
+
+    :param data: data to be stored in the node
+    :type data: object
+    :param next: pointers to the next node on each level
+    :type next: list
+
+    """
+    __slots__ = ('data', 'next')
+
+    def __init__(self, data=None, level=1):
+        self.data = data
+        self.next = [None] * level
+
+
+class SkipList(object):
+    """
+    Ordered skip list: a stack of sorted singly linked lists where each level
+    skips over (on average) half of the nodes of the level below:
+        level 2: head ----------------> 5 ------------------> None
+        level 1: head ------> 3 ------> 5 ------> 9 --------> None
+        level 0: head -> 1 -> 3 -> 4 -> 5 -> 7 -> 9 -> 12 -> None
+    Levels are drawn at random, which gives expected O(log n) insert, search
+    and delete. For details please visit:
+    https://en.wikipedia.org/wiki/Skip_list
+
+    :param head: sentinel node (without data) with pointers on all levels
+    :type head: SkipListNode
+    :param level: number of levels currently in use
+    :type level: int
+    :param size: number of elements in the list
+    :type size: int
+
+    """
+    MAX_LEVEL = 32
+    P = 0.5
+
+    def __init__(self, iterable=(), seed=None):
+        self.head = SkipListNode(level=self.MAX_LEVEL)
+        self.level = 1
+        self.size = 0
+        self._random = random.Random(seed)
+        for data in iterable:
+            self.insert(data)
+
+    def __contains__(self, data):
+        node = self._find_greater_or_equal(data)
+        return node is not None and node.data == data
+
+    def __iter__(self):
+        current = self.head.next[0]
+        while current is not None:
+            yield current.data
+            current = current.next[0]
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        reprint = "["
+        for data in self:
+            reprint += f"{data}, "
+        return reprint.strip() + ']'
+
+    def _random_level(self):
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < self.P:
+            level += 1
+        return level
+
+    def _find_predecessors(self, data, strict=True):
+        """Finds, on every level, the last node with data < `data`
+        (or <= `data` when `strict` is False)."""
+        predecessors = [self.head] * self.MAX_LEVEL
+        current = self.head
+        for i in range(self.level - 1, -1, -1):
+            nxt = current.next[i]
+            if strict:
+                while nxt is not None and nxt.data < data:
+                    current, nxt = nxt, nxt.next[i]
+            else:
+                while nxt is not None and not data < nxt.data:
+                    current, nxt = nxt, nxt.next[i]
+            predecessors[i] = current
+        return predecessors
+
+    def _find_greater_or_equal(self, data):
+        current = self.head
+        for i in range(self.level - 1, -1, -1):
+            nxt = current.next[i]
+            while nxt is not None and nxt.data < data:
+                current, nxt = nxt, nxt.next[i]
+        return current.next[0]
+
+    def insert(self, data):
+        """Inserts data keeping the list sorted; equal elements are kept in
+        insertion order.
+
+        :param data: data to be inserted
+        :type data: must overload __lt__
+
+        :Example:
+        >>> skip_list = SkipList()
+        >>> skip_list.insert(3)
+        >>> skip_list.insert(1)
+        >>> skip_list
+        [1, 3,]
+        """
+        predecessors = self._find_predecessors(data, strict=False)
+        level = self._random_level()
+        self.level = max(self.level, level)
+        node = SkipListNode(data, level)
+        for i in range(level):
+            node.next[i] = predecessors[i].next[i]
+            predecessors[i].next[i] = node
+        self.size += 1
+
+    def delete(self, data):
+        """Removes the first occurrence of data. Does nothing if data is not
+        in the list.
+
+        :param data: data to be removed
+        :type data: must overload __lt__
+        :return: was data found (and removed)?
+        :rtype: bool
+
+        :Example:
+        >>> skip_list = SkipList([1, 2, 3])
+        >>> skip_list.delete(2)
+        True
+        >>> skip_list
+        [1, 3,]
+        """
+        predecessors = self._find_predecessors(data)
+        node = predecessors[0].next[0]
+        if node is None or node.data != data:
+            return False
+        for i in range(len(node.next)):
+            predecessors[i].next[i] = node.next[i]
+        while self.level > 1 and self.head.next[self.level - 1] is None:
+            self.level -= 1
+        self.size -= 1
+        return True
+
+    def range(self, lo=None, hi=None):
+        """Lazily yields data from the half-open range [lo, hi) in order.
+        `None` means unbounded.
+
+        :param lo: lower bound (inclusive)
+        :type lo: object
+        :param hi: upper bound (exclusive)
+        :type hi: object
+
+        :Example:
+        >>> skip_list = SkipList([5, 1, 4, 2, 3])
+        >>> list(skip_list.range(2, 4))
+        [2, 3]
+        """
+        if lo is None:
+            current = self.head.next[0]
+        else:
+            current = self._find_greater_or_equal(lo)
+        while current is not None and (hi is None or current.data < hi):
+            yield current.data
+            current = current.next[0]
+
+
+def benchmark_skip_list(n=100000, n_queries=100000, seed=0):
+    """Compares `SkipList` with a sorted Python list maintained by `bisect`
+    (inserts in random order, membership queries and range scans).
+
+    :param n: number of inserted elements
+    :type n: int
+    :param n_queries: number of membership queries
+    :type n_queries: int
+    :param seed: random seed
+    :type seed: int
+    :return: seconds spent on each operation: {name: (skip_list, bisect)}
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_skip_list(1000, 1000)
+    >>> sorted(results)
+    ['contains', 'insert', 'range']
+    """
+    rng = random.Random(seed)
+    data = [rng.randrange(10 * n) for _ in range(n)]
+    queries = [rng.randrange(10 * n) for _ in range(n_queries)]
+    results = dict()
+
+    start = time.perf_counter()
+    skip_list = SkipList(seed=seed)
+    for d in data:
+        skip_list.insert(d)
+    skip_list_time = time.perf_counter() - start
+    start = time.perf_counter()
+    array = []
+    for d in data:
+        bisect.insort(array, d)
+    results['insert'] = (skip_list_time, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for q in queries:
+        _ = q in skip_list
+    skip_list_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for q in queries:
+        i = bisect.bisect_left(array, q)
+        _ = i < len(array) and array[i] == q
+    results['contains'] = (skip_list_time, time.perf_counter() - start)
+
+    lo, hi = 2 * n, 8 * n
+    start = time.perf_counter()
+    _ = sum(1 for _ in skip_list.range(lo, hi))
+    skip_list_time = time.perf_counter() - start
+    start = time.perf_counter()
+    _ = len(array[bisect.bisect_left(array, lo):bisect.bisect_left(array, hi)])
+    results['range'] = (skip_list_time, time.perf_counter() - start)
+    return results
+
+
+class TestSkipList(unittest.TestCase):
+    def test_init(self):
+        skip_list = SkipList()
+        data_set = [(None, skip_list.head.next[0]), (1, skip_list.level), (0, len(skip_list))]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_insert_keeps_order(self):
+        rng = random.Random(1)
+        data = [rng.randrange(100) for _ in range(500)]
+        skip_list = SkipList(data, seed=1)
+        with self.subTest('order'):
+            self.assertListEqual(sorted(data), list(skip_list))
+        with self.subTest('size'):
+            self.assertEqual(500, len(skip_list))
+
+    def test_levels_are_sorted_sublists(self):
+        skip_list = SkipList(range(200, 0, -1), seed=2)
+        for i in range(skip_list.level):
+            level = []
+            current = skip_list.head.next[i]
+            while current is not None:
+                level.append(current.data)
+                current = current.next[i]
+            with self.subTest(level=i):
+                self.assertListEqual(sorted(level), level)
+
+    def test_contains(self):
+        skip_list = SkipList([1, 3, 5, 7], seed=3)
+        for data, expected in [(1, True), (7, True), (4, False), (0, False), (8, False)]:
+            with self.subTest(data=data, expected=expected):
+                self.assertEqual(expected, data in skip_list)
+
+    def test_delete(self):
+        skip_list = SkipList([4, 2, 2, 3, 1], seed=4)
+        data_set = [
+            (True, skip_list.delete(2)),
+            ([1, 2, 3, 4], list(skip_list)),
+            (False, skip_list.delete(10)),
+            (True, skip_list.delete(4)),
+            ([1, 2, 3], list(skip_list)),
+            (3, len(skip_list))
+        ]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_delete_all(self):
+        skip_list = SkipList(range(100), seed=5)
+        for i in range(100):
+            skip_list.delete(i)
+        data_set = [(0, len(skip_list)), (1, skip_list.level), ([], list(skip_list))]
+        for expected, actual in data_set:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(expected, actual)
+
+    def test_range(self):
+        skip_list = SkipList(range(0, 20, 2), seed=6)
+        data_set = [
+            ([4, 6, 8], (3, 10)),
+            ([4, 6], (4, 8)),
+            ([0, 2], (None, 4)),
+            ([16, 18], (15, None)),
+            ([], (100, 200)),
+        ]
+        for expected, (lo, hi) in data_set:
+            with self.subTest(lo=lo, hi=hi, expected=expected):
+                self.assertListEqual(expected, list(skip_list.range(lo, hi)))
+
+    def test_benchmark(self):
+        results = benchmark_skip_list(500, 500)
+        self.assertSetEqual({'insert', 'contains', 'range'}, set(results))
@@ -1,3 +1,7 @@
+import asyncio
+import queue
+import threading
+import time
 import unittest
 
 
@@ -87,6 +91,195 @@ class Stack(object):
             return self.top.data
 
 
+class ConcurrentStack(Stack):
+    """Thread-safe stack with blocking `pop` and optionally bounded capacity.
+
+    It can be used as a work pool shared by producer and consumer threads.
+    When `maxsize` is reached `push` blocks (back-pressure) until a consumer
+    pops something. Errors follow the convention of the builtin `queue`
+    module: `queue.Full` / `queue.Empty` are raised on timeouts.
+
+    :param maxsize: maximal number of elements, `0` means unbounded
+    :type maxsize: int
+    """
+    def __init__(self, maxsize=0):
+        super().__init__()
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def __repr__(self):
+        with self._lock:
+            return super().__repr__()
+
+    def _is_full(self):
+        return 0 < self.maxsize <= self.size
+
+    def push(self, data, block=True, timeout=None):
+        """Pushes to the stack, waits for a free slot if the stack is full
+
+        :param data: data to be pushed
+        :type data: object
+        :param block: should we wait for a free slot?
+        :type block: bool
+        :param timeout: max number of seconds to wait, `None` waits forever
+        :type timeout: float
+        :raises queue.Full: when there was no free slot in time
+        :Example:
+        >>> stack = ConcurrentStack(maxsize=1)
+        >>> stack.push(1)
+        >>> stack.push(2, timeout=0.01)
+        Traceback (most recent call last):
+        ...
+        queue.Full
+        """
+        with self._not_full:
+            if self._is_full():
+                if not block:
+                    raise queue.Full
+                if not self._not_full.wait_for(
+                        lambda: not self._is_full(), timeout):
+                    raise queue.Full
+            super().push(data)
+            self._not_empty.notify()
+
+    def pop(self, block=True, timeout=None):
+        """Pops the top, waits for data if the stack is empty
+
+        :param block: should we wait for data?
+        :type block: bool
+        :param timeout: max number of seconds to wait, `None` waits forever
+        :type timeout: float
+        :raises queue.Empty: when nothing was pushed in time
+        :Example:
+        >>> stack = ConcurrentStack()
+        >>> stack.push(1)
+        >>> stack.pop()
+        1
+        """
+        with self._not_empty:
+            if self.top is None:
+                if not block:
+                    raise queue.Empty
+                if not self._not_empty.wait_for(
+                        lambda: self.top is not None, timeout):
+                    raise queue.Empty
+            top = super().pop()
+            self._not_full.notify()
+            return top
+
+    def peak(self):
+        """Peaks the top (data is NOT removed), never blocks"""
+        with self._lock:
+            return super().peak()
+
+
+class AsyncStack(Stack):
+    """Stack for asyncio tasks: `pop` waits for data and `push` waits for
+    a free slot when `maxsize` is reached.
+
+    Must be used from a single event loop (it is not thread-safe).
+
+    :param maxsize: maximal number of elements, `0` means unbounded
+    :type maxsize: int
+    """
+    def __init__(self, maxsize=0):
+        super().__init__()
+        self.maxsize = maxsize
+        self._not_empty = None
+        self._not_full = None
+
+    def _conditions(self):
+        # Created lazily so that the stack can be built outside the loop
+        if self._not_empty is None:
+            lock = asyncio.Lock()
+            self._not_empty = asyncio.Condition(lock)
+            self._not_full = asyncio.Condition(lock)
+        return self._not_empty, self._not_full
+
+    def _is_full(self):
+        return 0 < self.maxsize <= self.size
+
+    async def push(self, data):
+        """Pushes to the stack, waits for a free slot if the stack is full
+
+        :param data: data to be pushed
+        :type data: object
+        :Example:
+        >>> async def main():
+        ...     stack = AsyncStack()
+        ...     await stack.push(1)
+        ...     return await stack.pop()
+        >>> asyncio.run(main())
+        1
+        """
+        not_empty, not_full = self._conditions()
+        async with not_full:
+            await not_full.wait_for(lambda: not self._is_full())
+            super().push(data)
+            not_empty.notify()
+
+    async def pop(self):
+        """Pops the top, waits until something is pushed if the stack is empty
+        """
+        not_empty, not_full = self._conditions()
+        async with not_empty:
+            await not_empty.wait_for(lambda: self.top is not None)
+            top = super().pop()
+            not_full.notify()
+            return top
+
+
+def benchmark_concurrent_stack(n_producers=4, n_consumers=4, n_items=100000,
+                               maxsize=1024):
+    """Measures throughput of `ConcurrentStack` used as a work pool shared by
+    `n_producers` producer and `n_consumers` consumer threads.
+
+    :param n_producers: number of producer threads
+    :type n_producers: int
+    :param n_consumers: number of consumer threads
+    :type n_consumers: int
+    :param n_items: total number of pushed (and popped) items
+    :type n_items: int
+    :param maxsize: capacity of the stack
+    :type maxsize: int
+    :return: items processed per second
+    :rtype: float
+
+    :Example:
+    >>> rate = benchmark_concurrent_stack(2, 2, n_items=1000)
+    >>> rate > 0
+    True
+    """
+    stack = ConcurrentStack(maxsize=maxsize)
+
+    def split(n_workers):
+        shares = [n_items // n_workers] * n_workers
+        shares[0] += n_items % n_workers
+        return shares
+
+    def produce(n):
+        for i in range(n):
+            stack.push(i)
+
+    def consume(n):
+        for _ in range(n):
+            stack.pop()
+
+    threads = [threading.Thread(target=produce, args=(n,))
+               for n in split(n_producers)]
+    threads += [threading.Thread(target=consume, args=(n,))
+                for n in split(n_consumers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return n_items / elapsed
+
+
 class TestStack(unittest.TestCase):
     def test_init(self):
         stack = Stack()
@@ -160,3 +353,83 @@ class TestStack(unittest.TestCase):
         with self.subTest(expected=expected_size, actual=actual_size):
             self.assertEqual(expected_size, actual_size)
 
+
+class TestConcurrentStack(unittest.TestCase):
+    def test_push_pop(self):
+        stack = ConcurrentStack()
+        [stack.push(i) for i in range(10)]
+        actual = [stack.pop() for _ in range(10)]
+        self.assertListEqual(list(range(9, -1, -1)), actual)
+
+    def test_pop_empty_raises(self):
+        stack = ConcurrentStack()
+        with self.subTest('non-blocking'):
+            with self.assertRaises(queue.Empty):
+                stack.pop(block=False)
+        with self.subTest('timeout'):
+            with self.assertRaises(queue.Empty):
+                stack.pop(timeout=0.01)
+
+    def test_push_full_raises(self):
+        stack = ConcurrentStack(maxsize=2)
+        stack.push(1)
+        stack.push(2)
+        with self.subTest('non-blocking'):
+            with self.assertRaises(queue.Full):
+                stack.push(3, block=False)
+        with self.subTest('timeout'):
+            with self.assertRaises(queue.Full):
+                stack.push(3, timeout=0.01)
+        self.assertEqual(2, stack.size)
+
+    def test_pop_waits_for_push(self):
+        stack = ConcurrentStack()
+        timer = threading.Timer(0.05, stack.push, args=('foo',))
+        timer.start()
+        self.assertEqual('foo', stack.pop(timeout=5))
+        timer.join()
+
+    def test_push_waits_for_pop(self):
+        stack = ConcurrentStack(maxsize=1)
+        stack.push('foo')
+        timer = threading.Timer(0.05, stack.pop)
+        timer.start()
+        stack.push('bar', timeout=5)
+        timer.join()
+        self.assertEqual('bar', stack.peak())
+
+    def test_producers_consumers(self):
+        rate = benchmark_concurrent_stack(4, 3, n_items=5000, maxsize=16)
+        self.assertGreater(rate, 0)
+
+
+class TestAsyncStack(unittest.TestCase):
+    def test_push_pop(self):
+        async def main():
+            stack = AsyncStack()
+            for i in range(10):
+                await stack.push(i)
+            return [await stack.pop() for _ in range(10)]
+        self.assertListEqual(list(range(9, -1, -1)), asyncio.run(main()))
+
+    def test_pop_waits_for_push(self):
+        async def main():
+            stack = AsyncStack()
+            consumer = asyncio.create_task(stack.pop())
+            await asyncio.sleep(0)
+            self.assertFalse(consumer.done())
+            await stack.push('foo')
+            return await asyncio.wait_for(consumer, 5)
+        self.assertEqual('foo', asyncio.run(main()))
+
+    def test_push_waits_for_pop(self):
+        async def main():
+            stack = AsyncStack(maxsize=1)
+            await stack.push('foo')
+            producer = asyncio.create_task(stack.push('bar'))
+            await asyncio.sleep(0)
+            self.assertFalse(producer.done())
+            self.assertEqual('foo', await stack.pop())
+            await asyncio.wait_for(producer, 5)
+            return await stack.pop()
+        self.assertEqual('bar', asyncio.run(main()))
@@ -0,0 +1,249 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import heapq
+import math
+from multiprocessing.shared_memory import SharedMemory
+import random
+import time
+import unittest
+
+import numpy as np
+
+from .csr_graph import CSRGraph
+from .searching import dijkstra_shortest_path
+
+
+def _dijkstra_to_targets(graph, start, targets):
+    """Dijkstra's algorithm from `start` in a weighted `CSRGraph` which stops
+    once all `targets` are settled. Returns distances to `targets` (nan for
+    unreachable ones)."""
+    indptr, indices = memoryview(graph.indptr), memoryview(graph.indices)
+    weights = memoryview(graph.weights)
+    remaining = set(targets)
+    found = dict()
+    distances = {start: 0}
+    heap = [(0, start)]
+    while heap and remaining:
+        length_u, u = heapq.heappop(heap)
+        if length_u > distances[u]:
+            continue
+        if u in remaining:
+            remaining.discard(u)
+            found[u] = length_u
+        for i in range(indptr[u], indptr[u + 1]):
+            v = indices[i]
+            added_length = length_u + weights[i]
+            if added_length < distances.get(v, math.inf):
+                distances[v] = added_length
+                heapq.heappush(heap, (added_length, v))
+    return [found.get(t, np.nan) for t in targets]
+
+
+def _answer_sources(graph, tasks):
+    """Answers queries of `tasks`: a list of (start, targets)."""
+    return [(start, targets, _dijkstra_to_targets(graph, start, targets))
+            for start, targets in tasks]
+
+
+def _answer_sources_shared(names, shapes, dtypes, tasks):
+    """Worker: attaches to the graph in shared memory (nothing but the names
+    of the blocks is pickled) and answers queries of `tasks`."""
+    blocks = [SharedMemory(name=name) for name in names]
+    try:
+        indptr, indices, weights = [
+            np.ndarray(shape, dtype, buffer=block.buf)
+            for shape, dtype, block in zip(shapes, dtypes, blocks)]
+        results = _answer_sources(CSRGraph(indptr, indices, weights), tasks)
+        del indptr, indices, weights  # views must be released before closing
+    finally:
+        for block in blocks:
+            block.close()
+    return results
+
+
+def batch_shortest_paths(graph, queries, n_workers=4, sources_per_task=8):
+    """Answers many shortest path queries at once. Queries are grouped by
+    start vertex, so there is one Dijkstra run per distinct start (which
+    stops when all its targets are settled). Runs are split between
+    `n_workers` processes, which read the graph (in `CSRGraph` format) from
+    shared memory instead of receiving a pickled copy with every task.
+    Results are yielded as soon as a task of `sources_per_task` starts is
+    completed, so their order is not the order of `queries`.
+
+    :param graph: a directed graph adjacency dict: {v: (weight, u)} or a
+        weighted `CSRGraph`
+    :type graph: dict or CSRGraph
+    :param queries: (start, end) pairs
+    :type queries: iterable
+    :param n_workers: number of worker processes (1 - no processes)
+    :type n_workers: int
+    :param sources_per_task: number of start vertices sent to a worker at
+        once
+    :type sources_per_task: int
+    :return: generator of (start, end, distance) triplets (distance is nan if
+        there is no path)
+    :rtype: generator
+    :raises: KeyError, ValueError
+
+    :Example:
+    >>> graph = {'A': [(4, 'B'), (2, 'C')], 'B': [(3, 'C'),], 'C': [(1, 'B')]}
+    >>> queries = [('A', 'B'), ('A', 'C'), ('C', 'A')]
+    >>> sorted(batch_shortest_paths(graph, queries, n_workers=1))
+    [('A', 'B', 3), ('A', 'C', 2), ('C', 'A', nan)]
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_weighted_dict(graph)
+    if graph.weights is None:
+        raise ValueError('The graph has no weights.')
+    grouped = defaultdict(list)
+    for start, end in queries:
+        grouped[graph.index(start)].append(graph.index(end))
+    tasks = list(grouped.items())
+    tasks = [tasks[i:i + sources_per_task]
+             for i in range(0, len(tasks), sources_per_task)]
+
+    if n_workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield from _labelled(graph, _answer_sources(graph, task))
+        return
+
+    arrays = [graph.indptr, graph.indices, graph.weights]
+    blocks = [SharedMemory(create=True, size=max(a.nbytes, 1))
+              for a in arrays]
+    executor = ProcessPoolExecutor(n_workers)
+    try:
+        for array, block in zip(arrays, blocks):
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+        names = [block.name for block in blocks]
+        shapes = [array.shape for array in arrays]
+        dtypes = [array.dtype.str for array in arrays]
+        futures = [
+            executor.submit(_answer_sources_shared, names, shapes, dtypes,
+                            task)
+            for task in tasks
+        ]
+        for future in as_completed(futures):
+            yield from _labelled(graph, future.result())
+    finally:
+        # Also reached when the caller stops iterating early.
+        executor.shutdown(cancel_futures=True)
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _labelled(graph, results):
+    for start, targets, distances in results:
+        for end, distance in zip(targets, distances):
+            yield graph.label(start), graph.label(end), distance
+
+
+def benchmark_batch_shortest_paths(n=20000, n_edges=100000, n_sources=64,
+                                   n_queries=1000, workers=(1, 2, 4, 8),
+                                   seed=0):
+    """Measures queries per second of `batch_shortest_paths` for different
+    numbers of workers and of calling `dijkstra_shortest_path` for every
+    query, on a random graph with queries from `n_sources` distinct starts.
+
+    :param n: number of vertices
+    :type n: int
+    :param n_edges: number of edges
+    :type n_edges: int
+    :param n_sources: number of distinct starts of queries
+    :type n_sources: int
+    :param n_queries: number of queries
+    :type n_queries: int
+    :param workers: numbers of workers to be checked
+    :type workers: iterable of ints
+    :param seed: random seed
+    :type seed: int
+    :return: queries per second: {'serial': float, 'batch': {n_workers:
+        float}}
+    :rtype: dict
+    """
+    rng = random.Random(seed)
+    graph = {v: [] for v in range(n)}
+    for _ in range(n_edges):
+        graph[rng.randrange(n)].append((rng.randrange(1, 100),
+                                        rng.randrange(n)))
+    sources = rng.sample(range(n), n_sources)
+    queries = [(rng.choice(sources), rng.randrange(n))
+               for _ in range(n_queries)]
+    csr_graph = CSRGraph.from_weighted_dict(graph)
+
+    start = time.perf_counter()
+    for s, e in queries:
+        dijkstra_shortest_path(graph, s, e)
+    results = {'serial': n_queries / (time.perf_counter() - start),
+               'batch': dict()}
+    for n_workers in workers:
+        start = time.perf_counter()
+        for _ in batch_shortest_paths(csr_graph, queries, n_workers):
+            pass
+        results['batch'][n_workers] = \
+            n_queries / (time.perf_counter() - start)
+    return results
+
+
+class TestBatchShortestPaths(unittest.TestCase):
+    @staticmethod
+    def _random_graph(rng, n):
+        return {v: [(rng.randrange(10), rng.randrange(n))
+                    for _ in range(rng.randrange(4))] for v in range(n)}
+
+    def _assert_results(self, graph, queries, results):
+        expected = sorted(
+            (s, e, dijkstra_shortest_path(graph, s, e)) for s, e in queries)
+        actual = sorted(results)
+        self.assertEqual(len(expected), len(actual))
+        for e, a in zip(expected, actual):
+            with self.subTest(e=e, a=a):
+                self.assertEqual(e[:2], a[:2])
+                if np.isnan(e[2]):
+                    self.assertTrue(np.isnan(a[2]))
+                else:
+                    self.assertEqual(e[2], a[2])
+
+    def test_batch_shortest_paths(self):
+        rng = random.Random(0)
+        for _ in range(10):
+            n = rng.randrange(1, 30)
+            graph = self._random_graph(rng, n)
+            queries = [(rng.randrange(n), rng.randrange(n))
+                       for _ in range(50)]
+            results = batch_shortest_paths(graph, queries, n_workers=1)
+            self._assert_results(graph, queries, results)
+
+    def test_batch_shortest_paths_workers(self):
+        rng = random.Random(1)
+        graph = self._random_graph(rng, 200)
+        queries = [(rng.randrange(20), rng.randrange(200))
+                   for _ in range(300)]
+        results = batch_shortest_paths(
+            graph, queries, n_workers=2, sources_per_task=3)
+        self._assert_results(graph, queries, results)
+
+    def test_batch_shortest_paths_stop_early(self):
+        rng = random.Random(2)
+        graph = self._random_graph(rng, 100)
+        queries = [(s, 0) for s in range(100)]
+        results = batch_shortest_paths(
+            graph, queries, n_workers=2, sources_per_task=1)
+        first = next(results)
+        results.close()
+        self.assertEqual(0, first[1])
+
+    def test_batch_shortest_paths_raises(self):
+        data_set = [
+            (KeyError, {'A': [(1, 'B')]}, [('A', 'X')]),
+            (ValueError, CSRGraph.from_edges([0], [1]), [(0, 1)])
+        ]
+        for error, graph, queries in data_set:
+            with self.subTest(error=error):
+                with self.assertRaises(error):
+                    list(batch_shortest_paths(graph, queries, n_workers=1))
+
+    def test_benchmark(self):
+        results = benchmark_batch_shortest_paths(
+            200, 1000, 4, 20, workers=(1, 2))
+        self.assertEqual([1, 2], sorted(results['batch']))
@@ -0,0 +1,449 @@
+import ast
+import heapq
+import io
+import math
+import random
+import time
+import unittest
+
+import numpy as np
+
+from .csr_graph import CSRGraph
+from .searching import bidirectional_dijkstra, dijkstra_shortest_path
+
+
+class ContractionHierarchy(object):
+    """Contraction hierarchy: an index for fast repeated shortest path
+    queries on a static weighted directed graph.
+
+    Preprocessing (`build`) contracts vertices one by one, from the least
+    important ones. Contracting `v` removes it from the graph and, for every
+    pair of its neighbours u -> v -> w whose shortest path goes through `v`,
+    adds a shortcut u -> w of the same length. The position of a vertex in
+    this order is its rank. Every shortest path then has an equally short
+    version which first only goes up in rank and then only down, so a query
+    is a bidirectional Dijkstra which only follows edges to vertices of
+    higher rank (`upward` from the start, `downward` - reversed - from the
+    end) and settles a small part of the graph.
+
+    :Example:
+    >>> graph = {'A': [(4, 'B'), (2, 'C')], 'B': [(3, 'C'),], 'C': [(1, 'B')]}
+    >>> hierarchy = ContractionHierarchy.build(graph)
+    >>> hierarchy.distance('A', 'B')
+    3
+    """
+
+    def __init__(self, labels, ranks, upward, downward):
+        """
+        :param labels: labels of vertices
+        :type labels: list
+        :param ranks: rank of every vertex
+        :type ranks: numpy.ndarray
+        :param upward: edges (and shortcuts) to vertices of higher rank
+        :type upward: CSRGraph
+        :param downward: reversed edges (and shortcuts) from vertices of
+            higher rank
+        :type downward: CSRGraph
+        """
+        self.labels = labels
+        self._index = {v: i for i, v in enumerate(labels)}
+        self.ranks = ranks
+        self.upward = upward
+        self.downward = downward
+        # Queries only touch a few hundred vertices, so they run on Python
+        # lists of (neighbour, weight) pairs, which are the fastest to
+        # iterate over.
+        self._graphs = tuple(
+            [list(zip(g.neighbours(v).tolist(),
+                      g.weights[g.indptr[v]:g.indptr[v + 1]].tolist()))
+             for v in range(len(labels))]
+            for g in (upward, downward))
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def build(cls, graph, max_settled=100):
+        """Builds the hierarchy of a weighted graph. Vertices are contracted
+        in the order of their edge difference (number of shortcuts needed
+        minus number of removed edges) plus the number of already contracted
+        neighbours, which spreads contraction evenly over the graph.
+
+        Whether a shortcut u -> v -> w is needed is decided by a witness
+        search: a local Dijkstra from u, avoiding v, which settles at most
+        `max_settled` vertices. If it doesn't find a path to w which is not
+        longer, the shortcut is added (maybe unnecessarily, which is still
+        correct).
+
+        :param graph: a directed graph adjacency dict: {v: (weight, u)}
+        :type graph: dict
+        :param max_settled: limit of the witness searches
+        :type max_settled: int
+        :return: hierarchy
+        :rtype: ContractionHierarchy
+        """
+        labels = list(graph)
+        index = {v: i for i, v in enumerate(labels)}
+        for neighbours in graph.values():
+            for _, u in neighbours:
+                if u not in index:
+                    index[u] = len(labels)
+                    labels.append(u)
+        n = len(labels)
+        # Remaining (not contracted) graph, without parallel edges and loops.
+        out_edges = [dict() for _ in range(n)]
+        in_edges = [dict() for _ in range(n)]
+        for v, neighbours in graph.items():
+            i = index[v]
+            for length, u in neighbours:
+                j = index[u]
+                if i != j and length < out_edges[i].get(j, math.inf):
+                    out_edges[i][j] = length
+                    in_edges[j][i] = length
+
+        def shortcuts(v):
+            result = []
+            for u, length_uv in in_edges[v].items():
+                lengths = {w: length_uv + length_vw
+                           for w, length_vw in out_edges[v].items() if w != u}
+                if not lengths:
+                    continue
+                witness = _witness_search(
+                    out_edges, u, v, lengths, max_settled)
+                for w, length in lengths.items():
+                    if witness.get(w, math.inf) > length:
+                        result.append((u, w, length))
+            return result
+
+        def priority(v, v_shortcuts):
+            return (len(v_shortcuts) - len(in_edges[v]) - len(out_edges[v])
+                    + contracted_neighbours[v])
+
+        contracted_neighbours = [0] * n
+        heap = [(priority(v, shortcuts(v)), v) for v in range(n)]
+        heapq.heapify(heap)
+        ranks = np.zeros(n, dtype=np.int64)
+        upward_edges, downward_edges = [], []
+        rank = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            # Priorities change as neighbours are contracted, so they are
+            # updated lazily.
+            v_shortcuts = shortcuts(v)
+            v_priority = priority(v, v_shortcuts)
+            if heap and v_priority > heap[0][0]:
+                heapq.heappush(heap, (v_priority, v))
+                continue
+
+            for u, w, length in v_shortcuts:
+                if length < out_edges[u].get(w, math.inf):
+                    out_edges[u][w] = length
+                    in_edges[w][u] = length
+            ranks[v] = rank
+            rank += 1
+            for w, length in out_edges[v].items():
+                upward_edges.append((v, w, length))
+                del in_edges[w][v]
+                contracted_neighbours[w] += 1
+            for u, length in in_edges[v].items():
+                downward_edges.append((v, u, length))
+                del out_edges[u][v]
+                contracted_neighbours[u] += 1
+            out_edges[v] = in_edges[v] = None
+
+        upward, downward = [
+            CSRGraph.from_edges(
+                [e[0] for e in edges], [e[1] for e in edges],
+                np.array([e[2] for e in edges]), n_vertices=n)
+            for edges in (upward_edges, downward_edges)
+        ]
+        return cls(labels, ranks, upward, downward)
+
+    @property
+    def n_edges(self):
+        """Number of edges and shortcuts in the hierarchy."""
+        return self.upward.n_edges + self.downward.n_edges
+
+    def save(self, file):
+        """Saves the hierarchy in numpy `.npz` format, without pickling.
+        Integer labels are stored as an integer array, other labels as
+        their `repr`, so they must be Python literals (e.g. strings or
+        tuples). Raises ValueError otherwise.
+
+        :param file: file name or a file-like object
+        :type file: str or file
+        :raises: ValueError
+        """
+        if all(type(label) is int for label in self.labels):
+            labels = np.array(self.labels, dtype=np.int64)
+        else:
+            labels = [repr(label) for label in self.labels]
+            for label, text in zip(self.labels, labels):
+                try:
+                    if ast.literal_eval(text) != label:
+                        raise ValueError
+                except (ValueError, SyntaxError):
+                    raise ValueError(
+                        f"{text} is not a Python literal.") from None
+            labels = np.array(labels, dtype=str)
+        np.savez(
+            file, labels=labels, ranks=self.ranks,
+            upward_indptr=self.upward.indptr,
+            upward_indices=self.upward.indices,
+            upward_weights=self.upward.weights,
+            downward_indptr=self.downward.indptr,
+            downward_indices=self.downward.indices,
+            downward_weights=self.downward.weights)
+
+    @classmethod
+    def load(cls, file):
+        """Loads a hierarchy saved with `save`.
+
+        :param file: file name or a file-like object
+        :type file: str or file
+        :return: hierarchy
+        :rtype: ContractionHierarchy
+        """
+        with np.load(file) as data:
+            upward, downward = [
+                CSRGraph(data[f'{name}_indptr'], data[f'{name}_indices'],
+                         data[f'{name}_weights'])
+                for name in ('upward', 'downward')
+            ]
+            labels = data['labels']
+            if labels.dtype.kind == 'U':
+                labels = [ast.literal_eval(text) for text in labels]
+            else:
+                labels = labels.tolist()
+            return cls(labels, data['ranks'], upward, downward)
+
+    def distance(self, start, end):
+        """Finds the length of the shortest path between `start` and `end`.
+        Raises KeyError if any of them is not in the graph.
+
+        :param start: start vertex
+        :type start: hashable
+        :param end: end vertex
+        :type end: hashable
+        :return: distance between start and end (nan if there is no path)
+        :rtype: numeric
+        :raises: KeyError
+
+        :Example:
+        >>> graph = {'A': [(1, 'B')], 'B': [(1, 'C')], 'C': [], 'D': []}
+        >>> hierarchy = ContractionHierarchy.build(graph)
+        >>> hierarchy.distance('A', 'C'), hierarchy.distance('A', 'D')
+        (2, nan)
+        """
+        s, t = self._to_index(start), self._to_index(end)
+        if s == t:
+            return 0
+        heaps = ([(0, s)], [(0, t)])
+        distances = ({s: 0}, {t: 0})
+        best = math.inf
+        while heaps[0] or heaps[1]:
+            if not heaps[1] or heaps[0] and heaps[0][0] <= heaps[1][0]:
+                side = 0
+            else:
+                side = 1
+            length_u, u = heapq.heappop(heaps[side])
+            if length_u > distances[side][u]:
+                continue
+            if length_u >= best:
+                # Nothing shorter can be found on this side.
+                heaps[side].clear()
+                continue
+            other_length = distances[1 - side].get(u)
+            if other_length is not None and length_u + other_length < best:
+                best = length_u + other_length
+            side_distances, heap = distances[side], heaps[side]
+            # Stall-on-demand: if a vertex of higher rank gives a shorter
+            # path to u, this is not a shortest path and needn't be extended.
+            for v, length_v in self._graphs[1 - side][u]:
+                if side_distances.get(v, math.inf) + length_v < length_u:
+                    break
+            else:
+                for v, length_v in self._graphs[side][u]:
+                    added_length = length_u + length_v
+                    if added_length < side_distances.get(v, math.inf):
+                        side_distances[v] = added_length
+                        heapq.heappush(heap, (added_length, v))
+        return np.nan if best == math.inf else best
+
+    def _to_index(self, v):
+        try:
+            return self._index[v]
+        except KeyError:
+            raise KeyError(f"{v} is not in the graph.") from None
+
+
+def _witness_search(out_edges, start, avoided, lengths, max_settled):
+    """Dijkstra from `start` in the remaining graph, not going through
+    `avoided`, which stops when all targets (keys of `lengths`) are settled,
+    paths get longer than all `lengths`, or after `max_settled` settled
+    vertices. Returns found (maybe not the shortest) distances."""
+    max_length = max(lengths.values())
+    n_targets = len(lengths)
+    distances = {start: 0}
+    heap = [(0, start)]
+    settled = 0
+    while heap and settled < max_settled:
+        length_u, u = heapq.heappop(heap)
+        if length_u > distances[u]:
+            continue
+        if length_u > max_length:
+            break
+        settled += 1
+        if u in lengths:
+            n_targets -= 1
+            if not n_targets:
+                break
+        for v, length_v in out_edges[u].items():
+            if v == avoided:
+                continue
+            added_length = length_u + length_v
+            if added_length < distances.get(v, math.inf):
+                distances[v] = added_length
+                heapq.heappush(heap, (added_length, v))
+    return distances
+
+
+def benchmark_contraction_hierarchy(side=50, n_queries=1000, seed=0):
+    """Measures preprocessing and query time of `ContractionHierarchy` and
+    compares queries with `dijkstra_shortest_path` and
+    `bidirectional_dijkstra` on a `side` x `side` grid with edges (in both
+    directions) between neighbouring points of random lengths 1 to 1.5.
+
+    :param side: number of points on a side of the grid
+    :type side: int
+    :param n_queries: number of random (start, end) queries
+    :type n_queries: int
+    :param seed: random seed
+    :type seed: int
+    :return: seconds of preprocessing ('build') and average seconds per
+        query of each method
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_contraction_hierarchy(5, 10)
+    >>> sorted(results)
+    ['bidirectional', 'build', 'contraction_hierarchy', 'dijkstra']
+    """
+    rng = random.Random(seed)
+    graph = {(x, y): [] for x in range(side) for y in range(side)}
+    for x, y in graph:
+        for u in [(x + 1, y), (x, y + 1)]:
+            if u in graph:
+                length = rng.uniform(1, 1.5)
+                graph[x, y].append((length, u))
+                graph[u].append((length, (x, y)))
+    vertices = list(graph)
+    queries = [(rng.choice(vertices), rng.choice(vertices))
+               for _ in range(n_queries)]
+
+    results = dict()
+    start = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(graph)
+    results['build'] = time.perf_counter() - start
+    searches = [
+        ('contraction_hierarchy', hierarchy.distance),
+        ('dijkstra', lambda s, e: dijkstra_shortest_path(graph, s, e)),
+        ('bidirectional', lambda s, e: bidirectional_dijkstra(
+            graph, s, e, graph))  # the graph is symmetric
+    ]
+    for name, search in searches:
+        start = time.perf_counter()
+        for s, e in queries:
+            search(s, e)
+        results[name] = (time.perf_counter() - start) / n_queries
+    return results
+
+
+class TestContractionHierarchy(unittest.TestCase):
+    DIJKSTRA_TEST_DICT = {  # Fig 4.9 (see TestSearching)
+        'A': [(4, 'B'), (2, 'C')],
+        'B': [(3, 'C'), (2, 'D'), (3, 'E')],
+        'C': [(1, 'B'), (4, 'D'), (5, 'E')],
+        'D': [],
+        'E': [(1, 'D')]
+    }
+
+    def _assert_distances(self, graph, hierarchy):
+        for start in graph:
+            for end in graph:
+                expected = dijkstra_shortest_path(graph, start, end)
+                actual = hierarchy.distance(start, end)
+                with self.subTest(graph=graph, start=start, end=end):
+                    if np.isnan(expected):
+                        self.assertTrue(np.isnan(actual))
+                    else:
+                        self.assertAlmostEqual(expected, actual)
+
+    def test_distance(self):
+        hierarchy = ContractionHierarchy.build(self.DIJKSTRA_TEST_DICT)
+        self._assert_distances(self.DIJKSTRA_TEST_DICT, hierarchy)
+
+    def test_distance_on_random_graphs(self):
+        rng = random.Random(0)
+        for _ in range(30):
+            n = rng.randrange(1, 25)
+            graph = {v: [(rng.randrange(1, 10), rng.randrange(n))
+                         for _ in range(rng.randrange(5))] for v in range(n)}
+            hierarchy = ContractionHierarchy.build(graph)
+            self._assert_distances(graph, hierarchy)
+
+    def test_distance_with_limited_witness_search(self):
+        rng = random.Random(1)
+        for _ in range(10):
+            n = rng.randrange(10, 40)
+            graph = {v: [(rng.random(), rng.randrange(n))
+                         for _ in range(rng.randrange(1, 4))]
+                     for v in range(n)}
+            hierarchy = ContractionHierarchy.build(graph, max_settled=1)
+            self._assert_distances(graph, hierarchy)
+
+    def test_ranks(self):
+        hierarchy = ContractionHierarchy.build(self.DIJKSTRA_TEST_DICT)
+        with self.subTest('permutation'):
+            self.assertEqual(list(range(5)), sorted(hierarchy.ranks))
+        for graph in (hierarchy.upward, hierarchy.downward):
+            for v in range(len(hierarchy)):
+                for u in graph.neighbours(v):
+                    with self.subTest(v=v, u=u):
+                        self.assertLess(hierarchy.ranks[v],
+                                        hierarchy.ranks[u])
+
+    def test_save_load(self):
+        rng = random.Random(2)
+        data_set = [
+            ('tuples', lambda v: (v, str(v))),
+            ('ints', lambda v: v),
+        ]
+        for name, label in data_set:
+            graph = {label(v): [(rng.randrange(1, 10), label(u))
+                                for u in rng.sample(range(20), 3)]
+                     for v in range(20)}
+            hierarchy = ContractionHierarchy.build(graph)
+            file = io.BytesIO()
+            hierarchy.save(file)
+            file.seek(0)
+            loaded = ContractionHierarchy.load(file)
+            with self.subTest(name):
+                self.assertEqual(hierarchy.labels, loaded.labels)
+            self._assert_distances(graph, loaded)
+
+    def test_save_raises(self):
+        hierarchy = ContractionHierarchy.build({object(): [(1, 'A')]})
+        with self.assertRaises(ValueError):
+            hierarchy.save(io.BytesIO())
+
+    def test_distance_raises(self):
+        hierarchy = ContractionHierarchy.build(self.DIJKSTRA_TEST_DICT)
+        with self.assertRaises(KeyError):
+            hierarchy.distance('A', 'X')
+
+    def test_benchmark(self):
+        results = benchmark_contraction_hierarchy(5, 10)
+        self.assertEqual(
+            ['bidirectional', 'build', 'contraction_hierarchy', 'dijkstra'],
+            sorted(results))
@@ -0,0 +1,813 @@
+from collections import deque
+import heapq
+import random
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from .searching import bfs, dfs, dijkstra_shortest_path, find_sccs
+
+
+class CSRGraph(object):
+    """A directed graph in the compressed sparse row (CSR) format: neighbours
+    of vertex `i` are `indices[indptr[i]:indptr[i + 1]]` (and the weights of
+    these edges are `weights[indptr[i]:indptr[i + 1]]`).
+
+    Vertices are integers `0..n - 1`; `labels` (optional) maps them back to
+    the hashable labels used in the adjacency dicts of `searching.py`. It
+    costs 8 bytes per vertex plus 4 (or 8 for huge graphs) bytes per edge
+    (plus 8 per edge for weights), instead of a dict of lists.
+
+    :Example:
+    >>> graph = CSRGraph.from_adjacency_dict({'A': ['B', 'C'], 'B': ['C']})
+    >>> graph.indptr
+    array([0, 2, 3, 3])
+    >>> graph.indices
+    array([1, 2, 2], dtype=int32)
+    >>> graph.labels
+    ['A', 'B', 'C']
+    >>> graph.index('C')
+    2
+    """
+
+    def __init__(self, indptr, indices, weights=None, labels=None):
+        """
+        :param indptr: offsets of the rows (n + 1 elements)
+        :type indptr: numpy.ndarray
+        :param indices: neighbours of all vertices
+        :type indices: numpy.ndarray
+        :param weights: weights of the edges (or None for unweighted graphs)
+        :type weights: numpy.ndarray
+        :param labels: labels of vertices (or None, vertices are 0..n - 1)
+        :type labels: list
+        """
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        n = len(self.indptr) - 1
+        self.indices = np.ascontiguousarray(indices, dtype=_index_dtype(n))
+        if len(self.indices) != self.indptr[-1]:
+            raise ValueError('indptr does not match indices.')
+        if weights is not None:
+            weights = np.ascontiguousarray(weights)
+            if len(weights) != len(self.indices):
+                raise ValueError('weights do not match indices.')
+        self.weights = weights
+        self.labels = labels
+        self._index = None
+        if labels is not None:
+            if len(labels) != n:
+                raise ValueError('labels do not match indptr.')
+            self._index = {v: i for i, v in enumerate(labels)}
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def n_edges(self):
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(cls, sources, targets, weights=None, n_vertices=None,
+                   labels=None):
+        """Builds the graph from arrays of edges (source[i] -> target[i]),
+        which is the way to go for graphs too big for a dict. Edges of each
+        vertex keep their relative order.
+
+        :param sources: sources of the edges
+        :type sources: numpy.ndarray
+        :param targets: targets of the edges
+        :type targets: numpy.ndarray
+        :param weights: weights of the edges
+        :type weights: numpy.ndarray
+        :param n_vertices: number of vertices (default: max vertex + 1)
+        :type n_vertices: int
+        :param labels: labels of vertices
+        :type labels: list
+        :return: the graph
+        :rtype: CSRGraph
+
+        :Example:
+        >>> graph = CSRGraph.from_edges([2, 0, 0], [0, 2, 1], [5, 3, 4])
+        >>> graph.indices, graph.weights
+        (array([2, 1, 0], dtype=int32), array([3, 4, 5]))
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if n_vertices is None:
+            n_vertices = 0
+            if len(sources):
+                n_vertices = int(max(sources.max(), targets.max())) + 1
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(n_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n_vertices),
+                  out=indptr[1:])
+        if weights is not None:
+            weights = np.asarray(weights)[order]
+        return cls(indptr, targets[order], weights, labels)
+
+    @classmethod
+    def from_adjacency_dict(cls, adjacency_dict):
+        """Converts an adjacency dict {v: [u, ...]} (the format of `dfs`,
+        `bfs` and `find_sccs`). Vertices that are only neighbours get
+        indices after all keys.
+
+        :param adjacency_dict: a representation of an adjacency list
+        :type adjacency_dict: dict(hashable: list)
+        :return: the graph
+        :rtype: CSRGraph
+        """
+        return cls._from_dict(adjacency_dict, weighted=False)
+
+    @classmethod
+    def from_weighted_dict(cls, graph):
+        """Converts a weighted adjacency dict {v: [(weight, u), ...]} (the
+        format of `dijkstra_shortest_path`).
+
+        :param graph: a directed graph adjacency dict: {v: (weight, u)}
+        :type graph: dict
+        :return: the graph
+        :rtype: CSRGraph
+
+        :Example:
+        >>> graph = CSRGraph.from_weighted_dict({'A': [(4, 'B'), (2, 'C')]})
+        >>> graph.indices, graph.weights
+        (array([1, 2], dtype=int32), array([4, 2]))
+        """
+        return cls._from_dict(graph, weighted=True)
+
+    @classmethod
+    def _from_dict(cls, a_dict, weighted):
+        labels = list(a_dict)
+        index = {v: i for i, v in enumerate(labels)}
+        n_edges = 0
+        for neighbours in a_dict.values():
+            n_edges += len(neighbours)
+            for u in neighbours:
+                if weighted:
+                    u = u[1]
+                if u not in index:
+                    index[u] = len(labels)
+                    labels.append(u)
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum([len(neighbours) for neighbours in a_dict.values()],
+                  out=indptr[1:len(a_dict) + 1])
+        indptr[len(a_dict) + 1:] = n_edges
+        if weighted:
+            indices = np.fromiter(
+                (index[u] for neighbours in a_dict.values()
+                 for _, u in neighbours),
+                dtype=_index_dtype(len(labels)), count=n_edges)
+            weights = np.array(
+                [w for neighbours in a_dict.values() for w, _ in neighbours])
+        else:
+            indices = np.fromiter(
+                (index[u] for neighbours in a_dict.values()
+                 for u in neighbours),
+                dtype=_index_dtype(len(labels)), count=n_edges)
+            weights = None
+        return cls(indptr, indices, weights, labels)
+
+    def index(self, label):
+        """Returns the vertex (integer) of `label`. Raises KeyError if there
+        is no such vertex.
+
+        :param label: label of a vertex
+        :type label: hashable
+        :return: vertex
+        :rtype: int
+        :raises: KeyError
+        """
+        if self._index is None:
+            if not 0 <= label < len(self):
+                raise KeyError(f"{label} is not in the graph.")
+            return label
+        try:
+            return self._index[label]
+        except KeyError:
+            raise KeyError(f"{label} is not in the graph.") from None
+
+    def label(self, v):
+        """Returns the label of vertex `v`.
+
+        :param v: vertex
+        :type v: int
+        :return: label
+        :rtype: hashable
+        """
+        return v if self.labels is None else self.labels[v]
+
+    def neighbours(self, v):
+        """Returns neighbours of vertex `v` (a view, not a copy).
+
+        :param v: vertex
+        :type v: int
+        :return: neighbours
+        :rtype: numpy.ndarray
+        """
+        return self.indices[self.indptr[v]:self.indptr[v + 1]]
+
+    def sources(self):
+        """Returns the source of each edge (the inverse of `indptr`).
+
+        :return: sources of the edges
+        :rtype: numpy.ndarray
+        """
+        return np.repeat(np.arange(len(self), dtype=self.indices.dtype),
+                         np.diff(self.indptr))
+
+    def reversed(self):
+        """Returns the graph with all edges reversed (with the same labels).
+
+        :return: reversed graph
+        :rtype: CSRGraph
+
+        :Example:
+        >>> graph = CSRGraph.from_adjacency_dict({'A': ['B', 'C'], 'B': ['C']})
+        >>> reversed_graph = graph.reversed()
+        >>> reversed_graph.indptr, reversed_graph.indices
+        (array([0, 0, 1, 3]), array([0, 0, 1], dtype=int32))
+        """
+        return CSRGraph.from_edges(self.indices, self.sources(), self.weights,
+                                   len(self), self.labels)
+
+
+def _index_dtype(n):
+    return np.int32 if n <= np.iinfo(np.int32).max else np.int64
+
+
+def csr_bfs(graph, start):
+    """Breadth First Search (BFS) over a `CSRGraph`.
+
+    :param graph: graph
+    :type graph: CSRGraph
+    :param start: the vertex (integer) from which search is started
+    :type start: int
+    :return: distances and parents of all vertices (-1 for unreachable
+        vertices, parent of `start` is -1)
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+
+    :Example:
+    >>> graph = CSRGraph.from_adjacency_dict(
+    ...     {'A': ['B', 'E'], 'B': ['C'], 'C': ['D'], 'D': ['E'], 'E': []})
+    >>> distances, parents = csr_bfs(graph, graph.index('A'))
+    >>> distances
+    array([0, 1, 2, 3, 1])
+    >>> parents
+    array([-1,  0,  1,  2,  0])
+    """
+    n = len(graph)
+    distances = np.full(n, -1, dtype=np.int64)
+    parents = np.full(n, -1, dtype=np.int64)
+    # Element access through memoryviews is much cheaper than through numpy.
+    indptr, indices = memoryview(graph.indptr), memoryview(graph.indices)
+    distance_view, parent_view = memoryview(distances), memoryview(parents)
+
+    distance_view[start] = 0
+    queue = deque([start])
+    while queue:
+        u = queue.popleft()
+        distance_u = distance_view[u] + 1
+        for i in range(indptr[u], indptr[u + 1]):
+            v = indices[i]
+            if distance_view[v] < 0:
+                distance_view[v] = distance_u
+                parent_view[v] = u
+                queue.append(v)
+    return distances, parents
+
+
+def csr_bfs_frontier(graph, start, direction_optimizing=False,
+                     reversed_graph=None):
+    """Level-synchronous Breadth First Search (BFS) over a `CSRGraph`: every
+    step processes the whole frontier with numpy operations (gathers the
+    edges of the frontier, masks visited vertices and removes duplicates)
+    instead of one vertex at a time.
+
+    With `direction_optimizing` every level is expanded either top-down
+    (edges out of the frontier) or bottom-up (edges into not yet visited
+    vertices, looking for a parent in the frontier), whichever has fewer
+    edges to scan. Bottom-up pays off in the middle levels of low-diameter
+    graphs, where the frontier is most of the graph. It needs in-edges,
+    i.e. `graph.reversed()`, which can be passed as `reversed_graph` to
+    reuse it between searches.
+
+    :param graph: graph
+    :type graph: CSRGraph
+    :param start: the vertex (integer) from which search is started
+    :type start: int
+    :param direction_optimizing: switch between top-down and bottom-up steps
+    :type direction_optimizing: bool
+    :param reversed_graph: `graph.reversed()` (built if not given)
+    :type reversed_graph: CSRGraph
+    :return: distances and parents of all vertices (-1 for unreachable
+        vertices, parent of `start` is -1)
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+
+    :Example:
+    >>> graph = CSRGraph.from_adjacency_dict(
+    ...     {'A': ['B', 'E'], 'B': ['C'], 'C': ['D'], 'D': ['E'], 'E': []})
+    >>> distances, parents = csr_bfs_frontier(graph, graph.index('A'))
+    >>> distances
+    array([0, 1, 2, 3, 1])
+    >>> parents
+    array([-1,  0,  1,  2,  0])
+    """
+    n = len(graph)
+    distances = np.full(n, -1, dtype=np.int64)
+    parents = np.full(n, -1, dtype=np.int64)
+    distances[start] = 0
+    frontier = np.array([start], dtype=np.int64)
+
+    if direction_optimizing:
+        if reversed_graph is None:
+            reversed_graph = graph.reversed()
+        out_degrees = np.diff(graph.indptr)
+        in_degrees = np.diff(reversed_graph.indptr)
+        # Number of edges into not yet visited vertices.
+        unvisited_edges = graph.n_edges - in_degrees[start]
+
+    level = 0
+    while len(frontier):
+        level += 1
+        if (direction_optimizing
+                and out_degrees[frontier].sum() > unvisited_edges):
+            frontier = _bottom_up_step(
+                reversed_graph, frontier, distances, parents, level)
+        else:
+            frontier = _top_down_step(
+                graph, frontier, distances, parents, level)
+        if direction_optimizing:
+            unvisited_edges -= in_degrees[frontier].sum()
+    return distances, parents
+
+
+def _gather_edges(graph, vertices):
+    """Returns positions (in `graph.indices`) of all edges of `vertices` and
+    the vertex each of them belongs to."""
+    starts = graph.indptr[vertices]
+    lengths = graph.indptr[vertices + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    edges = np.arange(lengths.sum()) + np.repeat(starts - offsets, lengths)
+    return edges, np.repeat(vertices, lengths)
+
+
+def _top_down_step(graph, frontier, distances, parents, level):
+    edges, sources = _gather_edges(graph, frontier)
+    targets = graph.indices[edges]
+    not_visited = distances[targets] < 0
+    targets, first = np.unique(targets[not_visited], return_index=True)
+    distances[targets] = level
+    parents[targets] = sources[not_visited][first]
+    return targets
+
+
+def _bottom_up_step(reversed_graph, frontier, distances, parents, level):
+    in_frontier = np.zeros(len(distances), dtype=bool)
+    in_frontier[frontier] = True
+    edges, targets = _gather_edges(
+        reversed_graph, np.flatnonzero(distances < 0))
+    found = in_frontier[reversed_graph.indices[edges]]
+    # `targets` is sorted, so `first` points at the first parent found.
+    targets, first = np.unique(targets[found], return_index=True)
+    distances[targets] = level
+    parents[targets] = reversed_graph.indices[edges[found][first]]
+    return targets
+
+
+def csr_dfs(graph, start, visited=None, clock=1, pre=None, post=None):
+    """(Iterative) Depth First Search (DFS) over a `CSRGraph`, with the same
+    pre/post numbering as `dfs`.
+
+    :param graph: graph
+    :type graph: CSRGraph
+    :param start: the vertex (integer) from which search is started
+    :type start: int
+    :param visited: already visited vertices (from previous calls)
+    :type visited: numpy.ndarray(bool)
+    :param clock: call counter
+    :type clock: int
+    :param pre: saves order pre procedure (0 for not visited vertices)
+    :type pre: numpy.ndarray
+    :param post: saves order of post procedure (0 for not visited vertices)
+    :type post: numpy.ndarray
+    :return: visited, pre-indices, post-indices, clock
+    :rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray, int)
+
+    :Example:
+    >>> graph = CSRGraph.from_adjacency_dict(
+    ...     {'A': ['B'], 'B': ['C', 'D'], 'C': [], 'D': []})
+    >>> visited, pre, post, clock = csr_dfs(graph, 0)
+    >>> pre, post
+    (array([1, 2, 3, 5]), array([8, 7, 4, 6]))
+    """
+    n = len(graph)
+    if visited is None:
+        visited = np.zeros(n, dtype=bool)
+    if pre is None:
+        pre = np.zeros(n, dtype=np.int64)
+    if post is None:
+        post = np.zeros(n, dtype=np.int64)
+    indptr, indices = memoryview(graph.indptr), memoryview(graph.indices)
+    visited_view = memoryview(visited)
+    pre_view, post_view = memoryview(pre), memoryview(post)
+
+    visited_view[start] = True
+    pre_view[start] = clock
+    clock += 1
+    # The stack keeps vertices and positions of their next edges.
+    stack = [start]
+    positions = [indptr[start]]
+    while stack:
+        v = stack[-1]
+        i, end = positions[-1], indptr[v + 1]
+        while i < end and visited_view[indices[i]]:
+            i += 1
+        if i < end:
+            u = indices[i]
+            positions[-1] = i + 1
+            visited_view[u] = True
+            pre_view[u] = clock
+            clock += 1
+            stack.append(u)
+            positions.append(indptr[u])
+        else:
+            stack.pop()
+            positions.pop()
+            post_view[v] = clock
+            clock += 1
+    return visited, pre, post, clock
+
+
+def csr_find_sccs(graph):
+    """Finds strongly connected components (SCCs) of a `CSRGraph` using
+    Kosaraju's algorithm (as `find_sccs`). The first DFS records vertices in
+    the order they are finished, so no sorting of post numbers is needed.
+
+    :param graph: graph
+    :type graph: CSRGraph
+    :return: component id of every vertex; components are numbered in the
+        topological order of the condensation (sources first)
+    :rtype: numpy.ndarray
+
+    :Example:
+    >>> graph = CSRGraph.from_adjacency_dict(
+    ...     {'A': ['B'], 'B': ['C'], 'C': ['A', 'D'], 'D': []})
+    >>> csr_find_sccs(graph)
+    array([0, 0, 0, 1])
+    """
+    n = len(graph)
+    order = _finish_order(graph)
+    reversed_graph = graph.reversed()
+    indptr = memoryview(reversed_graph.indptr)
+    indices = memoryview(reversed_graph.indices)
+    components = np.full(n, -1, dtype=np.int64)
+    component_view = memoryview(components)
+
+    n_components = 0
+    for v in reversed(order):
+        if component_view[v] >= 0:
+            continue
+        component_view[v] = n_components
+        stack = [v]
+        while stack:
+            u = stack.pop()
+            for i in range(indptr[u], indptr[u + 1]):
+                w = indices[i]
+                if component_view[w] < 0:
+                    component_view[w] = n_components
+                    stack.append(w)
+        n_components += 1
+    return components
+
+
+def _finish_order(graph):
+    """Returns all vertices of `graph` in the order DFS (started from every
+    not visited vertex, in order) finishes them."""
+    n = len(graph)
+    indptr, indices = memoryview(graph.indptr), memoryview(graph.indices)
+    visited = bytearray(n)
+    order = []
+    for start in range(n):
+        if visited[start]:
+            continue
+        visited[start] = True
+        stack = [start]
+        positions = [indptr[start]]
+        while stack:
+            v = stack[-1]
+            i, end = positions[-1], indptr[v + 1]
+            while i < end and visited[indices[i]]:
+                i += 1
+            if i < end:
+                u = indices[i]
+                positions[-1] = i + 1
+                visited[u] = True
+                stack.append(u)
+                positions.append(indptr[u])
+            else:
+                stack.pop()
+                positions.pop()
+                order.append(v)
+    return order
+
+
+def csr_dijkstra_shortest_path(graph, start, end):
+    """Finds the shortest path between `start` and `end` of a weighted
+    `CSRGraph` using Dijkstra's algorithm (as `dijkstra_shortest_path`).
+
+    :param graph: weighted graph
+    :type graph: CSRGraph
+    :param start: start vertex (integer)
+    :type start: int
+    :param end: end vertex (integer)
+    :type end: int
+    :return: distance between start and end (nan if there is no path)
+    :rtype: numeric
+    :raises: ValueError
+
+    :Example:
+    >>> graph = CSRGraph.from_weighted_dict(
+    ...     {'A': [(4, 'B'), (2, 'C')], 'B': [(3, 'C'),], 'C': [(1, 'B')]})
+    >>> csr_dijkstra_shortest_path(graph, graph.index('A'), graph.index('B'))
+    3
+    """
+    if graph.weights is None:
+        raise ValueError('The graph has no weights.')
+    indptr, indices = memoryview(graph.indptr), memoryview(graph.indices)
+    weights = memoryview(graph.weights)
+    visited = bytearray(len(graph))
+    heap = [(0, start)]
+    while heap:
+        length_u, u = heapq.heappop(heap)
+        if visited[u]:
+            continue
+        visited[u] = True
+        if u == end:
+            return length_u
+        for i in range(indptr[u], indptr[u + 1]):
+            v = indices[i]
+            if visited[v]:
+                continue
+            heapq.heappush(heap, (length_u + weights[i], v))
+    # If we got here there is no connection start -> end.
+    return np.nan
+
+
+def benchmark_bfs(n=200000, n_edges=2000000, seed=0):
+    """Compares edge throughput of `bfs` (dict), `csr_bfs`,
+    `csr_bfs_frontier` and direction-optimizing `csr_bfs_frontier` on a
+    random (low-diameter) graph. Building graphs is not measured.
+
+    :param n: number of vertices
+    :type n: int
+    :param n_edges: number of edges
+    :type n_edges: int
+    :param seed: random seed
+    :type seed: int
+    :return: edges per second of each method
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_bfs(1000, 10000)
+    >>> sorted(results)
+    ['bfs', 'csr_bfs', 'direction_optimizing', 'frontier']
+    """
+    rng = np.random.default_rng(seed)
+    graph = CSRGraph.from_edges(rng.integers(0, n, n_edges),
+                                rng.integers(0, n, n_edges), n_vertices=n)
+    reversed_graph = graph.reversed()
+    adjacency_dict = {v: graph.neighbours(v).tolist() for v in range(n)}
+    searches = [
+        ('bfs', lambda: bfs(adjacency_dict, 0)),
+        ('csr_bfs', lambda: csr_bfs(graph, 0)),
+        ('frontier', lambda: csr_bfs_frontier(graph, 0)),
+        ('direction_optimizing', lambda: csr_bfs_frontier(
+            graph, 0, direction_optimizing=True,
+            reversed_graph=reversed_graph))
+    ]
+    results = dict()
+    for name, search in searches:
+        start = time.perf_counter()
+        search()
+        results[name] = n_edges / (time.perf_counter() - start)
+    return results
+
+
+class TestCSRGraph(unittest.TestCase):
+    DFS_TEST_DICT = {  # Fig. 3.7 (see TestSearching)
+        'A': ['B', 'C', 'F'],
+        'B': ['E'],
+        'C': ['D'],
+        'D': ['A', 'H'],
+        'E': ['F', 'G', 'H'],
+        'F': ['B', 'G'],
+        'G': [],
+        'H': ['G']
+    }
+    DIJKSTRA_TEST_DICT = {  # Fig 4.9
+        'A': [(4, 'B'), (2, 'C')],
+        'B': [(3, 'C'), (2, 'D'), (3, 'E')],
+        'C': [(1, 'B'), (4, 'D'), (5, 'E')],
+        'D': [],
+        'E': [(1, 'D')]
+    }
+
+    @staticmethod
+    def _random_dict(rng, n, max_degree=4):
+        return {v: [rng.randrange(n) for _ in range(rng.randrange(max_degree))]
+                for v in range(n)}
+
+    def test_from_adjacency_dict(self):
+        graph = CSRGraph.from_adjacency_dict({'A': ['B', 'X'], 'B': ['A']})
+        data_set = [
+            (['A', 'B', 'X'], graph.labels),
+            ([0, 2, 3, 3], graph.indptr.tolist()),
+            ([1, 2, 0], graph.indices.tolist()),
+            (None, graph.weights),
+            (3, len(graph)),
+            (3, graph.n_edges)
+        ]
+        for e, a in data_set:
+            with self.subTest(e=e, a=a):
+                self.assertEqual(e, a)
+
+    def test_from_weighted_dict(self):
+        graph = CSRGraph.from_weighted_dict(self.DIJKSTRA_TEST_DICT)
+        for v, neighbours in self.DIJKSTRA_TEST_DICT.items():
+            i = graph.index(v)
+            start, end = graph.indptr[i], graph.indptr[i + 1]
+            actual = [(w, graph.label(u)) for w, u in
+                      zip(graph.weights[start:end], graph.indices[start:end])]
+            with self.subTest(v=v):
+                self.assertEqual(neighbours, actual)
+
+    def test_from_edges(self):
+        graph = CSRGraph.from_edges([1, 0, 1, 3], [0, 1, 3, 1], n_vertices=5)
+        data_set = [
+            ([0, 1, 3, 3, 4, 4], graph.indptr.tolist()),
+            ([1, 0, 3, 1], graph.indices.tolist()),
+            ([0, 3], graph.neighbours(1).tolist()),
+            ([0, 1, 1, 3], graph.sources().tolist())
+        ]
+        for e, a in data_set:
+            with self.subTest(e=e, a=a):
+                self.assertEqual(e, a)
+
+    def test_reversed(self):
+        rng = random.Random(0)
+        a_dict = self._random_dict(rng, 30)
+        graph = CSRGraph.from_adjacency_dict(a_dict)
+        reversed_graph = graph.reversed()
+        expected = sorted((u, v) for v in a_dict for u in a_dict[v])
+        actual = sorted(zip(reversed_graph.sources().tolist(),
+                            reversed_graph.indices.tolist()))
+        self.assertEqual(expected, actual)
+
+    def test_index_raises(self):
+        data_set = [
+            (CSRGraph.from_adjacency_dict({'A': []}), 'B'),
+            (CSRGraph.from_edges([0], [1]), 2)
+        ]
+        for graph, label in data_set:
+            with self.subTest(label=label):
+                with self.assertRaises(KeyError):
+                    graph.index(label)
+
+    def test_init_raises(self):
+        data_set = [
+            ([0, 2], [1], None, None),
+            ([0, 1], [0], [1, 2], None),
+            ([0, 1], [0], None, ['A', 'B'])
+        ]
+        for indptr, indices, weights, labels in data_set:
+            with self.subTest(indptr=indptr, indices=indices):
+                with self.assertRaises(ValueError):
+                    CSRGraph(indptr, indices, weights, labels)
+
+    def test_csr_bfs(self):
+        rng = random.Random(1)
+        for _ in range(20):
+            a_dict = self._random_dict(rng, rng.randrange(1, 30))
+            graph = CSRGraph.from_adjacency_dict(a_dict)
+            _, expected = bfs(a_dict, 0)
+            distances, parents = csr_bfs(graph, 0)
+            actual = {graph.label(v): d if d >= 0 else None
+                      for v, d in enumerate(distances.tolist())}
+            expected = {v: None if np.isnan(d) else d
+                        for v, d in expected.items()}
+            with self.subTest(a_dict=a_dict):
+                self.assertEqual(expected, actual)
+            for v, parent in enumerate(parents.tolist()):
+                if parent >= 0:
+                    with self.subTest(a_dict=a_dict, v=v):
+                        self.assertEqual(distances[v], distances[parent] + 1)
+                        self.assertIn(v, graph.neighbours(parent))
+
+    def test_csr_bfs_frontier(self):
+        rng = random.Random(4)
+        for _ in range(30):
+            n = rng.randrange(1, 40)
+            a_dict = self._random_dict(rng, n, max_degree=rng.randrange(1, 8))
+            graph = CSRGraph.from_adjacency_dict(a_dict)
+            expected, _ = csr_bfs(graph, 0)
+            for direction_optimizing in [False, True]:
+                distances, parents = csr_bfs_frontier(
+                    graph, 0, direction_optimizing=direction_optimizing)
+                with self.subTest(a_dict=a_dict, mode=direction_optimizing):
+                    self.assertEqual(expected.tolist(), distances.tolist())
+                    self.assertEqual(-1, parents[0])
+                for v, parent in enumerate(parents.tolist()):
+                    if parent >= 0:
+                        with self.subTest(a_dict=a_dict, v=v):
+                            self.assertEqual(distances[v],
+                                             distances[parent] + 1)
+                            self.assertIn(v, graph.neighbours(parent))
+
+    def test_csr_bfs_frontier_bottom_up(self):
+        n = 1000
+        rng = np.random.default_rng(5)
+        graph = CSRGraph.from_edges(rng.integers(0, n, 8 * n),
+                                    rng.integers(0, n, 8 * n), n_vertices=n)
+        expected, _ = csr_bfs(graph, 0)
+        with patch(__name__ + '._bottom_up_step',
+                   wraps=_bottom_up_step) as bottom_up_step:
+            distances, parents = csr_bfs_frontier(
+                graph, 0, direction_optimizing=True)
+        with self.subTest('bottom-up steps'):
+            self.assertGreater(bottom_up_step.call_count, 0)
+        with self.subTest('distances'):
+            self.assertEqual(expected.tolist(), distances.tolist())
+        reached = np.flatnonzero(parents >= 0)
+        with self.subTest('parents'):
+            self.assertTrue(np.all(
+                distances[parents[reached]] + 1 == distances[reached]))
+            for v in reached:
+                self.assertIn(v, graph.neighbours(parents[v]))
+
+    def test_benchmark_bfs(self):
+        results = benchmark_bfs(500, 2000)
+        self.assertEqual(
+            ['bfs', 'csr_bfs', 'direction_optimizing', 'frontier'],
+            sorted(results))
+
+    def test_csr_dfs(self):
+        graph = CSRGraph.from_adjacency_dict(self.DFS_TEST_DICT)
+        _, expected_pre, expected_post, expected_clock = dfs(
+            self.DFS_TEST_DICT, 'A')
+        visited, pre, post, clock = csr_dfs(graph, graph.index('A'))
+        data_set = [
+            (expected_pre, {graph.label(v): p for v, p in enumerate(pre)}),
+            (expected_post, {graph.label(v): p for v, p in enumerate(post)}),
+            (expected_clock, clock),
+            (True, visited.all())
+        ]
+        for e, a in data_set:
+            with self.subTest(e=e, a=a):
+                self.assertEqual(e, a)
+
+    def test_csr_dfs_long_path(self):
+        n = 100000
+        graph = CSRGraph.from_edges(np.arange(n - 1), np.arange(1, n))
+        _, pre, post, clock = csr_dfs(graph, 0)
+        self.assertEqual((n, n + 1, 2 * n, 2 * n + 1),
+                         (pre[-1], post[-1], post[0], clock))
+
+    def test_csr_find_sccs(self):
+        rng = random.Random(2)
+        for _ in range(20):
+            a_dict = self._random_dict(rng, rng.randrange(1, 30))
+            graph = CSRGraph.from_adjacency_dict(a_dict)
+            expected = sorted(sorted(scc) for scc in find_sccs(a_dict))
+            components = csr_find_sccs(graph)
+            actual = [[] for _ in range(components.max() + 1)]
+            for v, component in enumerate(components.tolist()):
+                actual[component].append(graph.label(v))
+            with self.subTest(a_dict=a_dict):
+                self.assertEqual(expected, sorted(actual))
+            # Edges never go to components found earlier.
+            for v in range(len(graph)):
+                for u in graph.neighbours(v):
+                    with self.subTest(a_dict=a_dict, v=v, u=u):
+                        self.assertLessEqual(components[v], components[u])
+
+    def test_csr_dijkstra_shortest_path(self):
+        rng = random.Random(3)
+        for _ in range(10):
+            n = rng.randrange(1, 20)
+            a_dict = {v: [(rng.randrange(10), rng.randrange(n))
+                          for _ in range(rng.randrange(4))] for v in range(n)}
+            graph = CSRGraph.from_weighted_dict(a_dict)
+            for v in range(n):
+                expected = dijkstra_shortest_path(a_dict, 0, v)
+                actual = csr_dijkstra_shortest_path(graph, 0, graph.index(v))
+                with self.subTest(a_dict=a_dict, v=v):
+                    if np.isnan(expected):
+                        self.assertTrue(np.isnan(actual))
+                    else:
+                        self.assertEqual(expected, actual)
+
+    def test_csr_dijkstra_shortest_path_raises(self):
+        graph = CSRGraph.from_adjacency_dict({'A': ['B']})
+        with self.assertRaises(ValueError):
+            csr_dijkstra_shortest_path(graph, 0, 1)
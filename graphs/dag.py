@@ -0,0 +1,332 @@
+from bisect import bisect_right
+from collections import defaultdict, deque
+import random
+import time
+import unittest
+
+from .searching import dfs, tarjan_sccs
+
+
+def condense(adjacency_dict):
+    """Builds the condensation of a directed graph: a directed acyclic graph
+    (DAG) with one vertex for every strongly connected component (SCC) and
+    an edge between components if there is an edge between their vertices.
+    Components are numbered in topological order: edges of the DAG always go
+    from a lower to a higher number.
+
+    :param adjacency_dict: a representation of an adjacency list
+    :type adjacency_dict: dict(hashable: list)
+    :return: the DAG {component: [component, ...]}, a list of components
+        (each is a list of vertices) and the component of every vertex
+    :rtype: tuple(dict, list, dict)
+
+    :Example:
+    >>> a_dict = {'A': ['B'], 'B': ['C'], 'C': ['A', 'D'], 'D': []}
+    >>> dag, sccs, component_ids = condense(a_dict)
+    >>> dag
+    {0: [1], 1: []}
+    >>> sccs
+    [['C', 'B', 'A'], ['D']]
+    >>> component_ids
+    {'D': 1, 'C': 0, 'B': 0, 'A': 0}
+    """
+    sccs, component_ids = tarjan_sccs(adjacency_dict, component_ids=True)
+    # Tarjan's algorithm finds components in reverse topological order.
+    last = len(sccs) - 1
+    sccs.reverse()
+    for v, component in component_ids.items():
+        component_ids[v] = last - component
+
+    dag = dict()
+    for component, scc in enumerate(sccs):
+        neighbours = set()
+        for v in scc:
+            for u in adjacency_dict[v]:
+                neighbours.add(component_ids[u])
+        neighbours.discard(component)
+        dag[component] = sorted(neighbours)
+    return dag, sccs, component_ids
+
+
+def topological_sort(adjacency_dict):
+    """Sorts vertices of a directed acyclic graph so that all edges go from
+    earlier to later vertices, using (iterative) Kahn's algorithm: vertices
+    without incoming edges are output and removed from the graph, until none
+    is left. Raises ValueError if the graph has a cycle (some vertices never
+    lose their incoming edges).
+
+    :param adjacency_dict: a representation of an adjacency list
+    :type adjacency_dict: dict(hashable: list)
+    :return: vertices in topological order
+    :rtype: list
+    :raises: ValueError
+
+    :Example:
+    >>> topological_sort({'A': ['C'], 'B': ['A', 'C'], 'C': []})
+    ['B', 'A', 'C']
+    """
+    in_degrees = dict.fromkeys(adjacency_dict, 0)
+    for neighbours in adjacency_dict.values():
+        for u in neighbours:
+            in_degrees[u] += 1
+    queue = deque(v for v, in_degree in in_degrees.items() if not in_degree)
+    order = []
+    while queue:
+        v = queue.popleft()
+        order.append(v)
+        for u in adjacency_dict[v]:
+            in_degrees[u] -= 1
+            if not in_degrees[u]:
+                queue.append(u)
+    if len(order) < len(in_degrees):
+        raise ValueError('The graph has a cycle.')
+    return order
+
+
+class ReachabilityIndex(object):
+    """Precomputed answers to "is there a path from u to v" in a directed
+    graph.
+
+    The graph is condensed (`condense`), since vertices of one component
+    reach exactly the same vertices. Components are numbered in the preorder
+    of a DFS over the DAG, so the descendants of a component in the DFS
+    forest get consecutive numbers: an interval. The components reachable
+    from a component are stored as a sorted list of such intervals: its own
+    DFS interval merged with the lists of its successors (a compressed
+    transitive closure). Edges of the DFS forest add nothing new, so only
+    edges to other subtrees split the lists, and a component usually needs
+    only a few intervals. In the worst case (e.g. many components reaching
+    every other component of another large set) the lists still take
+    O(k * k) memory for k components.
+
+    :Example:
+    >>> index = ReachabilityIndex({'A': ['B'], 'B': ['A', 'C'], 'C': []})
+    >>> index.reachable('A', 'C'), index.reachable('C', 'A')
+    (True, False)
+    """
+
+    def __init__(self, adjacency_dict):
+        """
+        :param adjacency_dict: a representation of an adjacency list
+        :type adjacency_dict: dict(hashable: list)
+        """
+        self.dag, self.sccs, self.component_ids = condense(adjacency_dict)
+        k = len(self.sccs)
+        visited, pre, post, clock = defaultdict(bool), dict(), dict(), 1
+        for component in range(k):
+            if not visited[component]:
+                visited, pre, post, clock = dfs(
+                    self.dag, component, visited, clock, pre, post)
+        self._rank = [0] * k
+        for rank, component in enumerate(sorted(range(k), key=pre.get)):
+            self._rank[component] = rank
+
+        # Successors have higher numbers, so their lists are ready first.
+        intervals = [None] * k
+        for component in reversed(range(k)):
+            # Every component of the subtree ticks the clock twice.
+            first = self._rank[component]
+            last = first + (post[component] - pre[component] - 1) // 2
+            candidates = [(first, last)]
+            for successor in self.dag[component]:
+                candidates.extend(intervals[successor])
+            candidates.sort()
+            merged = [candidates[0]]
+            for first, last in candidates[1:]:
+                if first <= merged[-1][1] + 1:
+                    if last > merged[-1][1]:
+                        merged[-1] = (merged[-1][0], last)
+                else:
+                    merged.append((first, last))
+            intervals[component] = merged
+
+        # Flat lists: the intervals of c are at [offsets[c], offsets[c + 1]).
+        self._offsets = [0]
+        self._firsts, self._lasts = [], []
+        for merged in intervals:
+            for first, last in merged:
+                self._firsts.append(first)
+                self._lasts.append(last)
+            self._offsets.append(len(self._firsts))
+
+    def reachable(self, u, v):
+        """Checks if there is a path from `u` to `v` (every vertex reaches
+        itself). Raises KeyError if any of them is not in the graph.
+
+        :param u: start vertex
+        :type u: hashable
+        :param v: end vertex
+        :type v: hashable
+        :return: True if `v` is reachable from `u`
+        :rtype: bool
+        :raises: KeyError
+        """
+        c, d = self._component(u), self._component(v)
+        rank = self._rank[d]
+        start, end = self._offsets[c], self._offsets[c + 1]
+        # The last interval of c starting at or before rank.
+        i = bisect_right(self._firsts, rank, start, end) - 1
+        return i >= start and self._lasts[i] >= rank
+
+    def _component(self, v):
+        try:
+            return self.component_ids[v]
+        except KeyError:
+            raise KeyError(f"{v} is not in the graph.") from None
+
+
+def benchmark_reachability(n=20000, n_edges=30000, n_queries=100000,
+                           n_dfs_queries=100, seed=0):
+    """Compares `ReachabilityIndex` queries with answering every query with
+    a fresh `dfs`, on a random graph.
+
+    :param n: number of vertices
+    :type n: int
+    :param n_edges: number of edges
+    :type n_edges: int
+    :param n_queries: number of queries answered by the index
+    :type n_queries: int
+    :param n_dfs_queries: number of queries answered with `dfs`
+    :type n_dfs_queries: int
+    :param seed: random seed
+    :type seed: int
+    :return: seconds of building the index ('build') and average seconds
+        per query ('index', 'dfs')
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_reachability(100, 150, 100, 10)
+    >>> sorted(results)
+    ['build', 'dfs', 'index']
+    """
+    rng = random.Random(seed)
+    adjacency_dict = {v: [] for v in range(n)}
+    for _ in range(n_edges):
+        adjacency_dict[rng.randrange(n)].append(rng.randrange(n))
+    queries = [(rng.randrange(n), rng.randrange(n))
+               for _ in range(n_queries)]
+
+    results = dict()
+    start = time.perf_counter()
+    index = ReachabilityIndex(adjacency_dict)
+    results['build'] = time.perf_counter() - start
+    start = time.perf_counter()
+    for u, v in queries:
+        index.reachable(u, v)
+    results['index'] = (time.perf_counter() - start) / n_queries
+    start = time.perf_counter()
+    for u, v in queries[:n_dfs_queries]:
+        _ = dfs(adjacency_dict, u)[0][v]
+    results['dfs'] = (time.perf_counter() - start) / n_dfs_queries
+    return results
+
+
+class TestDag(unittest.TestCase):
+    SCC_TEST_DICT = {  # Fig. 3.9 (see TestSearching)
+        'A': ['B'],
+        'B': ['C', 'D', 'E'],
+        'C': ['F'],
+        'D': [],
+        'E': ['B', 'F', 'G'],
+        'F': ['C', 'H'],
+        'G': ['H', 'J'],
+        'H': ['K'],
+        'I': ['G'],
+        'J': ['I'],
+        'K': ['L'],
+        'L': ['J'],
+    }
+
+    @staticmethod
+    def _random_dict(rng, n, max_degree=3):
+        return {v: [rng.randrange(n) for _ in range(rng.randrange(max_degree))]
+                for v in range(n)}
+
+    def test_condense(self):
+        dag, sccs, component_ids = condense(self.SCC_TEST_DICT)
+        actual = {tuple(sorted(sccs[c])): sorted(tuple(sorted(sccs[d]))
+                                                 for d in dag[c])
+                  for c in dag}
+        expected = {
+            ('A',): [('B', 'E')],
+            ('B', 'E'): [('C', 'F'), ('D',), ('G', 'H', 'I', 'J', 'K', 'L')],
+            ('C', 'F'): [('G', 'H', 'I', 'J', 'K', 'L')],
+            ('D',): [],
+            ('G', 'H', 'I', 'J', 'K', 'L'): []
+        }
+        with self.subTest('dag'):
+            self.assertDictEqual(expected, actual)
+        for c, scc in enumerate(sccs):
+            for v in scc:
+                with self.subTest(v=v):
+                    self.assertEqual(c, component_ids[v])
+
+    def test_condense_is_topologically_sorted(self):
+        rng = random.Random(0)
+        for _ in range(30):
+            a_dict = self._random_dict(rng, rng.randrange(1, 30))
+            dag, _, _ = condense(a_dict)
+            for c, neighbours in dag.items():
+                for d in neighbours:
+                    with self.subTest(a_dict=a_dict, c=c, d=d):
+                        self.assertLess(c, d)
+
+    def test_topological_sort(self):
+        rng = random.Random(1)
+        for _ in range(30):
+            dag, _, _ = condense(self._random_dict(rng, rng.randrange(1, 30)))
+            # Shuffle the labels, so that the order isn't trivial.
+            labels = list(dag)
+            rng.shuffle(labels)
+            a_dict = {labels[c]: [labels[d] for d in neighbours]
+                      for c, neighbours in dag.items()}
+            order = topological_sort(a_dict)
+            position = {v: i for i, v in enumerate(order)}
+            with self.subTest(a_dict=a_dict):
+                self.assertEqual(sorted(a_dict), sorted(order))
+            for v, neighbours in a_dict.items():
+                for u in neighbours:
+                    with self.subTest(a_dict=a_dict, v=v, u=u):
+                        self.assertLess(position[v], position[u])
+
+    def test_topological_sort_raises(self):
+        with self.assertRaises(ValueError):
+            topological_sort(self.SCC_TEST_DICT)
+
+    def test_reachable(self):
+        rng = random.Random(2)
+        for _ in range(30):
+            a_dict = self._random_dict(rng, rng.randrange(1, 30))
+            index = ReachabilityIndex(a_dict)
+            for u in a_dict:
+                visited = dfs(a_dict, u)[0]
+                for v in a_dict:
+                    with self.subTest(a_dict=a_dict, u=u, v=v):
+                        self.assertEqual(visited[v], index.reachable(u, v))
+
+    def test_reachable_intervals(self):
+        # A path with edges skipping ahead: everything reachable from a
+        # vertex is one interval, so memory is linear, not quadratic.
+        n = 10000
+        a_dict = {v: [u for u in (v + 1, v + 3) if u < n] for v in range(n)}
+        index = ReachabilityIndex(a_dict)
+        with self.subTest('intervals'):
+            self.assertEqual(n, len(index._firsts))
+        for u, v, expected in [(0, n - 1, True), (n - 1, 0, False),
+                               (5, 5, True), (5, 4, False)]:
+            with self.subTest(u=u, v=v):
+                self.assertEqual(expected, index.reachable(u, v))
+
+    def test_reachable_empty(self):
+        index = ReachabilityIndex(dict())
+        with self.assertRaises(KeyError):
+            index.reachable('A', 'A')
+
+    def test_reachable_raises(self):
+        index = ReachabilityIndex(self.SCC_TEST_DICT)
+        with self.assertRaises(KeyError):
+            index.reachable('A', 'X')
+
+    def test_benchmark(self):
+        results = benchmark_reachability(100, 150, 100, 10)
+        self.assertEqual(['build', 'dfs', 'index'], sorted(results))
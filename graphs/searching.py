@@ -1,18 +1,26 @@
 from collections import defaultdict, deque
 import heapq
+import math
+import random
+import sys
+import time
 import unittest
 
 import numpy as np
 
 
 def dfs(adjacency_dict, start, visited=None, clock=1, pre=None, post=None):
-    """ (Recursive) Implementation of Depth First Search (DFS)
+    """ (Iterative) Implementation of Depth First Search (DFS).
+
+    Uses an explicit stack of (vertex, neighbours iterator) pairs instead of
+    recursion, so it is not limited by the recursion limit (long paths are
+    fine). `pre` and `post` numbering is identical to `dfs_recursive`.
 
     :param adjacency_dict: a representation of an adjacency list
     :type adjacency_dict: dict(hashable: list)
     :param start: the vertex from which search is started
     :type start: hashable (the same type that was used as adjacency_dict keys
-    :param visited: already visited vertices (for recursive calls)
+    :param visited: already visited vertices (from previous calls)
     :type visited: dict
     :param clock: call counter
     :type clock: int
@@ -55,9 +63,69 @@ def dfs(adjacency_dict, start, visited=None, clock=1, pre=None, post=None):
     pre[start] = clock
     clock += 1
 
+    stack = [(start, iter(adjacency_dict[start]))]
+    while stack:
+        v, neighbours = stack[-1]
+        for u in neighbours:
+            if not visited[u]:
+                visited[u] = True
+                pre[u] = clock
+                clock += 1
+                stack.append((u, iter(adjacency_dict[u])))
+                break
+        else:
+            # All neighbours of v are explored.
+            stack.pop()
+            post[v] = clock
+            clock += 1
+    return visited, pre, post, clock
+
+
+def dfs_recursive(adjacency_dict, start, visited=None, clock=1, pre=None,
+                  post=None):
+    """ (Recursive) Implementation of Depth First Search (DFS). Raises
+    RecursionError for paths longer than the recursion limit, use `dfs`.
+
+    :param adjacency_dict: a representation of an adjacency list
+    :type adjacency_dict: dict(hashable: list)
+    :param start: the vertex from which search is started
+    :type start: hashable (the same type that was used as adjacency_dict keys
+    :param visited: already visited vertices (for recursive calls)
+    :type visited: dict
+    :param clock: call counter
+    :type clock: int
+    :param pre: saves order pre procedure
+    :type pre: dict
+    :param post: saves order of post procedure
+    :type post: dict
+    :return: visited, pre-indices, post-indices, clock
+    :rtype: tuple(dict, dict, dict, int)
+
+    :Example:
+    Let's consider a very simple graph: A -> B -> C
+                                             |--> D
+    >>> adjacency_dict = {'A': ['B'], 'B': ['C', 'D'], 'C': [], 'D': []}
+    >>> visited, pre, post, clock = dfs_recursive(adjacency_dict, 'A')
+    >>> visited
+    defaultdict(<class 'bool'>, {'A': True, 'B': True, 'C': True, 'D': True})
+    >>> pre
+    {'A': 1, 'B': 2, 'C': 3, 'D': 5}
+    >>> post
+    {'C': 4, 'D': 6, 'B': 7, 'A': 8}
+    """
+    if visited is None:
+        visited = defaultdict(bool)
+    visited[start] = True
+    if pre is None:
+        pre = dict()
+    if post is None:
+        post = dict()
+    pre[start] = clock
+    clock += 1
+
     for u in adjacency_dict[start]:
         if not visited[u]:
-            visited, pre, post, clock = dfs(
+            visited, pre, post, clock = dfs_recursive(
                 adjacency_dict, u, visited, clock, pre, post)
     post[start] = clock
     clock += 1
@@ -106,6 +174,73 @@ def bfs(adjacency_dict, start):
     return paths, distances
 
 
+def bfs_tree(adjacency_dict, start):
+    """ Breadth First Search (BFS) which saves only the parent of every
+    vertex instead of the whole path (as `bfs` does), so memory is O(V)
+    instead of O(V * depth). Paths are reconstructed with `path_to`.
+
+    :param adjacency_dict: a representation of an adjacency list
+    :type adjacency_dict: dict(hashable: list)
+    :param start: the vertex from which search is started
+    :type start: hashable (the same type that was used as adjacency_dict keys
+    :return: parents of all reached vertices (None for `start`), distances to
+        all vertices (-1 if not reachable)
+    :rtype: tuple(dict, dict)
+
+    :Example:
+    >>> a_dict = {'A': ['B', 'E'], 'B': ['C'], 'C': ['D'], 'D': ['E'], 'E': []}
+    >>> parents, distances = bfs_tree(a_dict, 'A')
+    >>> parents
+    {'A': None, 'B': 'A', 'E': 'A', 'C': 'B', 'D': 'C'}
+    >>> distances
+    {'A': 0, 'B': 1, 'C': 2, 'D': 3, 'E': 1}
+    >>> path_to(parents, 'D')
+    ['B', 'C', 'D']
+    """
+    parents = {start: None}
+    distances = dict.fromkeys(adjacency_dict, -1)
+    distances[start] = 0
+    queue = deque([start])
+
+    while queue:
+        u = queue.popleft()
+        distance_v = distances[u] + 1
+        for v in adjacency_dict[u]:
+            if v in parents:
+                continue
+            parents[v] = u
+            distances[v] = distance_v
+            queue.append(v)
+    return parents, distances
+
+
+def path_to(parents, v):
+    """Reconstructs the path to `v` from `parents` returned by `bfs_tree`.
+    The path is the same as `paths[v]` returned by `bfs`: it doesn't contain
+    the start vertex. Raises KeyError if `v` was not reached.
+
+    :param parents: parents of vertices
+    :type parents: dict
+    :param v: the last vertex of the path
+    :type v: hashable
+    :return: path
+    :rtype: list
+    :raises: KeyError
+
+    :Example:
+    >>> path_to({'A': None, 'B': 'A', 'C': 'B'}, 'C')
+    ['B', 'C']
+    """
+    if v not in parents:
+        raise KeyError(f"{v} is not reachable.")
+    path = []
+    while parents[v] is not None:
+        path.append(v)
+        v = parents[v]
+    path.reverse()
+    return path
+
+
 def post_to_sorted_list(post):
     """
     Sorts a dict based on the values and returns keys
@@ -175,6 +310,72 @@ def find_sccs(adjacency_dict):
     return sccs
 
 
+def tarjan_sccs(adjacency_dict, component_ids=False):
+    """Finds strongly connected components (SCCs) of a directed graph with
+    (iterative) Tarjan's algorithm: a single DFS, without reversing the
+    graph and without sorting (as `find_sccs` does). A component is found
+    when the DFS finishes its first vertex, i.e. after all components
+    reachable from it, so components come in reverse topological order.
+
+    :param adjacency_dict: a representation of an adjacency list
+    :type adjacency_dict: dict(hashable: list)
+    :param component_ids: return also the component (index in the list) of
+        every vertex
+    :type component_ids: bool
+    :return: a list of all sccs, each is a list of vertices, (and a dict
+        {vertex: component index} if `component_ids`)
+    :rtype: list or tuple(list, dict)
+
+    :Example:
+    >>> a_dict = {'A': ['B'], 'B': ['C'], 'C': ['A', 'D'], 'D': []}
+    >>> tarjan_sccs(a_dict)
+    [['D'], ['C', 'B', 'A']]
+    >>> tarjan_sccs(a_dict, component_ids=True)[1]
+    {'D': 0, 'C': 1, 'B': 1, 'A': 1}
+    """
+    index = dict()  # order in which vertices are visited
+    low = dict()  # the lowest index reachable (so far) from the vertex
+    ids = dict()
+    stack = []  # visited vertices without a component
+    sccs = []
+    for root in adjacency_dict:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        dfs_stack = [(root, iter(adjacency_dict[root]))]
+        while dfs_stack:
+            v, neighbours = dfs_stack[-1]
+            for u in neighbours:
+                if u not in index:
+                    index[u] = low[u] = len(index)
+                    stack.append(u)
+                    dfs_stack.append((u, iter(adjacency_dict[u])))
+                    break
+                # Vertices with ids are in finished components.
+                if u not in ids and index[u] < low[v]:
+                    low[v] = index[u]
+            else:
+                dfs_stack.pop()
+                if dfs_stack:
+                    parent = dfs_stack[-1][0]
+                    if low[v] < low[parent]:
+                        low[parent] = low[v]
+                if low[v] == index[v]:
+                    # v is the first visited vertex of its component.
+                    scc = []
+                    while True:
+                        u = stack.pop()
+                        ids[u] = len(sccs)
+                        scc.append(u)
+                        if u == v:
+                            break
+                    sccs.append(scc)
+    if component_ids:
+        return sccs, ids
+    return sccs
+
+
 def dijkstra_shortest_path(graph, start, end):
     """Finds the shortest path between `start` and `end` using Dijkstra's
     algorithm.
@@ -195,6 +396,7 @@ def dijkstra_shortest_path(graph, start, end):
     """
     heap = [(0, start)]
     visited = defaultdict(bool)
+    distances = {start: 0}
     while heap:
         length_u, u = heapq.heappop(heap)
         if visited[u]:
@@ -206,11 +408,534 @@ def dijkstra_shortest_path(graph, start, end):
             if visited[v]:
                 continue
             added_length = length_u + length_v
+            # Pushing a path that is not shorter than a known one would only
+            # bloat the heap.
+            if v in distances and distances[v] <= added_length:
+                continue
+            distances[v] = added_length
             heapq.heappush(heap, (added_length, v))
     # If we got here there is no connection start -> end.
     return np.nan
 
 
+class IndexedHeap(object):
+    """Binary min-heap of items with priorities which knows the position of
+    every item, so the priority of an item already in the heap can be
+    decreased (decrease-key) instead of pushing a duplicate. Items have to
+    be hashable; only priorities are compared.
+
+    :Example:
+    >>> heap = IndexedHeap()
+    >>> heap.push('A', 5)
+    >>> heap.push('B', 3)
+    >>> heap.push('A', 1)  # decrease-key
+    >>> len(heap)
+    2
+    >>> heap.pop()
+    ('A', 1)
+    """
+
+    def __init__(self):
+        self._items = []
+        self._priorities = []
+        self._positions = dict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def priority(self, item):
+        """Returns the priority of `item`. Raises KeyError if it is not in the
+        heap.
+
+        :param item: item
+        :type item: hashable
+        :return: priority
+        :rtype: numeric
+        :raises: KeyError
+        """
+        try:
+            return self._priorities[self._positions[item]]
+        except KeyError:
+            raise KeyError(f"{item} is not in the heap.") from None
+
+    def push(self, item, priority):
+        """Pushes `item` or, if it is already in the heap, decreases its
+        priority. Raises ValueError if that would increase the priority.
+
+        :param item: item
+        :type item: hashable
+        :param priority: priority
+        :type priority: numeric
+        :raises: ValueError
+        """
+        i = self._positions.get(item)
+        if i is None:
+            i = len(self._items)
+            self._items.append(item)
+            self._priorities.append(priority)
+        elif priority > self._priorities[i]:
+            raise ValueError(f"{item} has a lower priority already.")
+        self._sift_up(i, item, priority)
+
+    def pop(self):
+        """Removes and returns the item with the lowest priority. Raises
+        IndexError if the heap is empty.
+
+        :return: item, priority
+        :rtype: tuple
+        :raises: IndexError
+        """
+        if not self._items:
+            raise IndexError('pop from an empty heap')
+        item, priority = self._items[0], self._priorities[0]
+        del self._positions[item]
+        last_item, last_priority = self._items.pop(), self._priorities.pop()
+        if self._items:
+            self._sift_down(0, last_item, last_priority)
+        return item, priority
+
+    def _sift_up(self, i, item, priority):
+        items, priorities, positions = \
+            self._items, self._priorities, self._positions
+        while i > 0:
+            parent = (i - 1) // 2
+            if priorities[parent] <= priority:
+                break
+            items[i] = items[parent]
+            priorities[i] = priorities[parent]
+            positions[items[i]] = i
+            i = parent
+        items[i] = item
+        priorities[i] = priority
+        positions[item] = i
+
+    def _sift_down(self, i, item, priority):
+        items, priorities, positions = \
+            self._items, self._priorities, self._positions
+        n = len(items)
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and priorities[child + 1] < priorities[child]:
+                child += 1
+            if priority <= priorities[child]:
+                break
+            items[i] = items[child]
+            priorities[i] = priorities[child]
+            positions[items[i]] = i
+            i = child
+        items[i] = item
+        priorities[i] = priority
+        positions[item] = i
+
+
+def dijkstra(graph, start):
+    """Finds the shortest paths from `start` to all vertices using
+    Dijkstra's algorithm (see `multi_source_dijkstra`).
+
+    :param graph: a directed graph adjacency dict: {v: (weight, u)}
+    :type graph: dict
+    :param start: start vertex
+    :type start: hashable
+    :return: distances to and predecessors of all reachable vertices
+        (predecessor of `start` is None)
+    :rtype: tuple(dict, dict)
+
+    :Example:
+    >>> graph = {'A': [(4, 'B'), (2, 'C')], 'B': [(3, 'C'),], 'C': [(1, 'B')]}
+    >>> distances, predecessors = dijkstra(graph, 'A')
+    >>> distances
+    {'A': 0, 'C': 2, 'B': 3}
+    >>> path_to(predecessors, 'B')
+    ['C', 'B']
+    """
+    return multi_source_dijkstra(graph, [start])
+
+
+def multi_source_dijkstra(graph, sources):
+    """Finds the shortest paths from the closest of `sources` to all vertices
+    using Dijkstra's algorithm with an `IndexedHeap`: a vertex is in the heap
+    at most once (its distance is decreased instead of pushing a duplicate)
+    and only improvements are pushed.
+
+    :param graph: a directed graph adjacency dict: {v: (weight, u)}
+    :type graph: dict
+    :param sources: start vertices
+    :type sources: iterable
+    :return: distances to and predecessors of all reachable vertices
+        (predecessors of sources are None); paths can be reconstructed with
+        `path_to`
+    :rtype: tuple(dict, dict)
+
+    :Example:
+    >>> graph = {'A': [(4, 'B')], 'B': [(1, 'C')], 'C': [], 'D': [(1, 'B')]}
+    >>> distances, predecessors = multi_source_dijkstra(graph, ['A', 'D'])
+    >>> distances
+    {'A': 0, 'D': 0, 'B': 1, 'C': 2}
+    >>> predecessors
+    {'A': None, 'D': None, 'B': 'D', 'C': 'B'}
+    """
+    distances = dict()
+    predecessors = dict()
+    heap = IndexedHeap()
+    for source in sources:
+        predecessors[source] = None
+        heap.push(source, 0)
+
+    while heap:
+        u, length_u = heap.pop()
+        distances[u] = length_u
+        for length_v, v in graph[u]:
+            if v in distances:
+                continue
+            added_length = length_u + length_v
+            if v in heap and heap.priority(v) <= added_length:
+                continue
+            predecessors[v] = u
+            heap.push(v, added_length)
+    return distances, predecessors
+
+
+def reverse_graph(graph):
+    """Reverses all edges of a weighted graph. Every vertex (also the ones
+    which only are neighbours in `graph`) is a key of the result.
+
+    :param graph: a directed graph adjacency dict: {v: (weight, u)}
+    :type graph: dict
+    :return: reversed graph: {u: (weight, v)}
+    :rtype: dict
+
+    :Example:
+    >>> reverse_graph({'A': [(4, 'B'), (2, 'C')], 'B': [(3, 'C')]})
+    {'A': [], 'B': [(4, 'A')], 'C': [(2, 'A'), (3, 'B')]}
+    """
+    reversed_graph = {v: [] for v in graph}
+    for v, neighbours in graph.items():
+        for length, u in neighbours:
+            if u not in reversed_graph:
+                reversed_graph[u] = []
+            reversed_graph[u].append((length, v))
+    return reversed_graph
+
+
+def bidirectional_dijkstra(graph, start, end, reversed_graph=None):
+    """Finds the shortest path between `start` and `end` running Dijkstra's
+    algorithm from `start` in `graph` and from `end` in the reversed graph at
+    the same time (always advancing the side with the closer vertex). The
+    search stops once the two closest vertices are together farther than
+    the best path found, so it usually settles far fewer vertices than
+    `dijkstra_shortest_path`.
+
+    :param graph: a directed graph adjacency dict: {v: (weight, u)}
+    :type graph: dict
+    :param start: start vertex
+    :type start: hashable
+    :param end: end vertex
+    :type end: hashable
+    :param reversed_graph: `reverse_graph(graph)`, pass it to reuse it
+        between queries (built if not given)
+    :type reversed_graph: dict
+    :return: distance between start and end (nan if there is no path) and the
+        path (from `start` to `end`, empty if there is no path)
+    :rtype: tuple(numeric, list)
+
+    :Example:
+    >>> graph = {'A': [(4, 'B'), (2, 'C')], 'B': [(3, 'C'),], 'C': [(1, 'B')]}
+    >>> bidirectional_dijkstra(graph, 'A', 'B')
+    (3, ['A', 'C', 'B'])
+    """
+    if reversed_graph is None:
+        reversed_graph = reverse_graph(graph)
+    if start == end:
+        return 0, [start]
+    graphs = (graph, reversed_graph)
+    heaps = ([(0, start)], [(0, end)])
+    distances = ({start: 0}, {end: 0})
+    predecessors = ({start: None}, {end: None})
+    visited = (set(), set())
+    best, meeting = math.inf, None
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        length_u, u = heapq.heappop(heaps[side])
+        if u in visited[side]:
+            continue
+        visited[side].add(u)
+        other_distances = distances[1 - side]
+        for length_v, v in graphs[side][u]:
+            if v in visited[side]:
+                continue
+            added_length = length_u + length_v
+            if added_length < distances[side].get(v, math.inf):
+                distances[side][v] = added_length
+                predecessors[side][v] = u
+                heapq.heappush(heaps[side], (added_length, v))
+            if v in other_distances:
+                length = distances[side][v] + other_distances[v]
+                if length < best:
+                    best, meeting = length, v
+
+    if meeting is None:
+        return np.nan, []
+    path = []
+    v = meeting
+    while v is not None:
+        path.append(v)
+        v = predecessors[0][v]
+    path.reverse()
+    v = predecessors[1][meeting]
+    while v is not None:
+        path.append(v)
+        v = predecessors[1][v]
+    return best, path
+
+
+def a_star(graph, start, end, heuristic):
+    """Finds the shortest path between `start` and `end` using the A*
+    algorithm: Dijkstra's algorithm which settles vertices in the order of
+    distance from `start` plus `heuristic(v, end)`, the estimated distance to
+    `end`. The heuristic has to be consistent (never overestimate, and not
+    decrease by more than the length of an edge), e.g. a straight-line
+    distance when edges are at least as long (`euclidean_heuristic`,
+    `haversine_heuristic`). `lambda v, end: 0` gives plain Dijkstra.
+
+    :param graph: a directed graph adjacency dict: {v: (weight, u)}
+    :type graph: dict
+    :param start: start vertex
+    :type start: hashable
+    :param end: end vertex
+    :type end: hashable
+    :param heuristic: estimated distance between a vertex and `end`
+    :type heuristic: callable(v, end)
+    :return: distance between start and end (nan if there is no path) and the
+        path (from `start` to `end`, empty if there is no path)
+    :rtype: tuple(numeric, list)
+
+    :Example:
+    >>> graph = {'A': [(4, 'B'), (2, 'C')], 'B': [(3, 'C'),], 'C': [(1, 'B')]}
+    >>> a_star(graph, 'A', 'B', lambda v, end: 0)
+    (3, ['A', 'C', 'B'])
+    """
+    heap = [(heuristic(start, end), 0, start)]
+    distances = {start: 0}
+    predecessors = {start: None}
+    visited = set()
+    while heap:
+        _, length_u, u = heapq.heappop(heap)
+        if u in visited:
+            continue
+        visited.add(u)
+        if u == end:
+            path = []
+            while u is not None:
+                path.append(u)
+                u = predecessors[u]
+            path.reverse()
+            return length_u, path
+        for length_v, v in graph[u]:
+            if v in visited:
+                continue
+            added_length = length_u + length_v
+            if added_length < distances.get(v, math.inf):
+                distances[v] = added_length
+                predecessors[v] = u
+                heapq.heappush(
+                    heap, (added_length + heuristic(v, end), added_length, v))
+    return np.nan, []
+
+
+def euclidean_heuristic(coordinates):
+    """Returns an `a_star` heuristic: the straight-line distance between
+    vertices.
+
+    :param coordinates: coordinates of vertices {v: (x, y)}
+    :type coordinates: dict
+    :return: heuristic
+    :rtype: callable(v, end)
+
+    :Example:
+    >>> heuristic = euclidean_heuristic({'A': (0, 0), 'B': (3, 4)})
+    >>> heuristic('A', 'B')
+    5.0
+    """
+    def heuristic(v, end):
+        return math.dist(coordinates[v], coordinates[end])
+    return heuristic
+
+
+def haversine_heuristic(coordinates, radius=6371.0):
+    """Returns an `a_star` heuristic: the great-circle distance between
+    vertices (in units of `radius`, kilometres by default).
+
+    :param coordinates: coordinates of vertices {v: (latitude, longitude)}
+        in degrees
+    :type coordinates: dict
+    :param radius: radius of the sphere
+    :type radius: float
+    :return: heuristic
+    :rtype: callable(v, end)
+
+    :Example:
+    >>> heuristic = haversine_heuristic({'A': (0, 0), 'B': (0, 90)})
+    >>> round(heuristic('A', 'B'))
+    10008
+    """
+    def heuristic(v, end):
+        lat_v, lon_v = map(math.radians, coordinates[v])
+        lat_end, lon_end = map(math.radians, coordinates[end])
+        a = (math.sin((lat_end - lat_v) / 2) ** 2
+             + math.cos(lat_v) * math.cos(lat_end)
+             * math.sin((lon_end - lon_v) / 2) ** 2)
+        return 2 * radius * math.asin(math.sqrt(a))
+    return heuristic
+
+
+class _CountingDict(dict):
+    """A dict counting `[]` lookups: all shortest path functions look up the
+    neighbours of a vertex once when they settle it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups = 0
+
+    def __getitem__(self, key):
+        self.lookups += 1
+        return super().__getitem__(key)
+
+
+def benchmark_point_to_point(side=100, n_queries=100, seed=0):
+    """Compares `dijkstra_shortest_path`, `bidirectional_dijkstra` and
+    `a_star` (with `euclidean_heuristic`) on a `side` x `side` grid with
+    edges (in both directions) between neighbouring points, each 1 to 1.5
+    times longer than the straight line.
+
+    :param side: number of points on a side of the grid
+    :type side: int
+    :param n_queries: number of random (start, end) queries
+    :type n_queries: int
+    :param seed: random seed
+    :type seed: int
+    :return: average number of settled vertices and average seconds per
+        query: {name: (settled, seconds)}
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_point_to_point(10, 10)
+    >>> sorted(results)
+    ['a_star', 'bidirectional', 'dijkstra']
+    """
+    rng = random.Random(seed)
+    coordinates = {(x, y): (x, y) for x in range(side) for y in range(side)}
+    graph = _CountingDict({v: [] for v in coordinates})
+    for x, y in coordinates:
+        for u in [(x + 1, y), (x, y + 1)]:
+            if u in coordinates:
+                length = rng.uniform(1, 1.5)
+                graph[x, y].append((length, u))
+                graph[u].append((length, (x, y)))
+    reversed_graph = _CountingDict(reverse_graph(graph))
+    heuristic = euclidean_heuristic(coordinates)
+    vertices = list(coordinates)
+    queries = [(rng.choice(vertices), rng.choice(vertices))
+               for _ in range(n_queries)]
+
+    searches = [
+        ('dijkstra', lambda s, e: dijkstra_shortest_path(graph, s, e)),
+        ('bidirectional', lambda s, e: bidirectional_dijkstra(
+            graph, s, e, reversed_graph)),
+        ('a_star', lambda s, e: a_star(graph, s, e, heuristic))
+    ]
+    results = dict()
+    for name, search in searches:
+        graph.lookups = reversed_graph.lookups = 0
+        start = time.perf_counter()
+        for s, e in queries:
+            search(s, e)
+        seconds = time.perf_counter() - start
+        settled = graph.lookups + reversed_graph.lookups
+        results[name] = (settled / n_queries, seconds / n_queries)
+    return results
+
+
+def benchmark_sccs(n=1000000, n_edges=5000000, seed=0):
+    """Compares `find_sccs` (Kosaraju) and `tarjan_sccs` on a random graph.
+
+    :param n: number of vertices
+    :type n: int
+    :param n_edges: number of edges
+    :type n_edges: int
+    :param seed: random seed
+    :type seed: int
+    :return: seconds: {'find_sccs': float, 'tarjan_sccs': float}
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_sccs(1000, 5000)
+    >>> sorted(results)
+    ['find_sccs', 'tarjan_sccs']
+    """
+    rng = random.Random(seed)
+    adjacency_dict = {v: [] for v in range(n)}
+    for _ in range(n_edges):
+        adjacency_dict[rng.randrange(n)].append(rng.randrange(n))
+    results = dict()
+    for name, search in [('find_sccs', find_sccs),
+                         ('tarjan_sccs', tarjan_sccs)]:
+        start = time.perf_counter()
+        search(adjacency_dict)
+        results[name] = time.perf_counter() - start
+    return results
+
+
+def benchmark_dfs(n=200000, degree=4, n_layers=100, seed=0):
+    """Compares the per-vertex cost of `dfs` and `dfs_recursive` on a random
+    layered graph: `n_layers` layers with edges only to the next layer, so
+    the recursion depth stays below the recursion limit.
+
+    :param n: number of vertices
+    :type n: int
+    :param degree: out-degree of each vertex (except the last layer)
+    :type degree: int
+    :param n_layers: number of layers
+    :type n_layers: int
+    :param seed: random seed
+    :type seed: int
+    :return: seconds per vertex: {'iterative': float, 'recursive': float}
+    :rtype: dict
+
+    :Example:
+    >>> results = benchmark_dfs(1000)
+    >>> sorted(results)
+    ['iterative', 'recursive']
+    """
+    rng = random.Random(seed)
+    layer_size = -(-n // n_layers)
+    adjacency_dict = dict()
+    for v in range(n):
+        lo = (v // layer_size + 1) * layer_size
+        hi = min(lo + layer_size, n)
+        if lo < n:
+            adjacency_dict[v] = [rng.randrange(lo, hi) for _ in range(degree)]
+        else:
+            adjacency_dict[v] = []
+    # One root with edges to the whole first layer.
+    adjacency_dict[-1] = list(range(min(layer_size, n)))
+
+    searches = [('iterative', dfs), ('recursive', dfs_recursive)]
+    results = dict()
+    for name, search in searches:
+        start = time.perf_counter()
+        search(adjacency_dict, -1)
+        results[name] = (time.perf_counter() - start) / n
+    return results
+
+
 class TestSearching(unittest.TestCase):
     """For tests I am using graph from Fig. 3.7 in
     Dasgupta, Sanjoy, Christos H. Papadimitriou, and Umesh V. Vazirani.
@@ -276,6 +1001,41 @@ class TestSearching(unittest.TestCase):
             with self.subTest(e=e, a=a):
                 self.assertDictEqual(e, a)
 
+    def test_bfs_tree(self):
+        expected_parents = {
+            'S': None, 'A': 'S', 'C': 'S', 'D': 'S', 'E': 'S', 'B': 'A'
+        }
+        expected_distances = {'A': 1, 'B': 2, 'C': 1, 'D': 1, 'E': 1, 'S': 0}
+        expected = [expected_parents, expected_distances]
+        actual = bfs_tree(self.BFS_TEST_DICT, 'S')
+        for e, a in zip(expected, actual):
+            with self.subTest(e=e, a=a):
+                self.assertDictEqual(e, a)
+
+    def test_bfs_tree_same_as_bfs_on_random_graphs(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            n = rng.randrange(1, 30)
+            adjacency_dict = {
+                v: [rng.randrange(n) for _ in range(rng.randrange(4))]
+                for v in range(n)
+            }
+            paths, distances = bfs(adjacency_dict, 0)
+            parents, actual_distances = bfs_tree(adjacency_dict, 0)
+            expected_distances = {
+                v: -1 if np.isnan(d) else d for v, d in distances.items()
+            }
+            with self.subTest(adjacency_dict=adjacency_dict):
+                self.assertDictEqual(expected_distances, actual_distances)
+            for v in parents:
+                with self.subTest(adjacency_dict=adjacency_dict, v=v):
+                    self.assertListEqual(paths[v], path_to(parents, v))
+
+    def test_path_to_raises(self):
+        parents, _ = bfs_tree({'A': ['B'], 'B': [], 'C': ['A']}, 'A')
+        with self.assertRaises(KeyError):
+            path_to(parents, 'C')
+
     def test_dfs(self):
         expected_pre = {
             'A': 1, 'B': 2, 'C': 12, 'D': 13, 'E': 3, 'F': 4, 'G': 5, 'H': 8
@@ -292,6 +1052,57 @@ class TestSearching(unittest.TestCase):
             with self.subTest(expected=e, actual=e):
                 self.assertDictEqual(e, a)
 
+    def test_dfs_recursive(self):
+        expected = dfs(self.DFS_TEST_DICT, 'A')
+        actual = dfs_recursive(self.DFS_TEST_DICT, 'A')
+        for e, a in zip(expected, actual):
+            with self.subTest(e=e, a=a):
+                self.assertEqual(e, a)
+
+    def test_dfs_same_as_recursive_on_random_graphs(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            n = rng.randrange(1, 30)
+            adjacency_dict = {
+                v: [rng.randrange(n) for _ in range(rng.randrange(4))]
+                for v in range(n)
+            }
+            visited, pre, post, clock = defaultdict(bool), dict(), dict(), 1
+            visited_r, pre_r, post_r, clock_r = \
+                defaultdict(bool), dict(), dict(), 1
+            for v in adjacency_dict:
+                if not visited[v]:
+                    visited, pre, post, clock = dfs(
+                        adjacency_dict, v, visited, clock, pre, post)
+                    visited_r, pre_r, post_r, clock_r = dfs_recursive(
+                        adjacency_dict, v, visited_r, clock_r, pre_r, post_r)
+            with self.subTest(adjacency_dict=adjacency_dict):
+                self.assertEqual((pre_r, post_r, clock_r), (pre, post, clock))
+
+    def test_dfs_long_path(self):
+        n = 10 * sys.getrecursionlimit()
+        adjacency_dict = {v: [v + 1] for v in range(n)}
+        adjacency_dict[n] = []
+        _, pre, post, clock = dfs(adjacency_dict, 0)
+        with self.subTest('pre'):
+            self.assertEqual(n + 1, pre[n])
+        with self.subTest('post'):
+            self.assertEqual(n + 2, post[n])
+            self.assertEqual(2 * n + 2, post[0])
+        with self.subTest('clock'):
+            self.assertEqual(2 * n + 3, clock)
+
+    def test_find_sccs_long_cycle(self):
+        n = 10 * sys.getrecursionlimit()
+        adjacency_dict = {v: [(v + 1) % n] for v in range(n)}
+        adjacency_dict[n] = [0]
+        sccs = find_sccs(adjacency_dict)
+        self.assertEqual([1, n], sorted(len(scc) for scc in sccs))
+
+    def test_benchmark_dfs(self):
+        results = benchmark_dfs(500)
+        self.assertEqual(['iterative', 'recursive'], sorted(results))
+
     def test_post_to_sorted_list(self):
         expected = ['C', 'B', 'F', 'A', 'D', 'E']
         actual = post_to_sorted_list(self.POST_TO_SORTED_LIST_TEST_DICT)
@@ -324,3 +1135,219 @@ class TestSearching(unittest.TestCase):
     def test_dijkstra_shortest_path_nan_if_no_connection(self):
         distance = dijkstra_shortest_path(self.DIJKSTRA_TEST_DICT, 'A', 'X')
         self.assertTrue(np.isnan(distance))
+
+    def test_dijkstra(self):
+        expected = {'A': 0, 'B': 3, 'C': 2, 'D': 5, 'E': 6}
+        expected_predecessors = {
+            'A': None, 'B': 'C', 'C': 'A', 'D': 'B', 'E': 'B'
+        }
+        actual, predecessors = dijkstra(self.DIJKSTRA_TEST_DICT, 'A')
+        for e, a in [(expected, actual),
+                     (expected_predecessors, predecessors)]:
+            with self.subTest(e=e, a=a):
+                self.assertDictEqual(e, a)
+
+    def test_dijkstra_on_random_graphs(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            n = rng.randrange(1, 20)
+            graph = {v: [(rng.randrange(10), rng.randrange(n))
+                         for _ in range(rng.randrange(5))] for v in range(n)}
+            distances, predecessors = dijkstra(graph, 0)
+            for v in graph:
+                expected = dijkstra_shortest_path(graph, 0, v)
+                with self.subTest(graph=graph, v=v):
+                    if np.isnan(expected):
+                        self.assertNotIn(v, distances)
+                    else:
+                        self.assertEqual(expected, distances[v])
+                        # The path is consistent with the distance.
+                        path = [0] + path_to(predecessors, v)
+                        length = sum(
+                            min(w for w, u in graph[a] if u == b)
+                            for a, b in zip(path, path[1:]))
+                        self.assertEqual(expected, length)
+
+    def test_multi_source_dijkstra(self):
+        rng = random.Random(1)
+        for _ in range(20):
+            n = rng.randrange(2, 20)
+            graph = {v: [(rng.randrange(10), rng.randrange(n))
+                         for _ in range(rng.randrange(5))] for v in range(n)}
+            sources = rng.sample(range(n), rng.randrange(1, n))
+            distances, _ = multi_source_dijkstra(graph, sources)
+            for v in graph:
+                lengths = [dijkstra_shortest_path(graph, s, v)
+                           for s in sources]
+                lengths = [length for length in lengths
+                           if not np.isnan(length)]
+                with self.subTest(graph=graph, sources=sources, v=v):
+                    if lengths:
+                        self.assertEqual(min(lengths), distances[v])
+                    else:
+                        self.assertNotIn(v, distances)
+
+    def test_reverse_graph(self):
+        reversed_graph = reverse_graph(self.DIJKSTRA_TEST_DICT)
+        expected = sorted((v, length, u)
+                          for v, neighbours in self.DIJKSTRA_TEST_DICT.items()
+                          for length, u in neighbours)
+        actual = sorted((v, length, u)
+                        for u, neighbours in reversed_graph.items()
+                        for length, v in neighbours)
+        self.assertListEqual(expected, actual)
+
+    def _assert_path(self, graph, start, end, expected, actual):
+        distance, path = actual
+        if np.isnan(expected):
+            self.assertTrue(np.isnan(distance))
+            self.assertListEqual([], path)
+            return
+        self.assertEqual(expected, distance)
+        self.assertEqual((start, end), (path[0], path[-1]))
+        length = sum(min(w for w, u in graph[a] if u == b)
+                     for a, b in zip(path, path[1:]))
+        self.assertEqual(expected, length)
+
+    def test_bidirectional_dijkstra_and_a_star(self):
+        rng = random.Random(2)
+        for _ in range(30):
+            n = rng.randrange(1, 20)
+            graph = {v: [(rng.randrange(10), rng.randrange(n))
+                         for _ in range(rng.randrange(4))] for v in range(n)}
+            reversed_graph = reverse_graph(graph)
+            for start in range(n):
+                for end in range(n):
+                    expected = dijkstra_shortest_path(graph, start, end)
+                    actual = [
+                        bidirectional_dijkstra(
+                            graph, start, end, reversed_graph),
+                        a_star(graph, start, end, lambda v, e: 0)
+                    ]
+                    for a in actual:
+                        with self.subTest(graph=graph, start=start, end=end):
+                            self._assert_path(graph, start, end, expected, a)
+
+    def test_a_star_euclidean_heuristic(self):
+        rng = random.Random(3)
+        coordinates = {v: (rng.random(), rng.random()) for v in range(30)}
+        graph = {v: [] for v in coordinates}
+        for _ in range(100):
+            v, u = rng.randrange(30), rng.randrange(30)
+            length = math.dist(coordinates[v], coordinates[u]) * 1.2
+            graph[v].append((length, u))
+        heuristic = euclidean_heuristic(coordinates)
+        for end in range(30):
+            expected = dijkstra_shortest_path(graph, 0, end)
+            actual = a_star(graph, 0, end, heuristic)
+            with self.subTest(end=end):
+                if np.isnan(expected):
+                    self.assertTrue(np.isnan(actual[0]))
+                else:
+                    self.assertAlmostEqual(expected, actual[0])
+
+    def test_haversine_heuristic(self):
+        heuristic = haversine_heuristic(
+            {'Warsaw': (52.2297, 21.0122), 'Krakow': (50.0647, 19.9450)})
+        self.assertAlmostEqual(252, heuristic('Warsaw', 'Krakow'), delta=1)
+
+    def test_benchmark_point_to_point(self):
+        results = benchmark_point_to_point(10, 10)
+        self.assertEqual(['a_star', 'bidirectional', 'dijkstra'],
+                         sorted(results))
+
+    def test_tarjan_sccs(self):
+        expected_sccs = [
+            ['A'],
+            ['B', 'E'],
+            ['C', 'F'],
+            ['D'],
+            ['G', 'H', 'I', 'J', 'K', 'L']
+        ]
+        actual_sccs = tarjan_sccs(self.SCC_TEST_DICT)
+        actual_sccs = sorted(sorted(scc) for scc in actual_sccs)
+        self.assertListEqual(expected_sccs, actual_sccs)
+
+    def test_tarjan_sccs_on_random_graphs(self):
+        rng = random.Random(4)
+        for _ in range(30):
+            n = rng.randrange(1, 30)
+            adjacency_dict = {
+                v: [rng.randrange(n) for _ in range(rng.randrange(4))]
+                for v in range(n)
+            }
+            expected = sorted(sorted(scc) for scc in find_sccs(adjacency_dict))
+            sccs, ids = tarjan_sccs(adjacency_dict, component_ids=True)
+            with self.subTest(adjacency_dict=adjacency_dict):
+                self.assertListEqual(expected,
+                                     sorted(sorted(scc) for scc in sccs))
+            for i, scc in enumerate(sccs):
+                for v in scc:
+                    with self.subTest(adjacency_dict=adjacency_dict, v=v):
+                        self.assertEqual(i, ids[v])
+                    # Reverse topological order: edges go to earlier ones.
+                    for u in adjacency_dict[v]:
+                        with self.subTest(adjacency_dict=adjacency_dict,
+                                          v=v, u=u):
+                            self.assertLessEqual(ids[u], ids[v])
+
+    def test_tarjan_sccs_none_vertex(self):
+        data_set = [
+            ({None: [1], 1: [None]}, [[1, None]]),
+            ({None: [], 1: [None]}, [[None], [1]]),
+        ]
+        for adjacency_dict, expected in data_set:
+            with self.subTest(adjacency_dict=adjacency_dict):
+                self.assertListEqual(expected, tarjan_sccs(adjacency_dict))
+
+    def test_tarjan_sccs_long_cycle(self):
+        n = 10 * sys.getrecursionlimit()
+        adjacency_dict = {v: [(v + 1) % n] for v in range(n)}
+        sccs = tarjan_sccs(adjacency_dict)
+        self.assertEqual([n], [len(scc) for scc in sccs])
+
+    def test_benchmark_sccs(self):
+        results = benchmark_sccs(500, 2000)
+        self.assertEqual(['find_sccs', 'tarjan_sccs'], sorted(results))
+
+
+class TestIndexedHeap(unittest.TestCase):
+    def test_pop_sorted(self):
+        rng = random.Random(0)
+        heap = IndexedHeap()
+        expected = dict()
+        for _ in range(1000):
+            item, priority = rng.randrange(100), rng.randrange(1000)
+            if item not in expected or priority <= expected[item]:
+                heap.push(item, priority)
+                expected[item] = priority
+        with self.subTest('len'):
+            self.assertEqual(len(expected), len(heap))
+        actual = [heap.pop() for _ in range(len(heap))]
+        with self.subTest('pop'):
+            self.assertEqual(sorted(expected.values()),
+                             [priority for _, priority in actual])
+            self.assertEqual(expected, dict(actual))
+
+    def test_priority(self):
+        heap = IndexedHeap()
+        heap.push('A', 3)
+        heap.push('A', 2)
+        data_set = [(2, heap.priority('A')), (True, 'A' in heap),
+                    (False, 'B' in heap)]
+        for e, a in data_set:
+            with self.subTest(e=e, a=a):
+                self.assertEqual(e, a)
+
+    def test_raises(self):
+        heap = IndexedHeap()
+        heap.push('A', 3)
+        data_set = [
+            (ValueError, lambda: heap.push('A', 4)),
+            (KeyError, lambda: heap.priority('B')),
+            (IndexError, lambda: [heap.pop(), heap.pop()])
+        ]
+        for error, function in data_set:
+            with self.subTest(error=error):
+                with self.assertRaises(error):
+                    function()